@@ -20,6 +20,13 @@ LINE="==========================================================================
 [ ! -f "$LOGSDIR"/???-binutils-pass1* ] && \
   echo -e "\nLooks like nothing has been built yet. Aborting report.\n" && exit
 
+# Prefer the single-pass Python engine, which also compares each package
+# with the book's SBU and DU values and writes a JSON report
+ENGINE="$(dirname "$0")/sbu_du_report.py"
+if [ -f "$ENGINE" ] && command -v python3 >/dev/null 2>&1; then
+  exec python3 "$ENGINE" "$@"
+fi
+
 # If this script is run manually, the book version may be unknown
 [ -z "$VERSION" ] && VERSION=unknown
 [ -z "$DATE" ] && DATE=$(date --iso-8601)
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+
+"""
+Installed files tracker and file ownership index for jhalfs.
+
+Replaces the 'find / -xdev -newer timestamp-marker' of log_new_files, which
+walks the whole root file system after every package.  'start' places a
+fanotify mark on the root file system before the package is built and
+leaves a watcher in the background that records the names of the files
+created, written, renamed, deleted or changed.  'stop' ends the watcher and
+looks only at those names, so logging a package costs O(files installed).
+
+fanotify needs Linux 5.9 and CAP_SYS_ADMIN.  When it is not available,
+'start' exits with status 1 and 'stop' walks the file system for files
+newer than the timestamp marker, as the find did.  Either way the log is
+written in the find -printf "%p\t%s\t%u:%g\t%m\t%l" format, and the files
+are recorded in a SQLite index of path -> package, which 'owner' and
+'files' query.
+
+Usage: install_tracker.py start STATE_DIR
+       install_tracker.py stop STATE_DIR PACKAGE --log FILE --index DB
+                          [--marker FILE] [--exclude DIR]...
+       install_tracker.py owner --index DB PATH...
+       install_tracker.py files --index DB PACKAGE
+"""
+
+import argparse
+import ctypes
+import errno
+import grp
+import os
+import pwd
+import select
+import signal
+import sqlite3
+import stat
+import struct
+import sys
+import time
+
+# <linux/fanotify.h>
+FAN_CLOEXEC = 0x1
+FAN_NONBLOCK = 0x2
+FAN_UNLIMITED_QUEUE = 0x10
+FAN_REPORT_DFID_NAME = 0x400 | 0x800
+FAN_MARK_ADD = 0x1
+FAN_MARK_FILESYSTEM = 0x100
+FAN_ATTRIB = 0x4
+FAN_CLOSE_WRITE = 0x8
+FAN_MOVED_FROM = 0x40
+FAN_MOVED_TO = 0x80
+FAN_CREATE = 0x100
+FAN_DELETE = 0x200
+FAN_Q_OVERFLOW = 0x4000
+FAN_EVENT_INFO_TYPE_DFID_NAME = 2
+EVENTS = FAN_ATTRIB | FAN_CLOSE_WRITE | FAN_MOVED_FROM | FAN_MOVED_TO | FAN_CREATE | FAN_DELETE
+
+_METADATA = struct.Struct("=IBBHQii")
+_INFO_HEADER = struct.Struct("=BBH")
+_FSID_SIZE = 8
+_HANDLE_HEADER = struct.Struct("=Ii")
+
+# Files of the watcher in STATE_DIR
+PID_FILE = "pid"
+CHANGED_FILE = "changed"
+OVERFLOW_FILE = "overflow"
+STOP_TIMEOUT = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    package TEXT NOT NULL,
+    size INTEGER,
+    owner TEXT,
+    mode TEXT,
+    link TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_package ON files (package);
+CREATE TABLE IF NOT EXISTS packages (
+    name TEXT PRIMARY KEY,
+    logged REAL NOT NULL,
+    method TEXT NOT NULL,
+    files INTEGER NOT NULL
+);
+"""
+
+
+class Fanotify:
+    """A fanotify group reporting directory entry events on one file system."""
+
+    def __init__(self, root="/"):
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "fanotify_init"):
+            raise OSError(errno.ENOSYS, "fanotify is not available")
+        libc.fanotify_mark.argtypes = [ctypes.c_int, ctypes.c_uint, ctypes.c_uint64,
+                                       ctypes.c_int, ctypes.c_char_p]
+        self._libc = libc
+        self.fd = libc.fanotify_init(FAN_CLOEXEC | FAN_NONBLOCK | FAN_UNLIMITED_QUEUE | FAN_REPORT_DFID_NAME,
+                                     os.O_RDONLY)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, "fanotify_init: %s" % os.strerror(err))
+        if libc.fanotify_mark(self.fd, FAN_MARK_ADD | FAN_MARK_FILESYSTEM, EVENTS, -100,
+                              os.fsencode(root)) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, "fanotify_mark %s: %s" % (root, os.strerror(err)))
+        self.root = root
+        self.mount_fd = os.open(root, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+        # Directory handle -> path, or None for directories outside root
+        self._dirs = {}
+        self.overflow = False
+
+    def _dir_path(self, handle):
+        if handle in self._dirs:
+            return self._dirs[handle]
+        path = None
+        buf = ctypes.create_string_buffer(handle, len(handle))
+        fd = self._libc.open_by_handle_at(self.mount_fd, buf, os.O_PATH | os.O_CLOEXEC)
+        if fd >= 0:
+            try:
+                path = os.readlink("/proc/self/fd/%d" % fd)
+                # Events come from the whole file system; keep directories
+                # that are reachable from our root under that name
+                st = os.fstat(fd)
+                seen = os.stat(path)
+                if (st.st_dev, st.st_ino) != (seen.st_dev, seen.st_ino):
+                    path = None
+            except OSError:
+                path = None
+            finally:
+                os.close(fd)
+        self._dirs[handle] = path
+        return path
+
+    def read(self):
+        """Return the paths named by the queued events."""
+        paths = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return paths
+            offset = 0
+            while offset + _METADATA.size <= len(data):
+                event_len, _vers, _res, meta_len, mask, _fd, _pid = _METADATA.unpack_from(data, offset)
+                if mask & FAN_Q_OVERFLOW:
+                    self.overflow = True
+                info = offset + meta_len
+                end = offset + event_len
+                while info + _INFO_HEADER.size <= end:
+                    info_type, _pad, info_len = _INFO_HEADER.unpack_from(data, info)
+                    if info_type == FAN_EVENT_INFO_TYPE_DFID_NAME:
+                        start = info + _INFO_HEADER.size + _FSID_SIZE
+                        handle_bytes, _type = _HANDLE_HEADER.unpack_from(data, start)
+                        handle_end = start + _HANDLE_HEADER.size + handle_bytes
+                        name = data[handle_end:info + info_len].split(b"\0", 1)[0]
+                        directory = self._dir_path(bytes(data[start:handle_end]))
+                        if directory and name and name != b".":
+                            paths.add(os.path.join(directory, os.fsdecode(name)))
+                    info += info_len or end
+                offset = end or len(data)
+
+    def close(self):
+        os.close(self.mount_fd)
+        os.close(self.fd)
+
+
+def _live_pid(state_dir):
+    try:
+        with open(os.path.join(state_dir, PID_FILE)) as f:
+            pid = int(f.read())
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError):
+        return None
+
+
+def _watch(notify, state_dir, ready):
+    """Collect paths until SIGTERM, then write them to STATE_DIR/changed."""
+    stopping = []
+    wake_r, wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    with open(os.path.join(state_dir, PID_FILE), "w") as f:
+        f.write("%d\n" % os.getpid())
+    os.write(ready, b"\n")
+    os.close(ready)
+
+    paths = set()
+    while not stopping:
+        select.select([notify.fd, wake_r], [], [])
+        paths |= notify.read()
+    paths |= notify.read()
+    if notify.overflow:
+        open(os.path.join(state_dir, OVERFLOW_FILE), "w").close()
+    tmp = os.path.join(state_dir, CHANGED_FILE + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(b"\0".join(os.fsencode(p) for p in sorted(paths)))
+    os.rename(tmp, os.path.join(state_dir, CHANGED_FILE))
+
+
+def start(state_dir, root="/"):
+    """Start a watcher for state_dir; return False if fanotify is unusable."""
+    os.makedirs(state_dir, exist_ok=True)
+    # A previous package that failed to build may have left its watcher
+    old = _live_pid(state_dir)
+    if old:
+        os.kill(old, signal.SIGKILL)
+    for name in (PID_FILE, CHANGED_FILE, OVERFLOW_FILE):
+        try:
+            os.unlink(os.path.join(state_dir, name))
+        except FileNotFoundError:
+            pass
+    try:
+        notify = Fanotify(root)
+    except OSError as exc:
+        print("install_tracker: %s, falling back to find" % exc.strerror, file=sys.stderr)
+        return False
+
+    # The mark is in place before we return, and the watcher handles SIGTERM
+    # once it has written its pid file
+    ready_r, ready_w = os.pipe()
+    pid = os.fork()
+    if pid:
+        notify.close()
+        os.close(ready_w)
+        with os.fdopen(ready_r, "rb") as ready:
+            return ready.read(1) == b"\n"
+    os.close(ready_r)
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    try:
+        _watch(notify, state_dir, ready_w)
+    finally:
+        os._exit(0)
+
+
+def _collect(state_dir):
+    """Stop the watcher and return its paths, or None if there is none."""
+    pid = _live_pid(state_dir)
+    if pid is None:
+        return None
+    os.kill(pid, signal.SIGTERM)
+    changed = os.path.join(state_dir, CHANGED_FILE)
+    deadline = time.monotonic() + STOP_TIMEOUT
+    while not os.path.exists(changed):
+        # A watcher that died without writing its paths leaves the fallback
+        if time.monotonic() > deadline or (_live_pid(state_dir) is None and not os.path.exists(changed)):
+            return None
+        time.sleep(0.01)
+    if os.path.exists(os.path.join(state_dir, OVERFLOW_FILE)):
+        return None
+    with open(changed, "rb") as f:
+        data = f.read()
+    os.unlink(os.path.join(state_dir, PID_FILE))
+    return [os.fsdecode(p) for p in data.split(b"\0") if p]
+
+
+def _excluded(path, excludes):
+    return any(path == e or path.startswith(e + "/") for e in excludes)
+
+
+def walk_newer(marker, root="/", excludes=()):
+    """Yield the non-directories on root's file system newer than marker."""
+    newer = os.stat(marker).st_mtime_ns
+    dev = os.lstat(root).st_dev
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if _excluded(entry.path, excludes):
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                if st.st_dev == dev:
+                    stack.append(entry.path)
+            elif st.st_mtime_ns > newer:
+                yield entry.path
+
+
+def _name(table, ident, cache):
+    if ident not in cache:
+        try:
+            cache[ident] = table(ident)[0]
+        except KeyError:
+            cache[ident] = str(ident)
+    return cache[ident]
+
+
+def describe(paths, excludes=()):
+    """Return {path: (size, owner, mode, link)} for the existing non-directories."""
+    users, groups = {}, {}
+    files = {}
+    for path in paths:
+        if _excluded(path, excludes):
+            continue
+        try:
+            st = os.lstat(path)
+        except OSError:
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            continue
+        link = os.readlink(path) if stat.S_ISLNK(st.st_mode) else ""
+        owner = "%s:%s" % (_name(pwd.getpwuid, st.st_uid, users), _name(grp.getgrgid, st.st_gid, groups))
+        files[path] = (st.st_size, owner, "%o" % stat.S_IMODE(st.st_mode), link)
+    return files
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def record(conn, package, files, removed, method):
+    """Make package the owner of files and forget the removed paths."""
+    with conn:
+        conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in removed))
+        conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                         ((path, package) + info for path, info in files.items()))
+        conn.execute("INSERT OR REPLACE INTO packages VALUES (?, ?, ?, ?)",
+                     (package, time.time(), method, len(files)))
+
+
+def stop(state_dir, package, log, index, marker=None, root="/", excludes=()):
+    """Write the installed files log of package and update the index."""
+    excludes = [e.rstrip("/") for e in excludes]
+    paths = _collect(state_dir)
+    method = "fanotify"
+    if paths is None:
+        if not marker:
+            raise RuntimeError("no running tracker in %s and no timestamp marker" % state_dir)
+        paths = walk_newer(marker, root, excludes)
+        method = "find"
+    else:
+        paths = [p for p in paths if not _excluded(p, excludes)]
+    files = describe(paths, excludes)
+
+    with open(log, "w", encoding="utf-8", errors="surrogateescape") as f:
+        for path in sorted(files, key=os.fsencode):
+            f.write("%s\t%d\t%s\t%s\t%s\n" % ((path,) + files[path]))
+    conn = connect(index)
+    try:
+        removed = [p for p in paths if p not in files] if method == "fanotify" else []
+        record(conn, package, files, removed, method)
+    finally:
+        conn.close()
+    return method, len(files)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Track the files installed by jhalfs packages")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("start", help="Start watching the root file system")
+    p.add_argument("state_dir")
+    p.add_argument("--root", default="/")
+    p = sub.add_parser("stop", help="Write the installed files log of a package")
+    p.add_argument("state_dir")
+    p.add_argument("package")
+    p.add_argument("--log", required=True, help="Installed files log to write")
+    p.add_argument("--index", required=True, help="SQLite file ownership index")
+    p.add_argument("--marker", help="Timestamp marker for the find fallback")
+    p.add_argument("--root", default="/")
+    p.add_argument("--exclude", action="append", default=[], help="Directory to leave out")
+    p = sub.add_parser("owner", help="Print the package owning each path")
+    p.add_argument("--index", required=True)
+    p.add_argument("paths", nargs="+")
+    p = sub.add_parser("files", help="Print the files of a package")
+    p.add_argument("--index", required=True)
+    p.add_argument("package")
+    args = parser.parse_args(argv)
+
+    if args.command == "start":
+        return 0 if start(args.state_dir, args.root) else 1
+    if args.command == "stop":
+        try:
+            stop(args.state_dir, args.package, args.log, args.index, args.marker, args.root, args.exclude)
+        except (OSError, RuntimeError, sqlite3.Error) as exc:
+            print("install_tracker: %s" % exc, file=sys.stderr)
+            return 2
+        return 0
+
+    conn = connect(args.index)
+    status = 0
+    if args.command == "owner":
+        for path in args.paths:
+            row = conn.execute("SELECT package FROM files WHERE path = ?", (os.path.abspath(path),)).fetchone()
+            print("%s\t%s" % (path, row[0] if row else "-"))
+            status |= row is None
+    else:
+        rows = conn.execute("SELECT path FROM files WHERE package = ? ORDER BY path", (args.package,)).fetchall()
+        for (path,) in rows:
+            print(path)
+        status = 0 if rows else 1
+    conn.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
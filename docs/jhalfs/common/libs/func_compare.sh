@@ -61,12 +61,18 @@ wrt_compare_work() {               #
 
   if [[ "$RUN_ICA" = "y" ]] ; then
     local DEST_ICA=$DEST_TOPDIR/ICA && \
-  # the PRUNEPATH additional setting is to avoid .pyc files to show up in diff
+  # Without python3, fall back to copying the system. In both cases,
+  # __pycache__ directories are left out so .pyc files do not show up in diff
 (
     cat << EOF
-	@PRUNEPATH="$PRUNEPATH \$\$(find /usr/lib -name __pycache__)"; \\
-	extras/do_copy_files "\$\$PRUNEPATH" $ROOT_DIR $DEST_ICA/$ITERATION >>logs/\$@ 2>&1 && \\
-	extras/do_ica_prep $DEST_ICA/$ITERATION >>logs/\$@ 2>&1
+	@if command -v python3 >/dev/null; then \\
+	  python3 extras/ica_manifest.py scan $ROOT_DIR $DEST_ICA $ITERATION \\
+	    --prune "$PRUNEPATH" --exclude-name __pycache__ >>logs/\$@ 2>&1; \\
+	else \\
+	  PRUNEPATH="$PRUNEPATH \$\$(find /usr/lib -name __pycache__)"; \\
+	  extras/do_copy_files "\$\$PRUNEPATH" $ROOT_DIR $DEST_ICA/$ITERATION >>logs/\$@ 2>&1 && \\
+	  extras/do_ica_prep $DEST_ICA/$ITERATION >>logs/\$@ 2>&1; \\
+	fi
 EOF
 ) >> $MKFILE.tmp
     if [[ "$ITERATION" != "iteration-1" ]] ; then
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+
+"""
+Single-pass SBU and disk usage report for jhalfs build logs.
+
+Replaces the per-package grep/sed/perl pipeline of create-sbu_du-report.sh:
+every log is read exactly once, collecting its 'Totalseconds:' line and the
+first and last 'KB:' lines.  Each package is then compared with the book's
+'<name>-sbu' and '<name>-du' entities from packages.ent, and packages whose
+SBU differs from the book by more than 10%, or whose disk usage differs by
+more than 2%, are listed as deviations.  The classic text report is written
+together with a JSON report of the same data.
+
+Usage: sbu_du_report.py logs_directory [book_version] [date] [--book DIR]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+LINE = "=" * 80
+SBU_TOLERANCE = 0.10
+DU_TOLERANCE = 0.02
+
+_ENTITY_RE = re.compile(r'<!ENTITY\s+([\w.+-]+)\s+"([^"]*)"\s*>')
+_REF_RE = re.compile(r"&([\w.+-]+);")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_UNITS = {"KB": 1.0 / 1024, "MB": 1.0, "GB": 1024.0}
+
+
+def load_entities(path):
+    """Return the expanded <!ENTITY> values of path, or {} if it is missing."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = re.sub(r"<!--.*?-->", "", f.read(), flags=re.DOTALL)
+    except OSError:
+        return {}
+    entities = {}
+    for key, value in _ENTITY_RE.findall(text):
+        entities.setdefault(key, value)
+    for key, value in entities.items():
+        for _ in range(5):
+            new = _REF_RE.sub(lambda m: entities.get(m.group(1), m.group(0)), value)
+            if new == value:
+                break
+            value = new
+        entities[key] = value
+    return entities
+
+
+def parse_sbu(text):
+    """Return (value, is_upper_bound) for a book SBU string, or None."""
+    typical = re.search(r"typically about (\d+(?:\.\d+)?)", text)
+    if typical:
+        return float(typical.group(1)), False
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None
+    return float(match.group(0)), "less than" in text
+
+
+def parse_du(text):
+    """Return a book disk usage string such as '1.1 GB' in MB, or None."""
+    match = re.search(r"(\d+(?:\.\d+)?)\s*([KMG]B)", text)
+    if not match:
+        return None
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+
+def entity_key(log_name):
+    """Map a jhalfs log name such as '501-binutils-pass1' to its entity stem.
+
+    The leading digit is the book chapter: chapters 5 and 6 hold the
+    cross-toolchain and temporary tools, 7 the chroot tools and 8 the final
+    system.  gcc-libstdc++, built with the cross-toolchain, is the book's
+    libstdcpp-tmpp1.
+    """
+    match = re.match(r"(\d+)-(.*)", log_name)
+    if not match:
+        return log_name
+    chapter, name = match.group(1)[:-2] or "0", match.group(2)
+    if name.endswith("-libstdc++"):
+        return "libstdcpp-tmpp1"
+    passno = re.search(r"-pass([12])$", name)
+    if passno:
+        return "%s-tmpp%s" % (name[:passno.start()], passno.group(1))
+    if chapter in ("5", "6", "7"):
+        return name + "-tmp"
+    if name in ("linux", "kernel"):
+        return "linux-knl"
+    return name + "-fin"
+
+
+def _sort_key(name):
+    match = re.match(r"(\d+)", name)
+    return (int(match.group(1)) if match else sys.maxsize, name)
+
+
+def scan_log(path):
+    """Read path once; return (seconds, first_kb, last_kb) or None if untimed."""
+    seconds = first_kb = last_kb = None
+    with open(path, "rb") as f:
+        for raw in f:
+            if raw.startswith(b"Totalseconds:"):
+                try:
+                    seconds = int(raw.split()[1])
+                except (IndexError, ValueError):
+                    pass
+            elif raw.startswith(b"KB: "):
+                try:
+                    kb = int(raw[4:].split()[0])
+                except (IndexError, ValueError):
+                    continue
+                if first_kb is None:
+                    first_kb = kb
+                last_kb = kb
+    if seconds is None:
+        return None
+    return seconds, first_kb or 0, last_kb or 0
+
+
+def collect_logs(logsdir):
+    """Return {log_name: path}; logs of a build_1 iteration take precedence."""
+    logs = {}
+    for directory in (logsdir, os.path.join(logsdir, "build_1")):
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if os.path.isfile(path):
+                    logs[name] = path
+    return logs
+
+
+def read_config(path="jhalfs.config"):
+    """Return the jhalfs.config dump without colour codes, or None."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return None
+    lines = []
+    for line in text.splitlines():
+        if "parameters" in line:
+            continue
+        line = re.sub(r".\[[013;]*m", "", line).replace("<", "\t<", 1)
+        lines.append(re.sub(r"^(\w{1,6}:)", r"\1\t", line))
+    return "\n".join(lines)
+
+
+def sbu_parallelism(config):
+    """The -j value the SBU unit was measured at, as the shell report did."""
+    if not config:
+        return 1
+    realsbu = re.search(r"REALSBU.*([yn])", config)
+    if realsbu and realsbu.group(1) == "y":
+        return 1
+    jobs = re.search(r"N_PARALLEL[^<]*<([^>]*)", config)
+    try:
+        return int(jobs.group(1)) if jobs else 1
+    except ValueError:
+        return 1
+
+
+def build_report(logsdir, entities, root_kb=None):
+    """Analyse the timed logs in logsdir and return the report data."""
+    timed = []
+    for name, path in sorted(collect_logs(logsdir).items(), key=lambda item: _sort_key(item[0])):
+        values = scan_log(path)
+        if values:
+            timed.append((name, values))
+    base = next((v for n, v in timed if re.match(r"\d+-binutils", n)), None)
+    if base is None or not base[0]:
+        raise ValueError("no timed binutils log found; nothing to report")
+    sbu_unit = base[0]
+
+    packages = []
+    for index, (name, (seconds, du1, du2)) in enumerate(timed):
+        key = entity_key(name)
+        sbu = seconds / sbu_unit
+        required_mb = (du2 - du1) / 1024.0
+        entry = {
+            "log": name,
+            "package": re.sub(r"^\d+-", "", name),
+            "seconds": seconds,
+            "sbu": round(sbu, 1),
+            "du_before_kb": du1,
+            "du_after_kb": du2,
+            "required_kb": du2 - du1,
+            "book_sbu": None,
+            "book_du_mb": None,
+            "deviations": [],
+        }
+        if index + 1 < len(timed):
+            entry["installed_kb"] = timed[index + 1][1][1] - du1
+        elif root_kb is not None:
+            entry["installed_kb"] = root_kb - du1
+
+        book_sbu = parse_sbu(entities.get(key + "-sbu", ""))
+        if book_sbu:
+            value, upper_bound = book_sbu
+            entry["book_sbu"] = value
+            # "less than X" only fails when the upper bound is exceeded
+            if sbu > value * (1 + SBU_TOLERANCE) or (not upper_bound and value and
+                                                      sbu < value * (1 - SBU_TOLERANCE)):
+                entry["deviations"].append("sbu")
+        book_du = parse_du(entities.get(key + "-du", ""))
+        if book_du is not None:
+            entry["book_du_mb"] = book_du
+            if book_du and abs(required_mb - book_du) > book_du * DU_TOLERANCE:
+                entry["deviations"].append("du")
+        packages.append(entry)
+
+    return {
+        "sbu_unit_seconds": sbu_unit,
+        "total_sbu": round(sum(p["sbu"] for p in packages), 1),
+        "total_installed_kb": sum(p.get("installed_kb", 0) for p in packages),
+        "packages": packages,
+    }
+
+
+def _mb(kb):
+    return "%.3f" % (kb / 1024.0)
+
+
+def format_report(report, version, config, jobs, host_info=""):
+    """Render report in the layout of the original shell report."""
+    out = ["", time.ctime(), ""]
+    out.append("Book version is:\t%s\n" % version)
+    if config is not None:
+        out.append("\n\tjhalfs configuration settings:\n")
+        out.append(config)
+    else:
+        out.append("\nNOTE: the jhalfs configuration settings are unknown")
+    out.append(host_info)
+    out.append("\n\n%s\n\nThe SBU unit value is equal to %s seconds at -j%s.\n"
+               % (LINE, report["sbu_unit_seconds"], jobs))
+    for p in report["packages"]:
+        secs = p["seconds"]
+        out.append("%s\n\t\t\t\t[%s]\n" % (LINE, p["package"]))
+        out.append("Build time is:\t\t\t\t\t\t%d minutes and %d seconds" % (round((secs - secs % 60) / 60), secs % 60))
+        out.append("Build time in seconds is:\t\t\t\t%d" % secs)
+        out.append("Approximate SBU time is:\t\t\t\t%.1f" % p["sbu"])
+        out.append("Disk usage before unpacking the package:\t\t%d KB or %s MB"
+                   % (p["du_before_kb"], _mb(p["du_before_kb"])))
+        out.append("Disk usage before deleting the source and build dirs:\t%d KB or %s MB"
+                   % (p["du_after_kb"], _mb(p["du_after_kb"])))
+        out.append("Required space to build the package:\t\t\t%d KB or %s MB"
+                   % (p["required_kb"], _mb(p["required_kb"])))
+        if "installed_kb" in p:
+            out.append("Installed files disk usage:\t\t\t\t%d KB or %s MB\n"
+                       % (p["installed_kb"], _mb(p["installed_kb"])))
+    out.append("\n%s\n\nTotal time required to build the system:\t\t%s  SBU" % (LINE, report["total_sbu"]))
+    total = report["total_installed_kb"]
+    out.append("Total Installed files disk usage:\t\t\t%d KB or %s MB" % (total, _mb(total)))
+
+    deviating = [p for p in report["packages"] if p["deviations"]]
+    out.append("\n%s\n\nPackages deviating from the book (SBU > %d%%, DU > %d%%):\n"
+               % (LINE, SBU_TOLERANCE * 100, DU_TOLERANCE * 100))
+    for p in deviating:
+        details = []
+        if "sbu" in p["deviations"]:
+            details.append("%.1f SBU (book %s)" % (p["sbu"], p["book_sbu"]))
+        if "du" in p["deviations"]:
+            details.append("%s MB (book %s MB)" % (_mb(p["required_kb"]), p["book_du_mb"]))
+        out.append("%-40s%s" % (p["package"], ", ".join(details)))
+    if not deviating:
+        out.append("None")
+    return "\n".join(out) + "\n"
+
+
+def _host_info():
+    parts = []
+    for title, cmd in (("CPU type", ["lscpu"]), ("Memory info", ["free"])):
+        try:
+            output = subprocess.run(cmd, capture_output=True, text=True).stdout
+        except OSError:
+            output = ""
+        parts.append("\n\n\t\t%s:\n\n%s" % (title, output))
+    return "".join(parts)
+
+
+def _root_usage(logsdir):
+    # Usage of the built system at the end, for the last package's
+    # installed files; the root is assumed to be logsdir/../..
+    try:
+        output = subprocess.run(
+            ["du", "-skx", "--exclude=jhalfs", "--exclude=lost+found", "--exclude", "var/lib",
+             os.path.join(logsdir, "..", "..")],
+            capture_output=True, text=True).stdout
+        return int(output.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create the jhalfs SBU and disk usage report")
+    parser.add_argument("logsdir", help="jhalfs logs directory")
+    parser.add_argument("version", nargs="?", default="unknown", help="Book version")
+    parser.add_argument("date", nargs="?", default=datetime.date.today().isoformat(), help="Report date")
+    parser.add_argument("--book", help="Book sources holding packages.ent (default: ../book-source)")
+    parser.add_argument("--output-dir", default=".", help="Where the .report and .json files go")
+    parser.add_argument("--no-du", action="store_true", help="Skip the final du of the built system")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(os.path.join(args.logsdir, "000-masterscript.log")):
+        print("\nLooks like %s isn't a jhalfs logs directory.\n" % args.logsdir)
+        return 0
+    book = args.book or os.path.join(args.logsdir, "..", "book-source")
+    entities = load_entities(os.path.join(book, "packages.ent"))
+    try:
+        report = build_report(args.logsdir, entities, None if args.no_du else _root_usage(args.logsdir))
+    except ValueError:
+        print("\nLooks like nothing has been built yet. Aborting report.\n")
+        return 0
+
+    config = read_config()
+    jobs = sbu_parallelism(config)
+    report.update(version=args.version, date=args.date, sbu_jobs=jobs)
+    print("\nThe SBU unit value is equal to %s seconds at -j%s.\n" % (report["sbu_unit_seconds"], jobs))
+
+    stem = os.path.join(args.output_dir, "%s-SBU_DU-%s" % (args.version, args.date))
+    with open(stem + ".report", "w", encoding="utf-8") as f:
+        f.write(format_report(report, args.version, config, jobs, _host_info()))
+    with open(stem + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+
+"""
+Manifest based ICA (iterative comparison analysis) for jhalfs.
+
+Replaces copying the whole root file system for every iteration
+(do_copy_files and do_ica_prep) and running diff -ur over the copies
+(do_ica_work).  'scan' writes ITERATION.manifest, one line per file with its
+path, type, mode, size and content hash.  The hashes are computed in
+parallel, and those of files whose inode, size and mtime are unchanged
+since the previous manifest are reused.  The content is hashed after the
+normalization do_ica_prep applied to the copies:
+
+  - ELF files: only the sections loaded at run time (SHF_ALLOC), which
+    leaves out the symbols and debug information do_ica_prep stripped, and
+    without the GNU build-id; relocatable objects keep their symbols and
+    relocations, and lose only the debug information and .comment,
+  - ar archives: the members, normalized, without their date, uid and gid,
+  - gzip files: the uncompressed data, without the header's name and date.
+
+Instead of a copy, each file is hard linked into ICA_DIR/objects under its
+hash, which costs no data until the next iteration replaces the file.
+'compare' diffs two manifests and writes the classic REPORT and ASCII.DIFF.
+It keeps the old and new versions of the files that differ in
+ICA_DIR/<PREV>V<ITERATION>/ and drops the objects no longer needed.
+
+Usage: ica_manifest.py scan ROOT ICA_DIR ITERATION [--prune DIR]...
+                       [--exclude-name NAME]...
+       ica_manifest.py compare ICA_DIR PREV ITERATION LOGDIR
+"""
+
+import argparse
+import concurrent.futures
+import difflib
+import gzip
+import hashlib
+import mmap
+import os
+import shutil
+import stat
+import struct
+import sys
+import zlib
+
+CHUNK = 1 << 20
+TEXT_PROBE = 8192
+
+# <elf.h>
+ET_REL = 1
+SHF_ALLOC = 0x2
+SHT_SYMTAB = 2
+SHT_RELA = 4
+SHT_NOBITS = 8
+SHT_REL = 9
+STT_SECTION = 3
+SHN_LORESERVE = 0xff00
+_ELF_HEADER = {1: "HHIIIIIHHHHHH", 2: "HHIQQQIHHHHHH"}
+_ELF_SECTION = {1: "IIIIIIIIII", 2: "IIQQQQIIQQ"}
+# (st_name, st_value, st_size, st_info, st_other, st_shndx) in file order
+_ELF_SYMBOL = {1: ("IIIBBH", (0, 1, 2, 3, 4, 5)), 2: ("IBBHQQ", (0, 4, 5, 1, 2, 3))}
+# (r_offset, r_info[, r_addend]) and the shift of the symbol index in r_info
+_ELF_REL = {1: ("II", "IIi", 8), 2: ("QQ", "QQq", 32)}
+
+_AR_MAGIC = b"!<arch>\n"
+_AR_HEADER = 60
+# The archive symbol index holds member offsets, which follow their sizes
+_AR_INDEXES = (b"/", b"/SYM64/", b"__.SYMDEF", b"__.SYMDEF SORTED")
+
+
+class Entry:
+    """One manifest line."""
+
+    __slots__ = ("path", "type", "mode", "size", "norm", "digest", "inode")
+
+    def __init__(self, path, type, mode, size, norm, digest, inode):
+        self.path = path
+        self.type = type
+        self.mode = mode
+        self.size = size
+        self.norm = norm
+        self.digest = digest
+        self.inode = inode
+
+    def same(self, other):
+        """Whether other has the same type, permissions and normalized content."""
+        return (self.type, self.mode, self.digest) == (other.type, other.mode, other.digest)
+
+
+def _quote(text):
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _unquote(text):
+    if "\\" not in text:
+        return text
+    return text.replace("\\\\", "\0").replace("\\t", "\t").replace("\\n", "\n").replace("\0", "\\")
+
+
+def write_manifest(path, entries):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", errors="surrogateescape") as f:
+        for e in sorted(entries.values(), key=lambda e: e.path):
+            f.write("%s\t%s\t%o\t%d\t%s\t%s\t%s\n"
+                    % (_quote(e.path), e.type, e.mode, e.size, e.norm, _quote(e.digest), e.inode))
+    os.rename(tmp, path)
+
+
+def read_manifest(path):
+    """Return {path: Entry} from a manifest written by write_manifest."""
+    entries = {}
+    with open(path, encoding="utf-8", errors="surrogateescape") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 7:
+                continue
+            name, kind, mode, size, norm, digest, inode = fields
+            entries[_unquote(name)] = Entry(_unquote(name), kind, int(mode, 8), int(size), norm,
+                                            _unquote(digest), inode)
+    return entries
+
+
+# ---- Normalized hashing ----
+
+def _unhashed(name):
+    """Whether the ELF section name is left out of relocatable objects' digests."""
+    return name.startswith(b".debug") or name in (b".comment", b".note.gnu.build-id")
+
+
+def _cstr(table, offset):
+    end = table.find(b"\0", offset)
+    return table[offset:end if end >= 0 else len(table)]
+
+
+def _symbol_keys(data, endian, cls, sections, names, symtab, skipped):
+    """Return one key per symbol of the section symtab, None for skipped ones.
+
+    A key names the symbol and its section instead of using indices, which
+    change with the debug sections and their section symbols.
+    """
+    fmt, order = _ELF_SYMBOL[cls]
+    symbol = struct.Struct(endian + fmt)
+    strtab = sections[symtab[6]]
+    strings = bytes(data[strtab[4]:strtab[4] + strtab[5]])
+    keys = []
+    for offset in range(symtab[4], symtab[4] + symtab[5] - symbol.size + 1, symbol.size):
+        fields = symbol.unpack_from(data, offset)
+        st_name, st_value, st_size, st_info, st_other, st_shndx = (fields[i] for i in order)
+        if st_shndx in skipped:
+            keys.append(None)
+            continue
+        section = names[st_shndx] if 0 < st_shndx < SHN_LORESERVE else struct.pack("<H", st_shndx)
+        name = section if st_info & 0xf == STT_SECTION else _cstr(strings, st_name)
+        keys.append(struct.pack("<I", len(name)) + name + struct.pack("<BBQQ", st_info, st_other, st_value, st_size)
+                    + section)
+    return keys
+
+
+def elf_digest(data, h):
+    """Feed the allocated sections of the ELF image data to h.
+
+    Relocatable objects are only linked later, so their symbols and
+    relocations are fed to h too; only the debug information, the comment
+    and the GNU build-id are left out.
+    Returns False if data is not an ELF file this can parse.
+    """
+    if len(data) < 64 or data[:4] != b"\x7fELF" or data[4] not in (1, 2) or data[5] not in (1, 2):
+        return False
+    cls = data[4]
+    endian = "<" if data[5] == 1 else ">"
+    header = struct.Struct(endian + _ELF_HEADER[cls])
+    section = struct.Struct(endian + _ELF_SECTION[cls])
+    (e_type, e_machine, _version, e_entry, _phoff, e_shoff, e_flags, _ehsize, _phentsize, _phnum,
+     e_shentsize, e_shnum, e_shstrndx) = header.unpack_from(data, 16)
+    if not e_shoff or e_shentsize != section.size:
+        return False
+    try:
+        if e_shnum == 0:
+            # More than SHN_LORESERVE sections: the count is in section 0
+            e_shnum = section.unpack_from(data, e_shoff)[5]
+        sections = [section.unpack_from(data, e_shoff + i * section.size) for i in range(e_shnum)]
+        if e_shstrndx == 0xffff:
+            e_shstrndx = sections[0][6]
+        strtab = sections[e_shstrndx]
+    except (struct.error, IndexError):
+        return False
+    strings = bytes(data[strtab[4]:strtab[4] + strtab[5]])
+    names = [_cstr(strings, s[0]) for s in sections]
+
+    relocatable = e_type == ET_REL
+    if relocatable:
+        # Relocations of a skipped section are skipped with it; the string
+        # tables are fed through the names they hold
+        skipped = {i for i, name in enumerate(names) if _unhashed(name)}
+        skipped.update(i for i, s in enumerate(sections) if s[1] in (SHT_REL, SHT_RELA) and s[7] in skipped)
+        skipped.add(e_shstrndx)
+        skipped.update(s[6] for s in sections if s[1] == SHT_SYMTAB)
+        symbols = {}
+        try:
+            for i, s in enumerate(sections):
+                if s[1] == SHT_SYMTAB:
+                    symbols[i] = _symbol_keys(data, endian, cls, sections, names, s, skipped)
+        except (struct.error, IndexError):
+            return False
+
+    h.update(struct.pack("<HHQI", e_type, e_machine, e_entry, e_flags))
+    for i, (_name, sh_type, sh_flags, sh_addr, sh_offset, sh_size, sh_link, _info, _align, _entsize) \
+            in enumerate(sections):
+        name = names[i]
+        if relocatable:
+            if i == 0 or i in skipped:
+                continue
+        elif not sh_flags & SHF_ALLOC:
+            continue
+        if relocatable and sh_type in (SHT_SYMTAB, SHT_REL, SHT_RELA):
+            # Fed entry by entry: the size counts the skipped symbols too
+            h.update(struct.pack("<I", len(name)) + name + struct.pack("<IQQ", sh_type, sh_flags, sh_addr))
+            if sh_type == SHT_SYMTAB:
+                h.update(b"".join(key for key in symbols[i] if key is not None))
+            else:
+                rel, rela, shift = _ELF_REL[cls]
+                entry = struct.Struct(endian + (rela if sh_type == SHT_RELA else rel))
+                keys = symbols.get(sh_link)
+                try:
+                    for offset in range(sh_offset, sh_offset + sh_size - entry.size + 1, entry.size):
+                        r_offset, r_info, *addend = entry.unpack_from(data, offset)
+                        key = keys[r_info >> shift] if keys else None
+                        h.update(struct.pack("<QQq", r_offset, r_info & ((1 << shift) - 1), sum(addend))
+                                 + (key or b""))
+                except (struct.error, IndexError):
+                    return False
+            continue
+        h.update(struct.pack("<I", len(name)) + name + struct.pack("<IQQQ", sh_type, sh_flags, sh_addr, sh_size))
+        if sh_type == SHT_NOBITS or name == b".note.gnu.build-id":
+            continue
+        h.update(data[sh_offset:sh_offset + sh_size])
+    return True
+
+
+def ar_digest(data, h):
+    """Feed the normalized members of the ar archive data to h."""
+    if data[:len(_AR_MAGIC)] != _AR_MAGIC:
+        return False
+    offset = len(_AR_MAGIC)
+    while offset + _AR_HEADER <= len(data):
+        header = data[offset:offset + _AR_HEADER]
+        if header[58:60] != b"`\n":
+            return False
+        name = bytes(header[:16]).rstrip()
+        try:
+            size = int(bytes(header[48:58]))
+        except ValueError:
+            return False
+        start = offset + _AR_HEADER
+        member = data[start:start + size]
+        offset = start + size + (size & 1)
+        if name in _AR_INDEXES:
+            continue
+        # Name and mode only: the date, uid and gid are left out, and the
+        # size changes with the debug information of ELF members
+        h.update(name + b"\0" + bytes(header[40:48]).rstrip() + b"\0")
+        sub = hashlib.sha256()
+        if not elf_digest(member, sub):
+            sub.update(member)
+        h.update(sub.digest())
+    return True
+
+
+def file_digest(path):
+    """Return (normalization, hex digest) of the regular file path."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        magic = f.read(8)
+        f.seek(0)
+        if magic[:4] == b"\x7fELF" or magic == _AR_MAGIC:
+            size = os.fstat(f.fileno()).st_size
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+                view = memoryview(data)
+                try:
+                    if magic[:4] == b"\x7fELF" and elf_digest(view, h):
+                        return "elf", h.hexdigest()
+                    h = hashlib.sha256()
+                    if magic == _AR_MAGIC and ar_digest(view, h):
+                        return "ar", h.hexdigest()
+                finally:
+                    view.release()
+            h = hashlib.sha256()
+        elif magic[:2] == b"\x1f\x8b":
+            try:
+                with gzip.GzipFile(fileobj=f) as gz:
+                    for chunk in iter(lambda: gz.read(CHUNK), b""):
+                        h.update(chunk)
+                return "gz", h.hexdigest()
+            except (OSError, EOFError, zlib.error):
+                h = hashlib.sha256()
+                f.seek(0)
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return "raw", h.hexdigest()
+
+
+# ---- Scanning ----
+
+def walk(root, prune=(), exclude_names=()):
+    """Yield (path relative to root, lstat) for the non-directories under root."""
+    prune = {os.path.normpath(os.path.join(root, p[2:] if p.startswith("./") else p.lstrip("/")))
+             for p in prune if p not in ("", ".", "/", "./")}
+    exclude_names = set(exclude_names)
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name in exclude_names or entry.path in prune:
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                stack.append(entry.path)
+            else:
+                yield os.path.relpath(entry.path, root), st
+
+
+def _type(mode):
+    for test, char in ((stat.S_ISREG, "f"), (stat.S_ISLNK, "l"), (stat.S_ISCHR, "c"),
+                       (stat.S_ISBLK, "b"), (stat.S_ISFIFO, "p"), (stat.S_ISSOCK, "s")):
+        if test(mode):
+            return char
+    return "?"
+
+
+def _object(objects, digest):
+    return os.path.join(objects, digest[:2], digest)
+
+
+def _keep(path, obj):
+    """Hard link path to obj, or copy it when linking is impossible."""
+    if os.path.lexists(obj):
+        return
+    os.makedirs(os.path.dirname(obj), exist_ok=True)
+    try:
+        os.link(path, obj)
+    except OSError:
+        shutil.copy2(path, obj)
+
+
+def latest_manifest(ica_dir, exclude=None):
+    manifests = [os.path.join(ica_dir, name) for name in os.listdir(ica_dir)
+                 if name.endswith(".manifest") and name != exclude]
+    return max(manifests, key=os.path.getmtime) if manifests else None
+
+
+def scan(root, ica_dir, iteration, prune=(), exclude_names=(), jobs=None):
+    """Write ICA_DIR/ITERATION.manifest for root; return (entries, rehashed)."""
+    os.makedirs(ica_dir, exist_ok=True)
+    objects = os.path.join(ica_dir, "objects")
+    previous = latest_manifest(ica_dir, iteration + ".manifest")
+    known = {}
+    if previous:
+        for e in read_manifest(previous).values():
+            if e.type == "f":
+                known[e.inode] = (e.norm, e.digest)
+
+    entries = {}
+    pending = []
+    for rel, st in walk(root, prune, exclude_names):
+        kind = _type(st.st_mode)
+        inode = "%d:%d:%d:%d" % (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        path = os.path.join(root, rel)
+        if kind == "l":
+            entry = Entry(rel, kind, stat.S_IMODE(st.st_mode), st.st_size, "link", os.readlink(path), inode)
+        else:
+            entry = Entry(rel, kind, stat.S_IMODE(st.st_mode), st.st_size, "-", "-", inode)
+            if kind == "f":
+                if inode in known:
+                    entry.norm, entry.digest = known[inode]
+                else:
+                    pending.append(entry)
+        entries[rel] = entry
+
+    def digest(entry):
+        try:
+            entry.norm, entry.digest = file_digest(os.path.join(root, entry.path))
+        except OSError as exc:
+            entry.norm, entry.digest = "error", exc.strerror or "unreadable"
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        list(pool.map(digest, pending))
+    for entry in entries.values():
+        if entry.type == "f" and entry.norm != "error":
+            try:
+                _keep(os.path.join(root, entry.path), _object(objects, entry.digest))
+            except OSError as exc:
+                print("Warning: cannot keep %s: %s" % (entry.path, exc.strerror), file=sys.stderr)
+
+    write_manifest(os.path.join(ica_dir, iteration + ".manifest"), entries)
+    return entries, len(pending)
+
+
+# ---- Comparing ----
+
+def compare(old, new):
+    """Return (differing paths, paths only in old, paths only in new)."""
+    differ = sorted(p for p in old.keys() & new.keys() if not old[p].same(new[p]))
+    return differ, sorted(old.keys() - new.keys()), sorted(new.keys() - old.keys())
+
+
+def _read(path, norm):
+    try:
+        if norm == "gz":
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        with open(path, "rb") as f:
+            return f.read()
+    except (OSError, EOFError, zlib.error):
+        return None
+
+
+def _is_text(data):
+    return data is not None and b"\0" not in data[:TEXT_PROBE]
+
+
+def _only_in(iteration, path):
+    directory, name = os.path.split(path)
+    return "Only in %s: %s" % (os.path.join(iteration, directory) if directory else iteration, name)
+
+
+def work(ica_dir, prev, iteration, logdir):
+    """Write the ICA report of prev versus iteration; return the number of differences."""
+    old = read_manifest(os.path.join(ica_dir, prev + ".manifest"))
+    new = read_manifest(os.path.join(ica_dir, iteration + ".manifest"))
+    differ, only_old, only_new = compare(old, new)
+    objects = os.path.join(ica_dir, "objects")
+    keep_dir = os.path.join(ica_dir, "%sV%s" % (prev, iteration))
+
+    binary, text_diffs = [], []
+    for path in differ:
+        a, b = old[path], new[path]
+        pair = "%s/%s and %s/%s" % (prev, path, iteration, path)
+        if a.type == b.type == "l":
+            binary.append("Symbolic links %s differ (-> %s, -> %s)" % (pair, a.digest, b.digest))
+            continue
+        if a.type != "f" or b.type != "f" or a.digest == b.digest:
+            binary.append("Files %s differ in type or mode (%s %o, %s %o)" % (pair, a.type, a.mode, b.type, b.mode))
+            continue
+        contents = []
+        for it, e in ((prev, a), (iteration, b)):
+            obj = _object(objects, e.digest)
+            kept = os.path.join(keep_dir, it, path)
+            try:
+                os.makedirs(os.path.dirname(kept), exist_ok=True)
+                if not os.path.lexists(kept):
+                    os.link(obj, kept)
+            except OSError:
+                contents.append(None)
+                continue
+            # Objects are links of the live files, so one rewritten in place
+            # since its scan no longer holds the scanned content
+            st = os.stat(kept)
+            unchanged = e.inode.split(":")[2:] == [str(st.st_size), str(st.st_mtime_ns)]
+            contents.append(_read(kept, e.norm) if unchanged else None)
+        if all(_is_text(c) for c in contents):
+            lines = difflib.unified_diff(contents[0].decode("utf-8", "replace").splitlines(True),
+                                         contents[1].decode("utf-8", "replace").splitlines(True),
+                                         "%s/%s" % (prev, path), "%s/%s" % (iteration, path))
+            text_diffs.append("diff -ur %s/%s %s/%s\n" % (prev, path, iteration, path) + "".join(lines))
+        else:
+            note = "" if all(c is not None for c in contents) else " (content not kept)"
+            binary.append("Binary files %s differ%s" % (pair, note))
+
+    os.makedirs(logdir, exist_ok=True)
+    with open(os.path.join(logdir, "REPORT.%sV%s" % (prev, iteration)), "w", encoding="utf-8",
+              errors="surrogateescape") as f:
+        f.write("The list of binary files that differ:\n\n")
+        f.write("".join(line + "\n" for line in binary))
+        f.write("The list of files that exist \"only in\" 1 of the directories:\n\n")
+        only = [_only_in(prev, p) for p in only_old] + [_only_in(iteration, p) for p in only_new]
+        f.write("".join(line + "\n" for line in only) if only else "NONE\n")
+    with open(os.path.join(logdir, "%sV%s.ASCII.DIFF" % (prev, iteration)), "w", encoding="utf-8",
+              errors="surrogateescape") as f:
+        f.write("".join(text_diffs))
+
+    # Only the current iteration's objects are needed for the next comparison
+    wanted = {e.digest for e in new.values() if e.type == "f"}
+    for sub in os.listdir(objects) if os.path.isdir(objects) else ():
+        for name in os.listdir(os.path.join(objects, sub)):
+            if name not in wanted:
+                os.unlink(os.path.join(objects, sub, name))
+    return len(differ) + len(only_old) + len(only_new)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manifest based jhalfs ICA")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("scan", help="Write the manifest of an iteration")
+    p.add_argument("root")
+    p.add_argument("ica_dir")
+    p.add_argument("iteration")
+    p.add_argument("--prune", action="append", default=[],
+                   help="Directory to leave out (space separated lists are split)")
+    p.add_argument("--exclude-name", action="append", default=[], help="File or directory name to leave out")
+    p.add_argument("--jobs", type=int, help="Hashing threads (default: CPU count)")
+    p = sub.add_parser("compare", help="Write the ICA report of two iterations")
+    p.add_argument("ica_dir")
+    p.add_argument("prev")
+    p.add_argument("iteration")
+    p.add_argument("logdir")
+    args = parser.parse_args(argv)
+
+    if args.command == "scan":
+        prune = [d for item in args.prune for d in item.split()]
+        print("Scanning %s for %s ..." % (args.root, args.iteration))
+        entries, rehashed = scan(args.root, args.ica_dir, args.iteration, prune, args.exclude_name, args.jobs)
+        print("%d files, %d hashed, %d reused" % (len(entries), rehashed,
+                                                  sum(e.type == "f" for e in entries.values()) - rehashed))
+        return 0
+
+    print("Generating ICA analysis report %s versus %s ..." % (args.prev, args.iteration))
+    count = work(args.ica_dir, args.prev, args.iteration, args.logdir)
+    print("%d differences" % count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
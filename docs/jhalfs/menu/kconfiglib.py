@@ -454,6 +454,10 @@ Some optional warnings can be controlled via environment variables:
     This warning can also be enabled/disabled via the Kconfig.warn_assign_undef
     variable.
 
+  - KCONFIG_SNAPSHOT: If set, gives the default for the 'snapshot' argument to
+    Kconfig.__init__(): a file where the parsed configuration is cached, so
+    that later runs skip parsing. See Kconfig.__init__().
+
 
 Preprocessor user functions defined in Python
 ---------------------------------------------
@@ -536,8 +540,10 @@ Send bug reports, suggestions, and questions to ulfalizer a.t Google's email
 service, or open a ticket on the GitHub page.
 """
 import errno
+import hashlib
 import importlib
 import os
+import pickle
 import re
 import sys
 
@@ -790,6 +796,7 @@ class Kconfig(object):
       loaded matters.
     """
     __slots__ = (
+        "_batch_depth",
         "_encoding",
         "_functions",
         "_set_match",
@@ -843,7 +850,7 @@ class Kconfig(object):
     #
 
     def __init__(self, filename="Kconfig", warn=True, warn_to_stderr=True,
-                 encoding="utf-8"):
+                 encoding="utf-8", snapshot=None):
         """
         Creates a new Kconfig object by parsing Kconfig files.
         Note that Kconfig files are not the same as .config files (which store
@@ -903,6 +910,27 @@ class Kconfig(object):
           anyway.
 
           Related PEP: https://www.python.org/dev/peps/pep-0538/
+
+        snapshot (default: $KCONFIG_SNAPSHOT, or None):
+          Path of a snapshot file caching the parsed configuration. If the
+          file is valid, the symbol, choice, and menu node graph is loaded
+          from it and no Kconfig file is parsed. Otherwise, the Kconfig files
+          are parsed as usual and the snapshot is (re)written.
+
+          A snapshot is valid if it was written by the same Kconfiglib and
+          Python versions for the same 'filename', 'warn', and 'encoding',
+          every Kconfig file that was parsed is unchanged (same mtime and
+          size, or same contents), and every environment variable referenced
+          during parsing (see Kconfig.env_vars), plus $srctree, $CONFIG_,
+          and the KCONFIG_* variables affecting parsing, has the same value.
+
+          Gotchas: files added later that would match a globbing 'source'
+          are not noticed, and neither are changed $(shell,...) outputs
+          unless one of the referenced environment variables changed as
+          well. Delete the snapshot file when in doubt.
+
+          Warnings generated while parsing are stored in the snapshot and
+          printed again when it is loaded (if 'warn_to_stderr' is True).
         """
         self.srctree = os.environ.get("srctree", "")
         # A prefix we can reliably strip from glob() results to get a filename
@@ -926,6 +954,8 @@ class Kconfig(object):
             os.environ.get("KCONFIG_WARN_UNDEF_ASSIGN") == "y"
         self.warn_assign_override = self.warn_assign_redun = True
 
+        # Nesting depth of Kconfig.batch() blocks
+        self._batch_depth = 0
 
         self._encoding = encoding
 
@@ -984,6 +1014,11 @@ class Kconfig(object):
         except ImportError:
             pass
 
+        if snapshot is None:
+            snapshot = os.environ.get("KCONFIG_SNAPSHOT") or None
+        if snapshot and self._load_snapshot(snapshot, filename, warn):
+            return
+
 
         # This is used to determine whether previously unseen symbols should be
         # registered. They shouldn't be if we parse expressions after parsing,
@@ -1080,6 +1115,9 @@ class Kconfig(object):
 
         self.mainmenu_text = self.top_node.prompt[0]
 
+        if snapshot:
+            self._write_snapshot(snapshot, filename)
+
     @property
     def defconfig_filename(self):
         """
@@ -1186,7 +1224,8 @@ class Kconfig(object):
 
         # This stub only exists to make sure _warn_no_prompt gets reenabled
         try:
-            self._load_config(filename, replace)
+            with self.batch():
+                self._load_config(filename, replace)
         except UnicodeDecodeError as e:
             _decoding_error(e, filename)
         finally:
@@ -1891,6 +1930,66 @@ class Kconfig(object):
         finally:
             self._warn_no_prompt = True
 
+    def batch(self):
+        """
+        Returns a context manager that defers the recalculation of dependent
+        symbols until the end of the block:
+
+            with kconf.batch():
+                for name, val in assignments:
+                    kconf.syms[name].set_value(val)
+
+        Normally, each Symbol/Choice.set_value() and unset_value() call
+        invalidates the cached values of everything that depends on the
+        symbol, which costs a lot when values are read in between or when
+        hundreds of assignments are made. Within a batch, assignments only
+        record user values, and all values are invalidated once when the
+        outermost batch ends. Kconfig.load_config() and set_values() use a
+        batch internally.
+
+        Symbol and choice values read inside the block can be stale. Read
+        them after the block instead.
+        """
+        return _Batch(self)
+
+    def set_values(self, values):
+        """
+        Assigns many user values in one batch (see Kconfig.batch()) and
+        reports the outcome.
+
+        values:
+          A mapping (or iterable of pairs) from symbol names to values, in the
+          format accepted by Symbol.set_value(). Names may include the
+          configuration prefix (usually "CONFIG_").
+
+        Returns a dictionary that maps each name to a (requested, effective)
+        tuple. 'requested' is the requested value, with tristate values given
+        as "n"/"m"/"y". 'effective' is the resulting Symbol.str_value, or None
+        if the symbol is undefined or the value is invalid for its type.
+        Symbols where the two differ had their value limited by dependencies,
+        selects, or a choice.
+        """
+        if hasattr(values, "items"):
+            values = values.items()
+
+        assigned = []
+        with self.batch():
+            for name, val in values:
+                if name not in self.syms and \
+                   name.startswith(self.config_prefix):
+                    name = name[len(self.config_prefix):]
+
+                sym = self.syms.get(name)
+                ok = sym is not None and sym.nodes and sym.set_value(val)
+                assigned.append((name, val, sym if ok else None))
+
+        report = {}
+        for name, val, sym in assigned:
+            report[name] = (TRI_TO_STR.get(val, val) if val.__class__ is int
+                                else val,
+                            sym.str_value if sym else None)
+        return report
+
     def enable_warnings(self):
         """
         Do 'Kconfig.warn = True' instead. Maintained for backwards
@@ -2172,6 +2271,104 @@ class Kconfig(object):
             # notice it later
             return False
 
+    #
+    # Snapshots
+    #
+
+    def _snapshot_key(self, filename, warn, env_vars):
+        # Everything besides the Kconfig files themselves that the parsed
+        # configuration depends on
+
+        return {
+            "kconfiglib": VERSION,
+            "python": sys.version_info[:2],
+            "filename": filename,
+            "warn": warn,
+            "encoding": self._encoding,
+            "srctree": self.srctree,
+            "env": dict((name, os.environ.get(name)) for name in
+                        sorted(set(env_vars) | set(_SNAPSHOT_ENV_VARS))),
+        }
+
+    def _load_snapshot(self, path, filename, warn):
+        # Populates the instance from the snapshot at 'path'. Returns False,
+        # leaving the instance untouched, if the snapshot is missing, stale,
+        # or unreadable.
+
+        if sys.version_info[0] < 3:
+            return False
+
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+                    return False
+
+                header = pickle.load(f)
+                if header["key"] != self._snapshot_key(
+                        filename, warn, header["key"]["env"]):
+                    return False
+
+                for name, mtime, size, digest in header["files"]:
+                    st = os.stat(name)
+                    if (st.st_mtime_ns, st.st_size) != (mtime, size) and \
+                       _file_digest(name) != digest:
+                        return False
+
+                objs, states, kconf_state = _SnapshotUnpickler(f, self).load()
+        except Exception:
+            # Any problem with the snapshot just means a regular parse
+            return False
+
+        for obj, state in zip(objs, states):
+            for attr, val in state.items():
+                setattr(obj, attr, val)
+        for attr, val in kconf_state.items():
+            setattr(self, attr, val)
+
+        if self.warn_to_stderr:
+            for msg in self.warnings:
+                sys.stderr.write(msg + "\n")
+
+        return True
+
+    def _write_snapshot(self, path, filename):
+        # Saves the freshly parsed configuration to 'path'. Failing to write
+        # the snapshot is not an error.
+
+        if sys.version_info[0] < 3:
+            return
+
+        files = []
+        for name in _ordered_unique(self.kconfig_filenames):
+            name = join(self.srctree, name)
+            st = os.stat(name)
+            files.append((name, st.st_mtime_ns, st.st_size,
+                          _file_digest(name)))
+
+        header = {
+            "key": self._snapshot_key(filename, self.warn, self.env_vars),
+            "files": files,
+        }
+
+        # Objects are pickled as empty shells first and have their state
+        # filled in afterwards. Pickling them directly would recurse along
+        # MenuNode.next chains, which are thousands of nodes long for the
+        # Linux kernel.
+        objs = _snapshot_objects(self)
+        payload = (objs, [_snapshot_state(obj) for obj in objs],
+                   _snapshot_state(self, _SNAPSHOT_SKIP))
+
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_SNAPSHOT_MAGIC)
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                _SnapshotPickler(f, self).dump(payload)
+            os.replace(tmp, path)
+        except (IOError, OSError, pickle.PicklingError):
+            if exists(tmp):
+                os.remove(tmp)
+
     #
     # Tokenization
     #
@@ -4694,6 +4891,10 @@ class Symbol(object):
     def _rec_invalidate(self):
         # Invalidates the symbol and all items that (possibly) depend on it
 
+        if self.kconfig._batch_depth:
+            # Kconfig.batch() invalidates everything once at the end
+            return
+
         if self is self.kconfig.modules:
             # Invalidating MODULES has wide-ranging effects
             self.kconfig._invalidate_all()
@@ -5260,6 +5461,9 @@ class Choice(object):
     def _rec_invalidate(self):
         # See Symbol._rec_invalidate()
 
+        if self.kconfig._batch_depth:
+            return
+
         self._invalidate()
 
         for item in self._dependents:
@@ -5766,6 +5970,22 @@ class InternalError(Exception):
     "Never raised. Kept around for backwards compatibility."
 
 
+class _Batch(object):
+    # Context manager returned by Kconfig.batch()
+
+    def __init__(self, kconf):
+        self._kconf = kconf
+
+    def __enter__(self):
+        self._kconf._batch_depth += 1
+        return self._kconf
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._kconf._batch_depth -= 1
+        if not self._kconf._batch_depth:
+            self._kconf._invalidate_all()
+
+
 # Workaround:
 #
 # If 'errno' and 'strerror' are set on IOError, then __str__() always returns
@@ -6547,6 +6767,83 @@ def _decoding_error(e, filename, macro_linenr=None):
             e.reason))
 
 
+def _file_digest(filename):
+    # Returns the SHA-256 hex digest of the contents of 'filename'
+
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _snapshot_state(obj, skip=()):
+    # Returns a dict with the set __slots__ attributes of 'obj'
+
+    state = {}
+    for attr in obj.__slots__:
+        if attr not in skip and hasattr(obj, attr):
+            state[attr] = getattr(obj, attr)
+    return state
+
+
+def _snapshot_objects(kconf):
+    # Returns all Symbol, Choice, MenuNode, and Variable instances reachable
+    # from 'kconf', found without recursion
+
+    seen = set()
+    objs = []
+    stack = list(_snapshot_state(kconf, _SNAPSHOT_SKIP).values())
+    while stack:
+        val = stack.pop()
+        if isinstance(val, _SNAPSHOT_CLASSES):
+            if id(val) not in seen:
+                seen.add(id(val))
+                objs.append(val)
+                stack.extend(_snapshot_state(val).values())
+        elif isinstance(val, (tuple, list, set, frozenset)):
+            stack.extend(val)
+        elif isinstance(val, dict):
+            stack.extend(val)
+            stack.extend(val.values())
+    return objs
+
+
+def _snapshot_new(cls):
+    # Creates an empty instance of 'cls' when loading a snapshot. The state is
+    # filled in later.
+
+    return cls.__new__(cls)
+
+
+def _snapshot_reduce(obj):
+    return (_snapshot_new, (obj.__class__,))
+
+
+class _SnapshotPickler(pickle.Pickler):
+    # Pickles Symbol, Choice, MenuNode, and Variable instances as empty shells
+    # and the Kconfig instance as a reference
+
+    def __init__(self, f, kconf):
+        pickle.Pickler.__init__(self, f, pickle.HIGHEST_PROTOCOL)
+        self.dispatch_table = dict((cls, _snapshot_reduce)
+                                   for cls in _SNAPSHOT_CLASSES)
+        self._kconf = kconf
+
+    def persistent_id(self, obj):
+        return "kconfig" if obj is self._kconf else None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    # Resolves the Kconfig reference to the instance being loaded
+
+    def __init__(self, f, kconf):
+        pickle.Unpickler.__init__(self, f)
+        self._kconf = kconf
+
+    def persistent_load(self, pid):
+        if pid != "kconfig":
+            raise pickle.UnpicklingError("unknown reference " + repr(pid))
+        return self._kconf
+
+
 def _warn_verbose_deprecated(fn_name):
     sys.stderr.write(
         "Deprecation warning: {0}()'s 'verbose' argument has no effect. Since "
@@ -6976,3 +7273,31 @@ _name_special_search = _re_search(r'[^$A-Za-z0-9_/.-]|\$\(|$')
 # A valid right-hand side for an assignment to a string symbol in a .config
 # file, including escaped characters. Extracts the contents.
 _conf_string_match = _re_match(r'"((?:[^\\"]|\\.)*)"')
+
+# Snapshot file format. Bump the version when the pickled layout changes.
+_SNAPSHOT_MAGIC = b"KCONFIGLIB-SNAPSHOT-1\n"
+
+# Environment variables that affect parsing, besides Kconfig.env_vars
+_SNAPSHOT_ENV_VARS = (
+    "CONFIG_",
+    "KCONFIG_FUNCTIONS",
+    "KCONFIG_STRICT",
+    "KCONFIG_WARN_UNDEF",
+    "KCONFIG_WARN_UNDEF_ASSIGN",
+)
+
+# Kconfig attributes that are not stored in snapshots, because __init__()
+# sets them up before loading one or because they only matter while parsing
+_SNAPSHOT_SKIP = (
+    "_encoding",
+    "_filestack",
+    "_functions",
+    "_readline",
+    "_set_match",
+    "_unset_match",
+    "warn",
+    "warn_assign_undef",
+    "warn_to_stderr",
+)
+
+_SNAPSHOT_CLASSES = (Symbol, Choice, MenuNode, Variable)
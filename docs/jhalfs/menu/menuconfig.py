@@ -1992,6 +1992,7 @@ def _jump_to_dialog():
 
     s = ""  # Search text
     prev_s = None  # Previous search text
+    prev_words = None  # Search words behind 'match_entries', if usable
     s_i = 0  # Search text cursor position
     hscroll = 0  # Horizontal scroll offset
 
@@ -2017,6 +2018,10 @@ def _jump_to_dialog():
 
     _safe_curs_set(2)
 
+    # Cache of the strings shown for matches. Values can't change while the
+    # dialog is open, so this is only reset between invocations.
+    node_strs = {}
+
     # Logic duplication with _select_{next,prev}_menu_entry(), except we do a
     # functional variant that returns the new (sel_node_i, scroll) values to
     # avoid 'nonlocal'. TODO: Can this be factored out in some nice way?
@@ -2047,55 +2052,29 @@ def _jump_to_dialog():
 
             prev_s = s
 
+            # We could use re.IGNORECASE here instead of lower(), but this is
+            # noticeably less jerky while inputting regexes like '.*debug$'
+            # (though the '.*' is redundant there). Those probably have bad
+            # interactions with re.search(), which matches anywhere in the
+            # string.
+            #
+            # It's not horrible either way. Just a bit smoother.
+            words = s.lower().split()
+
+            # When the search only got more specific (typically by typing
+            # more characters), only the previous matches can match, so
+            # filter them instead of the whole index
+            if _narrows_search(prev_words, words):
+                entries = match_entries
+            else:
+                entries = _search_index()
+
             try:
-                # We could use re.IGNORECASE here instead of lower(), but this
-                # is noticeably less jerky while inputting regexes like
-                # '.*debug$' (though the '.*' is redundant there). Those
-                # probably have bad interactions with re.search(), which
-                # matches anywhere in the string.
-                #
-                # It's not horrible either way. Just a bit smoother.
-                regex_searches = [re.compile(regex).search
-                                  for regex in s.lower().split()]
+                match_entries = _search_entries(words, entries)
 
                 # No exception thrown, so the regexes are okay
                 bad_re = None
-
-                # List of matching nodes
-                matches = []
-                add_match = matches.append
-
-                # Search symbols and choices
-
-                for node in _sorted_sc_nodes():
-                    # Symbol/choice
-                    sc = node.item
-
-                    for search in regex_searches:
-                        # Both the name and the prompt might be missing, since
-                        # we're searching both symbols and choices
-
-                        # Does the regex match either the symbol name or the
-                        # prompt (if any)?
-                        if not (sc.name and search(sc.name.lower()) or
-                                node.prompt and search(node.prompt[0].lower())):
-
-                            # Give up on the first regex that doesn't match, to
-                            # speed things up a bit when multiple regexes are
-                            # entered
-                            break
-
-                    else:
-                        add_match(node)
-
-                # Search menus and comments
-
-                for node in _sorted_menu_comment_nodes():
-                    for search in regex_searches:
-                        if not search(node.prompt[0].lower()):
-                            break
-                    else:
-                        add_match(node)
+                prev_words = words
 
             except re.error as e:
                 # Bad regex. Remember the error message so we can show it.
@@ -2104,14 +2083,18 @@ def _jump_to_dialog():
                 if hasattr(e, "msg"):
                     bad_re += ": " + e.msg
 
-                matches = []
+                match_entries = []
+                prev_words = None
+
+            # List of matching nodes
+            matches = [entry[0] for entry in match_entries]
 
             # Reset scroll and jump to the top of the list of matches
             sel_node_i = scroll = 0
 
         _draw_jump_to_dialog(edit_box, matches_win, bot_sep_win, help_win,
                              s, s_i, hscroll,
-                             bad_re, matches, sel_node_i, scroll)
+                             bad_re, matches, sel_node_i, scroll, node_strs)
         curses.doupdate()
 
 
@@ -2216,6 +2199,111 @@ def _sorted_menu_comment_nodes(cached_nodes=[]):
     return cached_nodes
 
 
+def _search_index(cached_index=[]):
+    # Returns the list of (node, texts, joined) tuples searched by the jump-to
+    # dialog, in the order from _sorted_sc_nodes() and
+    # _sorted_menu_comment_nodes(). 'texts' holds the lowercased symbol/choice
+    # name and prompt (or menu/comment prompt), and 'joined' the same strings
+    # joined with newlines, for quick substring searches. Names and prompts
+    # never change, so this is built once, like the node lists.
+
+    if not cached_index:
+        for node in _sorted_sc_nodes():
+            texts = tuple(text.lower() for text in
+                          (node.item.name, node.prompt and node.prompt[0])
+                          if text)
+            cached_index.append((node, texts, "\n".join(texts)))
+
+        for node in _sorted_menu_comment_nodes():
+            text = node.prompt[0].lower()
+            cached_index.append((node, (text,), text))
+
+    return cached_index
+
+
+def _is_literal_search(word):
+    # True if the search word 'word' has no special regex characters, so that
+    # it can be searched for as a plain substring
+
+    return re.escape(word) == word
+
+
+def _narrows_search(prev_words, words):
+    # True if everything matching the search words 'words' also matched
+    # 'prev_words'. That holds when each previous word is a literal substring
+    # of the new word in the same position (e.g. 'us' -> 'usb'), with any
+    # extra words only narrowing things down further. Regexes aren't
+    # analyzed, since e.g. 'ab' -> 'ab?' matches more.
+
+    if prev_words is None or len(words) < len(prev_words):
+        return False
+
+    for prev_word, word in zip(prev_words, words):
+        if not (_is_literal_search(prev_word) and
+                _is_literal_search(word) and
+                prev_word in word):
+            return False
+
+    return True
+
+
+def _search_entries(words, entries):
+    # Returns the entries from 'entries' (see _search_index()) where every
+    # search word matches the symbol/choice name or prompt (or menu/comment
+    # prompt). Literal words are looked up directly in the joined texts, which
+    # is a lot faster than a regex search per text. Raises re.error for bad
+    # regexes.
+
+    literals = []
+    regex_searches = []
+    for word in words:
+        if _is_literal_search(word):
+            literals.append(word)
+        else:
+            regex_searches.append(re.compile(word).search)
+
+    res = []
+    add_match = res.append
+
+    for entry in entries:
+        joined = entry[2]
+        for word in literals:
+            if word not in joined:
+                # Give up on the first word that doesn't match, to speed
+                # things up a bit when multiple words are entered
+                break
+        else:
+            for search in regex_searches:
+                # Both the name and the prompt might be missing, since we're
+                # searching both symbols and choices
+                for text in entry[1]:
+                    if search(text):
+                        break
+                else:
+                    break
+            else:
+                add_match(entry)
+
+    return res
+
+
+def _jump_to_str(node):
+    # Returns the string shown for 'node' in the list of matches in the jump-to
+    # dialog
+
+    if isinstance(node.item, (Symbol, Choice)):
+        node_str = _name_and_val_str(node.item)
+        if node.prompt:
+            node_str += ' "{}"'.format(node.prompt[0])
+        return node_str
+
+    if node.item == MENU:
+        return 'menu "{}"'.format(node.prompt[0])
+
+    # node.item == COMMENT
+    return 'comment "{}"'.format(node.prompt[0])
+
+
 def _resize_jump_to_dialog(edit_box, matches_win, bot_sep_win, help_win,
                            sel_node_i, scroll):
     # Resizes the jump-to dialog to fill the terminal.
@@ -2259,7 +2347,7 @@ def _resize_jump_to_dialog(edit_box, matches_win, bot_sep_win, help_win,
 
 def _draw_jump_to_dialog(edit_box, matches_win, bot_sep_win, help_win,
                          s, s_i, hscroll,
-                         bad_re, matches, sel_node_i, scroll):
+                         bad_re, matches, sel_node_i, scroll, node_strs):
 
     edit_width = _width(edit_box) - 2
 
@@ -2276,14 +2364,9 @@ def _draw_jump_to_dialog(edit_box, matches_win, bot_sep_win, help_win,
 
             node = matches[i]
 
-            if isinstance(node.item, (Symbol, Choice)):
-                node_str = _name_and_val_str(node.item)
-                if node.prompt:
-                    node_str += ' "{}"'.format(node.prompt[0])
-            elif node.item == MENU:
-                node_str = 'menu "{}"'.format(node.prompt[0])
-            else:  # node.item == COMMENT
-                node_str = 'comment "{}"'.format(node.prompt[0])
+            node_str = node_strs.get(node)
+            if node_str is None:
+                node_str = node_strs[node] = _jump_to_str(node)
 
             _safe_addstr(matches_win, i - scroll, 0, node_str,
                          _style["selection" if i == sel_node_i else "list"])
@@ -12,6 +12,9 @@ shopt -s extdebug
 # Configure bash debugging output
 export PS4='+(${BASH_SOURCE}:${LINENO}): ${FUNCNAME[0]:+${FUNCNAME[0]}(): }'
 
+# Repository root, used to locate the Python helpers in src/
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
 # Source environment if available
 if [[ -f "$(dirname "$0")/lfs-builder.env" ]]; then
     source "$(dirname "$0")/lfs-builder.env"
@@ -22,9 +25,12 @@ LOG_PATH="${LOG_PATH:-/lfs-build/logs/build.log}"
 LOG_DIR=$(dirname "$LOG_PATH")
 mkdir -p "$LOG_DIR"
 
-# Logging function that writes to both console and log file
+# Logging function that writes to both console and log file. The log stays
+# open on one descriptor, so a message costs two builtin writes, not a fork.
+exec {LOG_FD}>>"$LOG_PATH"
 log_output() {
-    echo -e "$1" | tee -a "$LOG_PATH"
+    printf '%b\n' "$1"
+    printf '%b\n' "$1" >&"$LOG_FD"
 }
 
 # Default configuration
@@ -39,18 +45,76 @@ ISO_VOLUME="${ISO_VOLUME:-AUTO_LFS}"
 ISO_OUTPUT="${ISO_OUTPUT:-${LFS_WORKSPACE}/auto-lfs.iso}"
 JHALFS_CONFIG="${JHALFS_CONFIG:-/lfs-build/jhalfs/configuration}"
 
-# Load jhalfs configuration if available
+# Generate the jhalfs configuration from Config.in, an optional profile of
+# option overrides and JHALFS_OPT_<NAME> variables instead of a static file
+JHALFS_GENERATE_CONFIG="${JHALFS_GENERATE_CONFIG:-false}"
+JHALFS_PROFILE="${JHALFS_PROFILE:-}"
+if [[ "$JHALFS_GENERATE_CONFIG" == "true" ]]; then
+    JHALFS_CONFIG="${LFS_WORKSPACE}/jhalfs/configuration"
+    if ! PYTHONPATH="$SCRIPT_DIR/src" python3 -m parsers.jhalfs_config \
+            ${JHALFS_PROFILE:+--profile "$JHALFS_PROFILE"} --output "$JHALFS_CONFIG" >>"$LOG_PATH" 2>&1; then
+        log_output "[ERROR] Could not generate the jhalfs configuration, see $LOG_PATH"
+        exit 1
+    fi
+fi
+
+# The jhalfs configuration is read by jhalfs itself. It is not sourced
+# here: it refers to variables such as $LANG that may be unset, and its
+# globals (BUILDDIR, LOGDIR, ...) belong to jhalfs, not to this script.
 if [[ -f "$JHALFS_CONFIG" ]]; then
-    log_output "[INFO] Loading jhalfs config from $JHALFS_CONFIG"
-    # shellcheck disable=SC1090
-    source "$JHALFS_CONFIG"
+    log_output "[INFO] Using jhalfs config $JHALFS_CONFIG"
 else
     log_output "[WARNING] jhalfs config not found: $JHALFS_CONFIG"
 fi
 
+# Chapter 10 kernel: KERNEL_CONFIG is a .config to build, or empty for the
+# minimal configuration of BUILD_PROFILE
+BUILD_KERNEL="${BUILD_KERNEL:-false}"
+KERNEL_CONFIG="${KERNEL_CONFIG:-}"
+KERNEL_CACHE_DIR="${KERNEL_CACHE_DIR:-${LFS_WORKSPACE}/kernel-cache}"
+
 # Default verbose setting
 VERBOSE="${VERBOSE:-true}"
 
+# Fetch large tarballs as parallel HTTP range segments
+SEGMENTED_DOWNLOADS="${SEGMENTED_DOWNLOADS:-true}"
+
+# Download sources in build order in the background; each build step only
+# waits for its own tarballs
+PREFETCH_SOURCES="${PREFETCH_SOURCES:-true}"
+PREFETCH_JOBS="${PREFETCH_JOBS:-3}"
+PREFETCH_READY_DIR="${PREFETCH_READY_DIR:-${LFS_WORKSPACE}/sources/.ready}"
+PREFETCH_PID=""
+
+# Verbose make output goes to per-package, rotated and compressed logs
+# instead of build.log
+LOG_SIDECAR="${LOG_SIDECAR:-true}"
+PACKAGE_LOG_DIR="${PACKAGE_LOG_DIR:-${LOG_DIR}/packages}"
+
+# Per-package resource telemetry (JSON lines)
+TELEMETRY_ENABLED="${TELEMETRY_ENABLED:-true}"
+TELEMETRY_FILE="${TELEMETRY_FILE:-${LOG_DIR}/telemetry.jsonl}"
+
+# Live progress and ETA from book SBUs calibrated on this host
+BUILD_PLAN="${LOG_DIR}/build-plan.txt"
+BUILD_STATUS="${BUILD_STATUS:-${LOG_DIR}/build-status.json}"
+SBU_CALIBRATION="${SBU_CALIBRATION:-${LOG_DIR}/sbu-calibration.json}"
+
+# Chrome/Perfetto timeline: begin/end events per package and stage, rendered
+# to build-trace.json when the build ends
+TRACE_ENABLED="${TRACE_ENABLED:-true}"
+TRACE_EVENTS="${LOG_DIR}/trace-events.jsonl"
+TRACE_FILE="${TRACE_FILE:-${LOG_DIR}/build-trace.json}"
+
+# node_exporter textfile with progress, durations, cache and PSI metrics,
+# rewritten every METRICS_INTERVAL seconds (empty disables the exporter)
+METRICS_TEXTFILE="${METRICS_TEXTFILE:-}"
+METRICS_INTERVAL="${METRICS_INTERVAL:-15}"
+METRICS_PID=""
+
+# Per-package timings of every finished build, for cross-run comparison
+PERF_HISTORY_DB="${PERF_HISTORY_DB:-${LOG_DIR}/perf-history.sqlite}"
+
 # Colors for output
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -76,6 +140,15 @@ wget_download() {
     local url="$1"
     local filename=$(basename "$url")
     echo "[DOWNLOAD] Starting download of $filename from $url"
+    if [[ -n "${SOURCE_STORE:-}" ]] && command -v python3 >/dev/null 2>&1 &&
+        PYTHONPATH="$SCRIPT_DIR/src" python3 -m sources.source_store --root "$SOURCE_STORE" \
+            fetch "$url" -o "$filename" >>"$LOG_PATH" 2>&1; then
+        return 0
+    fi
+    if [[ "$SEGMENTED_DOWNLOADS" == "true" ]] && command -v python3 >/dev/null 2>&1 &&
+        PYTHONPATH="$SCRIPT_DIR/src" python3 -m sources.segmented_download "$url" -o "$filename" >>"$LOG_PATH" 2>&1; then
+        return 0
+    fi
     if [[ "$VERBOSE" == "true" ]]; then
         wget "$url" --progress=bar:force --tries=3 --timeout=60 2>&1 | tee -a "$LOG_PATH"
     else
@@ -83,19 +156,129 @@ wget_download() {
     fi
 }
 
-# Enhanced make build function with timing and verbose output
+# Append a trace event: phase (B/E), span name, package[, exit status].
+# Builtins only, so tracing costs no fork.
+trace_event() {
+    [[ "$TRACE_ENABLED" == "true" ]] || return 0
+    local now="${EPOCHREALTIME:-}"
+    now="${now//[!0-9]/}"
+    [[ -n "$now" ]] || now="$(date +%s%6N)"
+    printf '{"ph":"%s","name":"%s","package":"%s","ts":%s,"status":%s}\n' \
+        "$1" "$2" "$3" "$now" "${4:-0}" >>"$TRACE_EVENTS"
+}
+
+# Run a command as a traced stage of a package: trace_stage STAGE PACKAGE CMD...
+trace_stage() {
+    local stage=$1 package=$2 status=0
+    shift 2
+    trace_event B "$stage" "$package"
+    "$@" || status=$?
+    trace_event E "$stage" "$package" "$status"
+    return $status
+}
+
+# Write the Chrome/Perfetto trace from the recorded events
+render_trace() {
+    [[ "$TRACE_ENABLED" == "true" && -s "$TRACE_EVENTS" ]] || return 0
+    PYTHONPATH="$SCRIPT_DIR/src" python3 -m telemetry.build_trace \
+        --events "$TRACE_EVENTS" \
+        --fetch-stats "$PREFETCH_READY_DIR/fetch-stats.jsonl" \
+        --output "$TRACE_FILE" >>"$LOG_PATH" 2>&1 || true
+}
+
+# Enhanced make build function with timing and verbose output. With
+# telemetry enabled, make runs under the resource collector, which appends
+# wall/CPU time, peak RSS, I/O and context switches to $TELEMETRY_FILE.
 make_build() {
     local start_time=$(date +%s)
+    local package="${PWD#"$LFS_WORKSPACE/sources/"}"
+    package="${package%%/*}"
+    local -a runner=()
+    if [[ "$TELEMETRY_ENABLED" == "true" ]] && command -v python3 >/dev/null 2>&1; then
+        runner=(env PYTHONPATH="$SCRIPT_DIR/src" python3 -m telemetry.resource_collector
+                --package "$package" --phase make --output "$TELEMETRY_FILE" --)
+    fi
     echo "[BUILD] Starting make with arguments: $*"
-    if [[ "$VERBOSE" == "true" ]]; then
+    trace_event B make "$package"
+    if [[ "$VERBOSE" == "true" && "$LOG_SIDECAR" == "true" ]] && command -v python3 >/dev/null 2>&1; then
+        log_info "make output for $package: $PACKAGE_LOG_DIR/$package.*.log"
+        MAKEFLAGS="${MAKEFLAGS} V=1 VERBOSE=1" \
+        "${runner[@]}" make -j"$PARALLEL_JOBS" --debug=v "$@" 2>&1 |
+            PYTHONPATH="$SCRIPT_DIR/src" python3 -m telemetry.log_sidecar write \
+                --package "$package" --dir "$PACKAGE_LOG_DIR" --echo
+    elif [[ "$VERBOSE" == "true" ]]; then
         MAKEFLAGS="${MAKEFLAGS} V=1 VERBOSE=1" \
-        make -j"$PARALLEL_JOBS" --debug=v "$@" 2>&1 | tee -a "$LOG_PATH"
+        "${runner[@]}" make -j"$PARALLEL_JOBS" --debug=v "$@" 2>&1 | tee -a "$LOG_PATH"
     else
-        make -j"$PARALLEL_JOBS" "$@"
+        "${runner[@]}" make -j"$PARALLEL_JOBS" "$@"
     fi
+    trace_event E make "$package"
     local end_time=$(date +%s)
     local build_time=$((end_time - start_time))
     echo "[BUILD] Completed in ${build_time}s"
+    report_progress
+}
+
+# Packages built under make_build, in build order, with their book SBU keys
+write_build_plan() {
+    cat >"$BUILD_PLAN" <<EOF
+binutils-2.42 binutils-tmpp1
+gcc-13.2.0 gcc-tmpp1
+glibc-2.39 glibc-tmp
+bash-5.2.21 bash-tmp
+coreutils-9.4 coreutils-tmp
+make-4.4.1 make-tmp
+sed-4.9 sed-tmp
+tar-1.35 tar-tmp
+gawk-5.3.0 gawk-tmp
+findutils-4.9.0 findutils-tmp
+grep-3.11 grep-tmp
+gzip-1.13 gzip-tmp
+util-linux-2.41.1 util-linux-tmp
+EOF
+}
+
+# Log percent complete and the time remaining; the status file is what
+# monitors read
+report_progress() {
+    [[ "$TELEMETRY_ENABLED" == "true" && -f "$BUILD_PLAN" ]] || return 0
+    local summary
+    if summary=$(PYTHONPATH="$SCRIPT_DIR/src" python3 -m telemetry.sbu_eta \
+            --plan "$BUILD_PLAN" --telemetry "$TELEMETRY_FILE" --jobs "$PARALLEL_JOBS" \
+            --calibration "$SBU_CALIBRATION" --output "$BUILD_STATUS" \
+            --history "$PERF_HISTORY_DB" 2>>"$LOG_PATH"); then
+        log_info "[ETA] $summary"
+    fi
+}
+
+# Export build metrics for Prometheus in the background for the whole build
+start_metrics_exporter() {
+    [[ -n "$METRICS_TEXTFILE" ]] && command -v python3 >/dev/null 2>&1 || return 0
+    PYTHONPATH="$SCRIPT_DIR/src" python3 -m telemetry.prom_metrics \
+        --output "$METRICS_TEXTFILE" \
+        --status "$BUILD_STATUS" \
+        --telemetry "$TELEMETRY_FILE" \
+        --fetch-stats "$PREFETCH_READY_DIR/fetch-stats.jsonl" \
+        --jobs "$PARALLEL_JOBS" \
+        --label "profile=$BUILD_PROFILE" \
+        --interval "$METRICS_INTERVAL" \
+        --pid $$ >>"$LOG_PATH" 2>&1 &
+    METRICS_PID=$!
+    log_info "Writing build metrics to $METRICS_TEXTFILE every ${METRICS_INTERVAL}s"
+}
+
+# Store this build's timings and report packages that got slower than the
+# rolling baseline of comparable earlier builds
+record_performance() {
+    [[ "$TELEMETRY_ENABLED" == "true" && -s "$TELEMETRY_FILE" ]] || return 0
+    local history=(env PYTHONPATH="$SCRIPT_DIR/src" python3 -m telemetry.perf_history --db "$PERF_HISTORY_DB")
+    "${history[@]}" record --telemetry "$TELEMETRY_FILE" --jobs "$PARALLEL_JOBS" \
+        --flags "${CFLAGS:-}" --label "$BUILD_PROFILE" >>"$LOG_PATH" 2>&1 || return 0
+    local status=0
+    "${history[@]}" perf-compare >>"$LOG_PATH" 2>&1 || status=$?
+    if [[ $status -eq 1 ]]; then
+        log_warning "Some packages built slower than in earlier runs (see perf-compare in $LOG_PATH)"
+    fi
 }
 
 # Logging functions
@@ -114,6 +297,13 @@ CLEANUP_RUN=false
 cleanup() {
     local status=$1
     trap - ERR EXIT
+    if [[ -n "$PREFETCH_PID" ]]; then
+        kill "$PREFETCH_PID" 2>/dev/null || true
+    fi
+    if [[ -n "$METRICS_PID" ]]; then
+        kill "$METRICS_PID" 2>/dev/null || true
+    fi
+    render_trace
     if [[ $status -ne 0 ]]; then
         log_error "Build interrupted or failed (status: $status)"
         log_info "Cleaning up..."
@@ -226,11 +416,24 @@ download_packages() {
         "https://www.kernel.org/pub/linux/utils/util-linux/v2.41/util-linux-2.41.1.tar.xz"
     )
     
+    # The list above is in build order: hand it to the prefetcher and let the
+    # build steps start as soon as their own sources are verified
+    if [[ "$PREFETCH_SOURCES" == "true" ]] && command -v python3 >/dev/null 2>&1; then
+        PYTHONPATH="$SCRIPT_DIR/src" python3 -m sources.prefetch fetch \
+            --dest "$LFS_WORKSPACE/sources" \
+            --ready-dir "$PREFETCH_READY_DIR" \
+            --jobs "$PREFETCH_JOBS" \
+            "${packages[@]}" >>"$LOG_PATH" 2>&1 &
+        PREFETCH_PID=$!
+        log_info "Prefetching ${#packages[@]} packages in build order (pid $PREFETCH_PID)"
+        return 0
+    fi
+    
     for package in "${packages[@]}"; do
         local filename=$(basename "$package")
         if [[ ! -f "$filename" ]]; then
             log_info "Downloading $filename"
-            if ! wget_download "$package"; then
+            if ! trace_stage download "$filename" wget_download "$package"; then
                 log_error "Failed to download $package"
                 exit 1
             fi
@@ -242,6 +445,28 @@ download_packages() {
     log_success "Package download completed"
 }
 
+# Block until the given source files have been prefetched and verified
+wait_for_sources() {
+    [[ -n "$PREFETCH_PID" ]] || return 0
+    log_info "Waiting for sources: $*"
+    PYTHONPATH="$SCRIPT_DIR/src" python3 -m sources.prefetch wait \
+        --ready-dir "$PREFETCH_READY_DIR" \
+        --pid "$PREFETCH_PID" \
+        "$@"
+}
+
+# Reap the background prefetcher once every build step has its sources
+finish_prefetch() {
+    [[ -n "$PREFETCH_PID" ]] || return 0
+    if ! wait "$PREFETCH_PID"; then
+        PREFETCH_PID=""
+        log_error "Background package download failed (see $LOG_PATH)"
+        exit 1
+    fi
+    PREFETCH_PID=""
+    log_success "Package download completed"
+}
+
 # Build cross-compilation tools
 build_cross_tools() {
     log_phase "Building Cross-Compilation Tools"
@@ -250,12 +475,14 @@ build_cross_tools() {
     
     # Build binutils (cross-compiler)
     log_info "Building binutils (cross-compiler)"
-    tar -xf binutils-2.42.tar.xz
+    wait_for_sources binutils-2.42.tar.xz
+    trace_event B package binutils-2.42
+    trace_stage extract binutils-2.42 tar -xf binutils-2.42.tar.xz
     cd binutils-2.42
     mkdir -v build
     cd build
     
-    ../configure --prefix="$LFS/tools" \
+    trace_stage configure binutils-2.42 ../configure --prefix="$LFS/tools" \
                  --with-sysroot="$LFS" \
                  --target="$LFS_TGT" \
                  --disable-nls \
@@ -263,14 +490,17 @@ build_cross_tools() {
                  --disable-werror
     
     make_build
-    make install
+    trace_stage install binutils-2.42 make install
     
     cd "$LFS_WORKSPACE/sources"
     rm -rf binutils-2.42
+    trace_event E package binutils-2.42
     
     # Build GCC (cross-compiler)
     log_info "Building GCC (cross-compiler)"
-    tar -xf gcc-13.2.0.tar.xz
+    wait_for_sources gcc-13.2.0.tar.xz mpfr-4.2.1.tar.xz gmp-6.3.0.tar.xz mpc-1.3.1.tar.gz
+    trace_event B package gcc-13.2.0
+    trace_stage extract gcc-13.2.0 tar -xf gcc-13.2.0.tar.xz
     cd gcc-13.2.0
     
     tar -xf ../mpfr-4.2.1.tar.xz 2>/dev/null || true
@@ -283,7 +513,7 @@ build_cross_tools() {
     mkdir -v build
     cd build
     
-    ../configure \
+    trace_stage configure gcc-13.2.0 ../configure \
         --target="$LFS_TGT" \
         --prefix="$LFS/tools" \
         --with-glibc-version=2.39 \
@@ -305,10 +535,11 @@ build_cross_tools() {
         --enable-languages=c,c++
     
     make_build
-    make install
+    trace_stage install gcc-13.2.0 make install
     
     cd "$LFS_WORKSPACE/sources"
     rm -rf gcc-13.2.0
+    trace_event E package gcc-13.2.0
     
     log_success "Cross-compilation tools built"
 }
@@ -319,16 +550,19 @@ build_kernel_headers() {
     
     cd "$LFS_WORKSPACE/sources"
     
-    tar -xf linux-6.7.4.tar.xz
+    wait_for_sources linux-6.7.4.tar.xz
+    trace_event B package linux-6.7.4
+    trace_stage extract linux-6.7.4 tar -xf linux-6.7.4.tar.xz
     cd linux-6.7.4
     
     make mrproper
-    run_verbose make headers
+    trace_stage make linux-6.7.4 run_verbose make headers
     find usr/include -type f ! -name '*.h' -delete
-    cp -rv usr/include "$LFS/usr"
+    trace_stage install linux-6.7.4 cp -rv usr/include "$LFS/usr"
     
     cd "$LFS_WORKSPACE/sources"
     rm -rf linux-6.7.4
+    trace_event E package linux-6.7.4
     
     log_success "Kernel headers installed"
 }
@@ -339,7 +573,9 @@ build_glibc() {
     
     cd "$LFS_WORKSPACE/sources"
     
-    tar -xf glibc-2.39.tar.xz
+    wait_for_sources glibc-2.39.tar.xz
+    trace_event B package glibc-2.39
+    trace_stage extract glibc-2.39 tar -xf glibc-2.39.tar.xz
     cd glibc-2.39
     
     mkdir -v build
@@ -347,7 +583,7 @@ build_glibc() {
     
     echo "rootsbindir=/usr/sbin" > configparms
     
-    ../configure \
+    trace_stage configure glibc-2.39 ../configure \
         --prefix=/usr \
         --host="$LFS_TGT" \
         --build=$(../scripts/config.guess) \
@@ -359,13 +595,14 @@ build_glibc() {
         libc_cv_cpp_explicit_max_align=yes
     
     make_build
-    make DESTDIR="$LFS" install
+    trace_stage install glibc-2.39 make DESTDIR="$LFS" install
     
     # Fix symlink
     sed '/RTLDLIST=/s@/usr@@g' -i "$LFS/usr/bin/ldd"
     
     cd "$LFS_WORKSPACE/sources"
     rm -rf glibc-2.39
+    trace_event E package glibc-2.39
     
     log_success "Glibc built and installed"
 }
@@ -395,29 +632,32 @@ build_core_tools() {
         
         log_info "Building $name-$version"
         
-        tar -xf "$tool"
+        wait_for_sources "$tool"
+        trace_event B package "$name-$version"
+        trace_stage extract "$name-$version" tar -xf "$tool"
         cd "$name-$version"
         
         case "$name" in
             "bash")
-                ./configure --prefix=/usr --host="$LFS_TGT" --without-bash-malloc
+                trace_stage configure "$name-$version" ./configure --prefix=/usr --host="$LFS_TGT" --without-bash-malloc
                 make_build
-                make DESTDIR="$LFS" install
+                trace_stage install "$name-$version" make DESTDIR="$LFS" install
                 ;;
             "coreutils")
-                ./configure --prefix=/usr --host="$LFS_TGT" --enable-install-program=hostname
+                trace_stage configure "$name-$version" ./configure --prefix=/usr --host="$LFS_TGT" --enable-install-program=hostname
                 make_build
-                make DESTDIR="$LFS" install
+                trace_stage install "$name-$version" make DESTDIR="$LFS" install
                 ;;
             *)
-                ./configure --prefix=/usr --host="$LFS_TGT"
+                trace_stage configure "$name-$version" ./configure --prefix=/usr --host="$LFS_TGT"
                 make_build
-                make DESTDIR="$LFS" install
+                trace_stage install "$name-$version" make DESTDIR="$LFS" install
                 ;;
         esac
         
         cd "$LFS_WORKSPACE/sources"
         rm -rf "$name-$version"
+        trace_event E package "$name-$version"
     done
     
     log_success "Core tools built"
@@ -551,6 +791,23 @@ EOF
     fi
 }
 
+# Build the chapter 10 kernel out of tree, reusing the build directory and
+# cached artifacts of earlier runs (see src/builders/kernel_builder.sh)
+build_kernel() {
+    [[ "$BUILD_KERNEL" == "true" ]] || return 0
+    log_phase "Building Linux Kernel"
+
+    wait_for_sources linux-6.7.4.tar.xz
+    if ! PARALLEL_JOBS="$PARALLEL_JOBS" BUILD_PROFILE="$BUILD_PROFILE" KERNEL_CACHE_DIR="$KERNEL_CACHE_DIR" \
+        trace_stage build linux "$SCRIPT_DIR/src/builders/kernel_builder.sh" \
+        "$LFS_WORKSPACE/sources/linux-6.7.4.tar.xz" "${KERNEL_CONFIG:--}" "$LFS" >>"$LOG_PATH" 2>&1; then
+        log_error "Kernel build failed (see $LOG_PATH)"
+        exit 1
+    fi
+
+    log_success "Kernel installed to $LFS/boot"
+}
+
 # Create boot configuration
 create_boot_config() {
     log_phase "Creating Boot Configuration"
@@ -644,18 +901,27 @@ main() {
     log_info "Networking Enabled: $NETWORKING_ENABLED"
     log_info "Create ISO: $CREATE_ISO"
     echo
-    
+
+    # Telemetry and trace events describe this build only; earlier runs are
+    # kept in the performance history
+    : >"$TELEMETRY_FILE"
+    : >"$TRACE_EVENTS"
+
     # Build steps
     validate_environment
     setup_lfs_environment
+    write_build_plan
+    start_metrics_exporter
     download_packages
     build_cross_tools
     build_kernel_headers
     build_glibc
     build_core_tools
+    finish_prefetch
     configure_system
     install_networking
     install_gnome
+    build_kernel
     create_boot_config
     finalize_system
     create_system_image
@@ -668,6 +934,8 @@ main() {
     local minutes=$(((build_time % 3600) / 60))
     local seconds=$((build_time % 60))
     
+    record_performance
+
     log_phase "Build Complete!"
     log_success "Total build time: ${hours}h ${minutes}m ${seconds}s"
     log_success "LFS system built at: $LFS"
@@ -7,47 +7,31 @@ YELLOW='\033[1;33m'
 BLUE='\033[0;34m'
 NC='\033[0m'
 
-# Monitor function
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+BUILD_ROOT="${BUILD_ROOT:-/mnt/lfs/Auto-LFS-Builder}"
+LOG_FILE="${LOG_FILE:-${BUILD_ROOT}/logs/build.log}"
+LOG_DIR=$(dirname "$LOG_FILE")
+WORKSPACE="${LFS_WORKSPACE:-${BUILD_ROOT}/workspace}"
+
+# Monitor function. The log is followed incrementally (inotify, saved
+# offset) and disk usage comes from statfs, so the monitor never walks the
+# workspace or competes with the build for I/O.
 monitor_build() {
-    local log_file="/mnt/lfs/Auto-LFS-Builder/logs/build.log"
-    local disk_used=0
-    local prev_disk_used=0
-    local start_time=$(date +%s)
+    if ! command -v python3 >/dev/null 2>&1; then
+        echo -e "${RED}python3 is required for the build monitor${NC}" >&2
+        exit 1
+    fi
 
     echo -e "${BLUE}=== Build Monitor Started ===${NC}"
-    echo -e "${BLUE}Watching log file: ${log_file}${NC}"
+    echo -e "${BLUE}Watching log file: ${LOG_FILE}${NC}"
     echo
 
-    while true; do
-        # Print recent log entries
-        if [[ -f "$log_file" ]]; then
-            tail -n 5 "$log_file" | while read -r line; do
-                echo -e "$line"
-            done
-        fi
-
-        # Calculate disk usage
-        if [[ -d "/mnt/lfs/Auto-LFS-Builder/workspace" ]]; then
-            disk_used=$(du -s "/mnt/lfs/Auto-LFS-Builder/workspace" | cut -f1)
-            if [[ $disk_used -ne $prev_disk_used ]]; then
-                echo -e "${YELLOW}Disk usage: $(numfmt --to=iec-i --suffix=B $((disk_used*1024)))${NC}"
-                prev_disk_used=$disk_used
-            fi
-        fi
-
-        # Calculate elapsed time
-        local current_time=$(date +%s)
-        local elapsed=$((current_time - start_time))
-        local hours=$((elapsed / 3600))
-        local minutes=$(((elapsed % 3600) / 60))
-        local seconds=$((elapsed % 60))
-
-        echo -e "${BLUE}Elapsed time: ${hours}h ${minutes}m ${seconds}s${NC}"
-        echo -e "${BLUE}---${NC}"
-
-        sleep 5
-        clear
-    done
+    exec env PYTHONPATH="$SCRIPT_DIR/src" python3 -m telemetry.build_monitor \
+        --log "$LOG_FILE" \
+        --workspace "$WORKSPACE" \
+        --telemetry "${TELEMETRY_FILE:-${LOG_DIR}/telemetry.jsonl}" \
+        --status "${BUILD_STATUS:-${LOG_DIR}/build-status.json}" \
+        --state-dir "${LOG_DIR}/.monitor"
 }
 
 # Start monitoring
@@ -5,6 +5,10 @@
 
 set -euo pipefail
 
+# Python helpers live in src/ next to this scripts/ directory
+DOWNLOAD_SRC_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../src" && pwd)"
+export DOWNLOAD_SRC_DIR
+
 # Enhanced logging functions for verbose output
 log_download() {
     echo -e "${CYAN:-\033[0;36m}[DOWNLOAD]${NC:-\033[0m} $*"
@@ -18,6 +22,76 @@ log_checksum() {
     echo -e "${GREEN:-\033[0;32m}[CHECKSUM]${NC:-\033[0m} $*"
 }
 
+# Fetch large tarballs as parallel HTTP range segments. Interrupted segments
+# resume independently from a .part.state sidecar. Returns non-zero when
+# python3 is unavailable or the transfer failed so callers fall back to wget/curl.
+segmented_download() {
+    local url="$1"
+    local filename="$2"
+
+    [[ "${SEGMENTED_DOWNLOADS:-true}" == "true" ]] || return 1
+    command -v python3 >/dev/null 2>&1 || return 1
+
+    if [[ "${VERBOSE:-false}" == "true" ]]; then
+        echo "Using segmented range download"
+    fi
+    PYTHONPATH="$DOWNLOAD_SRC_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+        python3 -m sources.segmented_download "$url" -o "$filename" >/dev/null
+}
+
+# Fetch through the host-wide content-addressed store when SOURCE_STORE is
+# set, so parallel builders download each tarball once and share one copy.
+store_download() {
+    local url="$1"
+    local filename="$2"
+    local checksum="${3:-}"
+
+    [[ -n "${SOURCE_STORE:-}" ]] || return 1
+    command -v python3 >/dev/null 2>&1 || return 1
+
+    if [[ "${VERBOSE:-false}" == "true" ]]; then
+        echo "Using shared source store at $SOURCE_STORE"
+    fi
+    PYTHONPATH="$DOWNLOAD_SRC_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+        python3 -m sources.source_store --root "$SOURCE_STORE" fetch "$url" -o "$filename" \
+        ${checksum:+--sha256 "$checksum"} >/dev/null
+}
+
+# Use an indexed source bundle (SOURCE_BUNDLE) as an offline mirror: a single
+# member is extracted with one seek and verified against the bundle index.
+bundle_extract() {
+    local filename="$1"
+
+    [[ -n "${SOURCE_BUNDLE:-}" && -f "${SOURCE_BUNDLE:-}" ]] || return 1
+    command -v python3 >/dev/null 2>&1 || return 1
+
+    PYTHONPATH="$DOWNLOAD_SRC_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+        python3 -m sources.source_bundle extract "$SOURCE_BUNDLE" "$filename" -C . >/dev/null 2>&1
+}
+
+# Unpack every member of SOURCE_BUNDLE into the current directory in one
+# sequential pass. Much faster than copying thousands of small files.
+seed_sources_from_bundle() {
+    [[ -n "${SOURCE_BUNDLE:-}" && -f "${SOURCE_BUNDLE:-}" ]] || return 1
+
+    echo "📦 Seeding sources from bundle $SOURCE_BUNDLE"
+    PYTHONPATH="$DOWNLOAD_SRC_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+        python3 -m sources.source_bundle extract "$SOURCE_BUNDLE" -C . >/dev/null
+}
+
+# Download and verify the book patches, then dry-run every patch against its
+# freshly extracted tree in parallel, so a patch mismatch is reported before
+# the build starts.
+precheck_patches() {
+    [[ "${PATCH_PRECHECK:-true}" == "true" ]] || return 0
+    command -v python3 >/dev/null 2>&1 || return 0
+
+    echo "🩹 Checking patches against their source trees..."
+    PYTHONPATH="$DOWNLOAD_SRC_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+        python3 -m sources.patch_precheck --sources . --download \
+        --book "${PATCH_BOOK:-$DOWNLOAD_SRC_DIR/../docs/lfs-git}"
+}
+
 # Package definitions with URLs and checksums (LFS 12.0 stable versions)
 declare -A PACKAGES=(
     # Core toolchain packages
@@ -173,6 +247,20 @@ download_package() {
             echo "Download attempt $download_attempts of $max_attempts"
         fi
         
+        if bundle_extract "$filename"; then
+            break
+        fi
+
+        if store_download "$url" "$filename" "${CHECKSUMS[$filename]:-}"; then
+            break
+        fi
+
+        # Prefer parallel range requests; small files and servers without
+        # range support are handled inside the helper with a single stream
+        if segmented_download "$url" "$filename"; then
+            break
+        fi
+
         # Use wget with comprehensive options
         if command -v wget >/dev/null 2>&1; then
             if [[ "${VERBOSE:-false}" == "true" ]]; then
@@ -261,9 +349,11 @@ download_packages_enhanced() {
         echo "Working directory: $(pwd)"
     fi
     
-    # Check internet connectivity
+    # Check internet connectivity (not needed when a source bundle is the mirror)
     echo "🌐 Checking internet connectivity..."
-    if ! ping -c 1 8.8.8.8 >/dev/null 2>&1; then
+    if [[ -n "${SOURCE_BUNDLE:-}" && -f "${SOURCE_BUNDLE:-}" ]]; then
+        echo "📦 Using offline source bundle: $SOURCE_BUNDLE"
+    elif ! ping -c 1 8.8.8.8 >/dev/null 2>&1; then
         echo "❌ No internet connectivity detected"
         return 1
     fi
@@ -338,6 +428,11 @@ download_packages_enhanced() {
         local total_size_mb=$((total_size / 1024 / 1024))
         echo "📏 Total download size: ${total_size_mb} MB"
         
+        if ! precheck_patches; then
+            echo "❌ Some patches do not apply to their sources"
+            return 1
+        fi
+        
         return 0
     fi
 }
@@ -414,7 +509,7 @@ check_missing_packages() {
 }
 
 # Export functions for use in main build script
-export -f download_packages_enhanced verify_checksum download_package list_packages verify_all_packages check_missing_packages
+export -f download_packages_enhanced verify_checksum download_package segmented_download store_download bundle_extract seed_sources_from_bundle precheck_patches list_packages verify_all_packages check_missing_packages
 export -f log_download log_verify log_checksum
 
 # If script is run directly, show usage
@@ -429,9 +524,16 @@ if [[ "${BASH_SOURCE[0]}" == "${0}" ]]; then
     echo "  list_packages              - List all available packages"
     echo "  verify_all_packages        - Verify checksums of downloaded packages"
     echo "  check_missing_packages     - Check for missing packages"
+    echo "  seed_sources_from_bundle   - Unpack SOURCE_BUNDLE into the current directory"
+    echo "  precheck_patches           - Dry-run all patches against their tarballs"
     echo ""
     echo "Environment variables:"
     echo "  VERBOSE=true               - Enable verbose logging"
     echo "  DEBUG=true                 - Enable debug logging"
     echo "  INTERACTIVE=false          - Disable interactive prompts"
+    echo "  SEGMENTED_DOWNLOADS=false  - Disable parallel range downloads"
+    echo "  DOWNLOAD_SEGMENTS=4        - Parallel segments per large tarball"
+    echo "  SOURCE_STORE=/path         - Share downloads through a host-wide store"
+    echo "  SOURCE_BUNDLE=/path        - Use an indexed source bundle as offline mirror"
+    echo "  PATCH_PRECHECK=false       - Skip the patch dry-run after downloading"
 fi
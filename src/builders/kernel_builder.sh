@@ -0,0 +1,186 @@
+#!/bin/bash
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+# Kernel Builder: chapter 10 kernel build with build-directory and artifact reuse
+#
+#   kernel_builder.sh LINUX_TARBALL KERNEL_CONFIG|- DESTDIR
+#
+# The kernel is built out of tree (make O=) in a build directory kept per
+# kernel version under $KERNEL_CACHE_DIR, so a changed .config only rebuilds
+# what it affects. Compiles go through ccache when it is installed. The
+# installed result (boot/ image, System.map and config, lib/modules/ and the
+# usr/include/ headers) is packaged as an artifact keyed by kernel version,
+# .config and compiler, and an unchanged kernel is installed straight from it.
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+source "$ROOT_DIR/src/common/logging.sh"
+source "$ROOT_DIR/src/common/error_handling.sh"
+
+KERNEL_CACHE_DIR="${KERNEL_CACHE_DIR:-${LFS_WORKSPACE:-/lfs-build/workspace}/kernel-cache}"
+# Share the build's job budget: a jobserver inherited from a parent make
+# wins, otherwise PARALLEL_JOBS
+KERNEL_JOBS="${KERNEL_JOBS:-${PARALLEL_JOBS:-$(nproc)}}"
+KERNEL_CCACHE="${KERNEL_CCACHE:-true}"
+KERNEL_CCACHE_MAXSIZE="${KERNEL_CCACHE_MAXSIZE:-5G}"
+# Artifacts kept, most recently used first
+KERNEL_ARTIFACTS_KEEP="${KERNEL_ARTIFACTS_KEEP:-4}"
+CC="${CC:-gcc}"
+
+# linux-6.7.4.tar.xz -> 6.7.4
+kernel_version() {
+    local name
+    name="$(basename "$1")"
+    name="${name#linux-}"
+    echo "${name%.tar*}"
+}
+
+# Hash of everything that changes the installed result besides the version
+config_key() {
+    local config="$1"
+    {
+        cat "$config"
+        "$CC" --version 2>/dev/null | head -n1
+        echo "${KERNEL_MAKE_ARGS:-}"
+    } | sha256sum | cut -c1-16
+}
+
+artifact_path() {
+    local version="$1" key="$2"
+    if command -v zstd >/dev/null 2>&1; then
+        echo "$KERNEL_CACHE_DIR/artifacts/linux-$version-$key.tar.zst"
+    else
+        echo "$KERNEL_CACHE_DIR/artifacts/linux-$version-$key.tar.gz"
+    fi
+}
+
+# Unpack the kernel source once per version
+prepare_source() {
+    local tarball="$1" src="$2"
+    [[ -f "$src/.extracted" ]] && return 0
+    log_info "Extracting $(basename "$tarball") to $src"
+    rm -rf "$src" "$src.tmp"
+    mkdir -p "$src.tmp"
+    tar -xf "$tarball" -C "$src.tmp" --strip-components=1
+    touch "$src.tmp/.extracted"
+    mv "$src.tmp" "$src"
+}
+
+# make in the persistent build directory, with ccache and the job budget
+kmake() {
+    local -a args=(-C "$KERNEL_SRC" O="$KERNEL_BUILD")
+    if [[ "${MAKEFLAGS:-}" != *jobserver* ]]; then
+        args+=(-j"$KERNEL_JOBS")
+    fi
+    if [[ "$KERNEL_CCACHE" == "true" ]] && command -v ccache >/dev/null 2>&1; then
+        args+=(CC="ccache $CC" HOSTCC="ccache ${HOSTCC:-gcc}")
+    fi
+    # shellcheck disable=SC2086
+    CCACHE_DIR="${CCACHE_DIR:-$KERNEL_CACHE_DIR/ccache}" \
+    CCACHE_BASEDIR="$KERNEL_CACHE_DIR" \
+    CCACHE_MAXSIZE="$KERNEL_CCACHE_MAXSIZE" \
+        make "${args[@]}" ${KERNEL_MAKE_ARGS:-} "$@"
+}
+
+# Build and stage the kernel, then package the staging tree as $artifact
+build_artifact() {
+    local config="$1" artifact="$2"
+    local stage="$KERNEL_BUILD.stage"
+
+    # Only replace .config when it changed, so make sees unchanged mtimes
+    if ! cmp -s "$config" "$KERNEL_BUILD/.config"; then
+        cp "$config" "$KERNEL_BUILD/.config"
+    fi
+    kmake olddefconfig
+    kmake
+
+    local release image
+    release="$(kmake -s --no-print-directory kernelrelease)"
+    image="$(kmake -s --no-print-directory image_name)"
+
+    rm -rf "$stage"
+    mkdir -p "$stage/boot" "$stage/usr"
+    cp "$KERNEL_BUILD/$image" "$stage/boot/vmlinuz-$release-lfs"
+    cp "$KERNEL_BUILD/System.map" "$stage/boot/System.map-$release"
+    cp "$KERNEL_BUILD/.config" "$stage/boot/config-$release"
+    if grep -q '^CONFIG_MODULES=y' "$KERNEL_BUILD/.config"; then
+        kmake INSTALL_MOD_PATH="$stage" INSTALL_MOD_STRIP=1 modules_install
+        rm -f "$stage/lib/modules/$release/build" "$stage/lib/modules/$release/source"
+    fi
+    kmake INSTALL_HDR_PATH="$stage/usr" headers_install
+
+    mkdir -p "$(dirname "$artifact")"
+    local -a compress=(-z)
+    [[ "$artifact" == *.zst ]] && compress=(-I "zstd -T0")
+    tar "${compress[@]}" -cf "$artifact.tmp" -C "$stage" .
+    mv "$artifact.tmp" "$artifact"
+    rm -rf "$stage"
+    log_success "Cached kernel $release as $(basename "$artifact")"
+}
+
+install_artifact() {
+    local artifact="$1" dest="$2"
+    local -a compress=(-z)
+    [[ "$artifact" == *.zst ]] && compress=(-I zstd)
+    mkdir -p "$dest"
+    # Keep /lib -> usr/lib style symlinks of the target in place
+    tar "${compress[@]}" -xf "$artifact" -C "$dest" --keep-directory-symlink --no-same-owner
+    touch "$artifact"
+}
+
+prune_artifacts() {
+    local dir="$KERNEL_CACHE_DIR/artifacts"
+    [[ -d "$dir" ]] || return 0
+    local -a artifacts=()
+    # shellcheck disable=SC2012
+    mapfile -t artifacts < <(ls -t "$dir")
+    local old
+    for old in "${artifacts[@]:KERNEL_ARTIFACTS_KEEP}"; do
+        log_info "Pruning kernel artifact $old"
+        rm -f "$dir/$old"
+    done
+}
+
+main() {
+    if [[ $# -ne 3 ]]; then
+        echo "Usage: $0 LINUX_TARBALL KERNEL_CONFIG|- DESTDIR" >&2
+        exit 2
+    fi
+    local tarball="$1" config="$2" dest="$3"
+    [[ -f "$tarball" ]] || handle_error "Kernel source not found: $tarball"
+    [[ "$config" == "-" || -f "$config" ]] || handle_error "Kernel configuration not found: $config"
+
+    local version key artifact
+    version="$(kernel_version "$tarball")"
+    KERNEL_SRC="$KERNEL_CACHE_DIR/src/linux-$version"
+    KERNEL_BUILD="$KERNEL_CACHE_DIR/build/linux-$version"
+    mkdir -p "$KERNEL_BUILD"
+
+    # One build per version at a time; the lock also covers the artifact
+    exec {lock_fd}>"$KERNEL_BUILD.lock"
+    flock "$lock_fd"
+
+    # "-": the minimal configuration for $BUILD_PROFILE from the books'
+    # kernel requirements
+    if [[ "$config" == "-" ]]; then
+        prepare_source "$tarball" "$KERNEL_SRC"
+        config="$KERNEL_BUILD.minimal.config"
+        PYTHONPATH="$ROOT_DIR/src" python3 -m parsers.kernel_requirements "$KERNEL_SRC" --output "$config"
+    fi
+    key="$(config_key "$config")"
+    artifact="$(artifact_path "$version" "$key")"
+
+    if [[ -f "$artifact" ]]; then
+        log_info "Kernel $version with config $key is cached, installing it"
+    else
+        log_info "Building kernel $version with config $key in $KERNEL_BUILD"
+        prepare_source "$tarball" "$KERNEL_SRC"
+        build_artifact "$config" "$artifact"
+    fi
+    install_artifact "$artifact" "$dest"
+    prune_artifacts
+    log_success "Kernel $version installed to $dest"
+}
+
+main "$@"
@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Read the XML entities of the LFS and BLFS books.
+
+Versions, URLs, checksums, SBUs and disk usage live in the books'
+``*.ent`` files as ``<!ENTITY name "value">`` declarations.
+:func:`load_entities` collects them, following ``<!ENTITY % name SYSTEM
+"file">`` includes, and :func:`expand` resolves ``&name;`` references in a
+value.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+_ENTITY_RE = re.compile(r'<!ENTITY\s+(%\s+)?([\w.-]+)\s+(SYSTEM\s+)?"([^"]*)"\s*>')
+_REF_RE = re.compile(r"&([\w.-]+);")
+
+
+def load_entities(path: str | Path, entities: dict[str, str] | None = None) -> dict[str, str]:
+    """Parse ``<!ENTITY>`` declarations from *path* and its ``SYSTEM`` includes."""
+
+    path = Path(path)
+    entities = {} if entities is None else entities
+    text = path.read_text(encoding="utf-8", errors="replace")
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
+    for param, name, system, value in _ENTITY_RE.findall(text):
+        if param and system:
+            include = path.parent / value
+            if include.exists():
+                load_entities(include, entities)
+        elif not param:
+            # First declaration wins, as in XML
+            entities.setdefault(name, value)
+    return entities
+
+
+def expand(text: str, entities: dict[str, str], depth: int = 10) -> str:
+    """Expand ``&name;`` references in *text* using *entities*."""
+
+    for _ in range(depth):
+        new = _REF_RE.sub(lambda m: entities.get(m.group(1), m.group(0)), text)
+        if new == text:
+            break
+        text = new
+    return text
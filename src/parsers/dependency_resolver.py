@@ -14,8 +14,15 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     BeautifulSoup = None
 
+try:
+    from . import instrumentation
+except ImportError:  # run as a script from src/parsers
+    import instrumentation
+
 DOCS_ROOT = Path(__file__).resolve().parents[2] / "docs"
 DEPENDENCY_XML = DOCS_ROOT / "lfs-git" / "appendices" / "dependencies.xml"
+BLFS_ROOT = DOCS_ROOT / "blfs-git"
+BLFS_ROLES = ("required", "recommended")
 
 
 def build_dependency_graph(packages: list[str], dependency_file: str | Path = DEPENDENCY_XML) -> dict[str, list[str]]:
@@ -26,8 +33,11 @@ def build_dependency_graph(packages: list[str], dependency_file: str | Path = DE
     if not dep_path.exists():
         return graph
 
-    text = dep_path.read_text(encoding="utf-8")
+    with instrumentation.document("build_dependency_graph", dep_path):
+        return _fill_graph(graph, packages, dep_path.read_text(encoding="utf-8"))
+
 
+def _fill_graph(graph: dict[str, list[str]], packages: list[str], text: str) -> dict[str, list[str]]:
     if BeautifulSoup:
         soup = BeautifulSoup(text, "xml")
 
@@ -72,6 +82,32 @@ def build_dependency_graph(packages: list[str], dependency_file: str | Path = DE
     return graph
 
 
+def build_blfs_graph(book_root: str | Path = BLFS_ROOT, roles: tuple[str, ...] = BLFS_ROLES) -> dict[str, list[str]]:
+    """Create a dependency graph of the BLFS book at *book_root*.
+
+    Every page is keyed by the id of its ``sect1``; its dependencies are the
+    ``xref`` targets in the ``<para role="...">`` lists named in *roles*.
+    """
+
+    graph: dict[str, list[str]] = {}
+    role_re = re.compile(
+        rf"<para\s+role=[\"'](?:{'|'.join(map(re.escape, roles))})[\"']\s*>(.*?)</para>", re.DOTALL
+    )
+    for path in sorted(Path(book_root).rglob("*.xml")):
+        with instrumentation.document("build_blfs_graph", path):
+            text = path.read_text(encoding="utf-8", errors="replace")
+            m = re.search(r"<sect1\s+id=[\"']([^\"']+)[\"']", text)
+            if not m:
+                continue
+            deps: list[str] = []
+            for block in role_re.findall(text):
+                for dep in re.findall(r"<xref\s+linkend=[\"']([^\"']+)[\"']", block):
+                    if dep not in deps:
+                        deps.append(dep)
+            graph[m.group(1)] = deps
+    return graph
+
+
 def topological_sort(graph: dict[str, list[str]]) -> list[str]:
     """Perform a topological sort of *graph* returning the build order."""
 
@@ -100,10 +136,13 @@ def topological_sort(graph: dict[str, list[str]]) -> list[str]:
 def _cli() -> None:
     parser = argparse.ArgumentParser(description="Resolve package dependencies")
     parser.add_argument("packages", nargs="+", help="Package names to resolve")
+    instrumentation.add_arguments(parser)
     args = parser.parse_args()
 
-    graph = build_dependency_graph(args.packages)
-    order = topological_sort(graph)
+    with instrumentation.session("dependency_resolver", args):
+        graph = build_dependency_graph(args.packages)
+        with instrumentation.stage("topological_sort"):
+            order = topological_sort(graph)
     for pkg in order:
         print(pkg)
 
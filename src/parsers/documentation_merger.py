@@ -10,6 +10,11 @@ from pathlib import Path
 import subprocess
 import sys
 
+try:
+    from . import instrumentation
+except ImportError:  # run as a script from src/parsers
+    import instrumentation
+
 
 def merge_sources(sources: list[str | Path]) -> str:
     """Return the concatenation of all files in *sources*."""
@@ -19,7 +24,8 @@ def merge_sources(sources: list[str | Path]) -> str:
         path = Path(src)
         if not path.exists():
             continue
-        contents.append(path.read_text(encoding="utf-8"))
+        with instrumentation.document("merge_sources", path):
+            contents.append(path.read_text(encoding="utf-8"))
     return "\n".join(contents)
 
 
@@ -66,15 +72,15 @@ def _cli() -> None:
         action="store_true",
         help="Update documentation repositories before processing",
     )
+    instrumentation.add_arguments(parser)
     args = parser.parse_args()
 
-    if args.update_docs:
-        update_documentation()
-        if not args.files:
-            return
-
-    if args.files:
-        merged = merge_sources(args.files)
+    with instrumentation.session("documentation_merger", args):
+        if args.update_docs:
+            with instrumentation.stage("update_docs"):
+                update_documentation()
+        merged = merge_sources(args.files) if args.files else None
+    if merged is not None:
         print(merged)
 
 
@@ -0,0 +1,214 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Opt-in timing and profiling for the documentation parsers.
+
+Instrumentation is off unless ``PARSER_PROFILE`` is set (``1`` or
+``timing`` for timings, ``cprofile`` to also profile) or a parser is run
+with ``--profile`` or ``--cprofile``.  When on, each parser records
+per-stage and per-file wall time and cache hits and misses, prints the
+slowest documents when it exits, and writes ``<name>.json`` (plus
+``<name>.pstats`` when profiling) to ``PARSER_PROFILE_DIR``.
+``python3 -m parsers.instrumentation summary`` merges those files into one
+report for a whole regeneration run.  When off, the hooks reduce to a flag
+check.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+ENV_VAR = "PARSER_PROFILE"
+DIR_ENV_VAR = "PARSER_PROFILE_DIR"
+DEFAULT_DIR = Path("logs/parsing_logs/profile")
+DEFAULT_TOP = 10
+
+
+class Recorder:
+    """Collected timings of one parser process."""
+
+    def __init__(self, enabled: bool = False, profile: bool = False, out_dir: str | Path = DEFAULT_DIR):
+        self.enabled = enabled
+        self.profile = profile
+        self.out_dir = Path(out_dir)
+        self.stages: dict[str, float] = {}
+        self.files: list[tuple[str, str, float]] = []
+        self.cache: dict[str, list[int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "Recorder":
+        mode = os.environ.get(ENV_VAR, "").lower()
+        enabled = mode not in ("", "0", "false", "no")
+        return cls(enabled, mode == "cprofile", os.environ.get(DIR_ENV_VAR, DEFAULT_DIR))
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_file(self, stage: str, path: str | Path, seconds: float) -> None:
+        self.files.append((stage, str(path), seconds))
+
+    def cache_event(self, name: str, hit: bool) -> None:
+        counts = self.cache.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "files": [{"stage": s, "path": p, "seconds": round(t, 6)} for s, p, t in self.files],
+            "cache": {name: {"hits": h, "misses": m} for name, (h, m) in self.cache.items()},
+        }
+
+
+recorder = Recorder.from_env()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as pipeline stage *name*."""
+
+    if not recorder.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add_stage(name, time.perf_counter() - start)
+
+
+@contextmanager
+def document(stage_name: str, path: str | Path) -> Iterator[None]:
+    """Time the enclosed block as the parse of *path* within *stage_name*."""
+
+    if not recorder.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        recorder.add_file(stage_name, path, elapsed)
+        recorder.add_stage(stage_name, elapsed)
+
+
+def track_file(stage_name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate a function whose first argument is a document path."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(path: Any, *args: Any, **kwargs: Any) -> Any:
+            if not recorder.enabled:
+                return func(path, *args, **kwargs)
+            with document(stage_name, path):
+                return func(path, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def cache_event(name: str, hit: bool) -> None:
+    """Count a hit or miss of cache *name*."""
+
+    if recorder.enabled:
+        recorder.cache_event(name, hit)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add ``--profile``, ``--cprofile`` and ``--profile-dir`` to a parser CLI."""
+
+    parser.add_argument("--profile", action="store_const", const="timing",
+                        help="Record stage and per-file timings")
+    parser.add_argument("--cprofile", dest="profile", action="store_const", const="cprofile",
+                        help="Record timings and dump cProfile stats")
+    parser.add_argument("--profile-dir", help=f"Where timing and pstats files go (default {DEFAULT_DIR})")
+
+
+@contextmanager
+def session(name: str, args: argparse.Namespace | None = None) -> Iterator[Recorder]:
+    """Run a parser CLI body under instrumentation named *name*."""
+
+    if args is not None and getattr(args, "profile", None):
+        recorder.enabled = True
+        recorder.profile = recorder.profile or args.profile == "cprofile"
+    if args is not None and getattr(args, "profile_dir", None):
+        recorder.out_dir = Path(args.profile_dir)
+    if not recorder.enabled:
+        yield recorder
+        return
+
+    profiler = cProfile.Profile() if recorder.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        with stage("total"):
+            yield recorder
+    finally:
+        if profiler:
+            profiler.disable()
+        recorder.out_dir.mkdir(parents=True, exist_ok=True)
+        (recorder.out_dir / f"{name}.json").write_text(json.dumps(recorder.to_dict(), indent=2))
+        if profiler:
+            profiler.dump_stats(str(recorder.out_dir / f"{name}.pstats"))
+        print(format_summary({name: recorder.to_dict()}), file=sys.stderr)
+
+
+def format_summary(reports: dict[str, dict[str, Any]], top: int = DEFAULT_TOP) -> str:
+    """Render stage totals, cache counts and the *top* slowest documents."""
+
+    lines = ["Parser timings:"]
+    for name, report in sorted(reports.items()):
+        for stage_name, seconds in sorted(report["stages"].items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<22} {stage_name:<28} {seconds:9.3f}s")
+    caches = [(f"{n}:{c}", v) for n, r in reports.items() for c, v in r.get("cache", {}).items()]
+    if caches:
+        lines.append("Cache hits/misses:")
+        for cache_name, counts in sorted(caches):
+            lines.append(f"  {cache_name:<51} {counts['hits']:>5}/{counts['misses']}")
+    files = sorted((f for r in reports.values() for f in r["files"]), key=lambda f: -f["seconds"])
+    if files:
+        lines.append(f"Slowest documents (top {min(top, len(files))} of {len(files)}):")
+        for entry in files[:top]:
+            lines.append(f"  {entry['seconds']:9.3f}s  {entry['stage']:<24} {entry['path']}")
+    return "\n".join(lines)
+
+
+def load_reports(directory: str | Path) -> dict[str, dict[str, Any]]:
+    """Read every ``<name>.json`` timing file in *directory*."""
+
+    reports = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            reports[path.stem] = json.loads(path.read_text())
+        except ValueError:
+            continue
+    return reports
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Summarize parser timing files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="Merge timing files into one report")
+    summary.add_argument("directory", nargs="?", default=os.environ.get(DIR_ENV_VAR, str(DEFAULT_DIR)))
+    summary.add_argument("--top", type=int, default=DEFAULT_TOP, help="Number of slowest documents")
+    args = parser.parse_args()
+
+    reports = load_reports(args.directory)
+    if not reports:
+        print(f"No timing files in {args.directory}", file=sys.stderr)
+        sys.exit(1)
+    print(format_summary(reports, args.top))
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,194 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Write jhalfs ``configuration`` files from ``Config.in`` without curses.
+
+jhalfs normally gets its configuration from ``make menuconfig``.  This tool
+loads ``docs/jhalfs/Config.in`` with kconfiglib, applies overrides and
+writes the same file menuconfig would.  Overrides are applied in this
+order, later ones winning:
+
+1. ``--base``, an existing configuration file, loaded as menuconfig would,
+2. ``--profile`` files listing the options to change, in the configuration
+   format (``NAME=value`` lines and ``# NAME is not set``),
+3. ``JHALFS_OPT_<NAME>`` environment variables,
+4. ``--set NAME=value`` options.
+
+Every override must name a defined option and take effect; otherwise the
+tool explains what blocks it (see :mod:`kconfig_query`), does not write
+that configuration and exits with status 1.  ``--variant NAME=PROFILE``
+writes one configuration per profile from a single parse::
+
+    PYTHONPATH=src python3 -m parsers.jhalfs_config --profile sysv.conf \\
+        --set N_PARALLEL=8 --output config/jhalfs/configuration
+    PYTHONPATH=src python3 -m parsers.jhalfs_config --variant sysv=sysv.conf \\
+        --variant systemd=systemd.conf --output 'build/jhalfs/{name}/configuration'
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Mapping
+
+try:
+    from . import kconfig_query
+except ImportError:
+    import kconfig_query  # run as a script from src/parsers
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+JHALFS_DIR = REPO_ROOT / "docs" / "jhalfs"
+CONFIG_IN = JHALFS_DIR / "Config.in"
+KCONFIGLIB_DIR = JHALFS_DIR / "menu"
+DEFAULT_OUTPUT = REPO_ROOT / "config" / "jhalfs" / "configuration"
+ENV_PREFIX = "JHALFS_OPT_"
+HEADER = "# Generated by parsers.jhalfs_config from Config.in\n"
+
+
+class JhalfsConfigError(Exception):
+    """Raised for unknown options or overrides that do not take effect."""
+
+
+def read_configuration(path: str | Path) -> dict[str, str]:
+    """Return the option values set in a jhalfs ``configuration`` file."""
+
+    values = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line.startswith("# ") and line.endswith(" is not set"):
+            values[line[2:-len(" is not set")]] = "n"
+            continue
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        name, _, value = line.partition("=")
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+        values[name.strip()] = value
+    return values
+
+
+def env_overrides(environ: Mapping[str, str] = os.environ) -> dict[str, str]:
+    """The ``JHALFS_OPT_<NAME>`` overrides in *environ*."""
+
+    return {key[len(ENV_PREFIX):]: value for key, value in environ.items()
+            if key.startswith(ENV_PREFIX) and len(key) > len(ENV_PREFIX)}
+
+
+class JhalfsConfig:
+    """``Config.in`` parsed once, configured any number of times."""
+
+    def __init__(self, config_in: str | Path = CONFIG_IN, snapshot: str | Path | None = None):
+        if str(KCONFIGLIB_DIR) not in sys.path:
+            sys.path.insert(0, str(KCONFIGLIB_DIR))
+        kconfiglib = importlib.import_module("kconfiglib")
+
+        config_in = Path(config_in).resolve()
+        # jhalfs' configuration has no CONFIG_ prefix (see its Makefile)
+        os.environ["CONFIG_"] = ""
+        os.environ["srctree"] = str(config_in.parent)
+        try:
+            self.kconf = kconfiglib.Kconfig(str(config_in), warn=False,
+                                            snapshot=str(snapshot) if snapshot else None)
+        except (OSError, kconfiglib.KconfigError) as exc:
+            raise JhalfsConfigError(f"cannot parse {config_in}: {exc}") from exc
+
+    def configure(self, *overrides: Mapping[str, str],
+                  base: str | Path | None = None) -> dict[str, tuple[str, str | None]]:
+        """Reset to *base* (or the defaults) and apply *overrides* in order.
+
+        Returns ``{name: (requested, effective)}`` for the overrides that did
+        not take effect.  Raises :class:`JhalfsConfigError` for names that
+        ``Config.in`` does not define.
+        """
+
+        merged: dict[str, str] = {}
+        for values in overrides:
+            merged.update(values)
+        unknown = [name for name in merged if name not in self.kconf.syms or not self.kconf.syms[name].nodes]
+        if unknown:
+            raise JhalfsConfigError(f"unknown option(s): {', '.join(unknown)}")
+
+        if base:
+            self.kconf.load_config(str(base))
+        else:
+            with self.kconf.batch():
+                self.kconf.unset_values()
+        report = self.kconf.set_values(merged)
+        return {name: (want, have) for name, (want, have) in report.items() if have != want}
+
+    def explain(self, name: str) -> list[str]:
+        """Why the option *name* has its value, one fact per line."""
+
+        return kconfig_query.dependency_index(self.kconf).explain(name).lines()
+
+    def write(self, path: str | Path) -> str:
+        """Write the configuration to *path* and return kconfiglib's message."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return self.kconf.write_config(str(path), HEADER)
+
+
+def _parse_set(items: list[str]) -> dict[str, str]:
+    values = {}
+    for item in items:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise JhalfsConfigError(f"--set expects NAME=value, got {item!r}")
+        values[name] = value
+    return values
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Write a jhalfs configuration from Config.in without curses")
+    parser.add_argument("--config-in", default=str(CONFIG_IN), help="jhalfs Config.in")
+    parser.add_argument("--base", help="Existing configuration to start from")
+    parser.add_argument("--profile", action="append", default=[], help="Configuration-format override file")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="Override one option")
+    parser.add_argument("--variant", action="append", default=[], metavar="NAME=PROFILE",
+                        help="Write one configuration per variant; --output must contain {name}")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Configuration to write")
+    parser.add_argument("--snapshot", default=os.environ.get("KCONFIG_SNAPSHOT"),
+                        help="kconfiglib snapshot to reuse between runs")
+    parser.add_argument("--check", action="store_true", help="Validate only, do not write")
+    parser.add_argument("--force", action="store_true", help="Write even if some overrides do not take effect")
+    args = parser.parse_args()
+
+    variants = {}
+    for item in args.variant:
+        name, sep, profile = item.partition("=")
+        if not sep:
+            parser.error(f"--variant expects NAME=PROFILE, got {item!r}")
+        variants[name] = profile
+    if variants and "{name}" not in args.output:
+        parser.error("--output must contain {name} with --variant")
+
+    failed = False
+    try:
+        config = JhalfsConfig(args.config_in, args.snapshot)
+        common = [read_configuration(p) for p in args.profile]
+        late = [env_overrides(), _parse_set(args.set)]
+        for name, profile in (variants or {"": None}).items():
+            layers = common + ([read_configuration(profile)] if profile else []) + late
+            unmet = config.configure(*layers, base=args.base)
+            label = f"{name}: " if name else ""
+            for option, (want, have) in unmet.items():
+                print(f"{label}{option}={want} has no effect ({option}={have!r})", file=sys.stderr)
+                for line in config.explain(option)[1:]:
+                    print(f"  {line}", file=sys.stderr)
+            failed |= bool(unmet)
+            if args.check or (unmet and not args.force):
+                continue
+            print(label + config.write(args.output.format(name=name)))
+    except (OSError, JhalfsConfigError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(2)
+    if failed and not args.force:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,266 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Explain Kconfig symbol values from a reverse-dependency index.
+
+kconfiglib stores each symbol's forward relations: what it selects and
+implies, and what it depends on or defaults from.  :class:`DependencyIndex`
+inverts those once per loaded configuration, so finding everything that
+selects, implies, depends on or defaults from a symbol is a dictionary
+lookup, and :meth:`DependencyIndex.explain` can say in one call why a symbol
+has its value::
+
+    PYTHONPATH=src python3 -m parsers.kconfig_query /sources/linux-6.10.5 DRM_I915 \\
+        --config /sources/linux-6.10.5/.config
+
+The first argument is a kernel tree (parsed like
+:mod:`kernel_requirements` does) or a Kconfig file such as jhalfs'
+``Config.in``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import sys
+from pathlib import Path
+from typing import Any, NamedTuple
+
+RELATIONS = {
+    "selected_by": "selected by",
+    "implied_by": "implied by",
+    "depended_on_by": "depended on by",
+    "defaulted_from_by": "used in defaults of",
+}
+
+
+class KconfigQueryError(Exception):
+    """Raised for symbols or configurations that cannot be queried."""
+
+
+class Explanation(NamedTuple):
+    """Why a symbol has its value."""
+
+    name: str
+    type: str
+    value: str
+    # One of "user", "selected", "implied", "default", "choice", "dependencies"
+    # or "unset"
+    reason: str
+    user_value: str | None
+    visible: bool
+    # (expression, value) of the direct dependencies, and of the && operands
+    # currently keeping them below y
+    depends_on: tuple[str, str]
+    blocked_by: list[tuple[str, str]]
+    # Active selects and implies as (symbol, condition); the default in use
+    selected_by: list[tuple[str, str]]
+    implied_by: list[tuple[str, str]]
+    default: tuple[str, str] | None
+    # The selected member, for choice members
+    choice_selection: str | None
+
+    def lines(self) -> list[str]:
+        """A human-readable explanation, one fact per line."""
+
+        out = [f"{self.name} ({self.type}) = {self.value!r}: {_REASONS[self.reason]}"]
+        if self.depends_on[0] != "y":
+            out.append(f"depends on {self.depends_on[0]} (={self.depends_on[1]})")
+        for expr, val in self.blocked_by:
+            out.append(f"blocked by {expr} (={val})")
+        for name, cond in self.selected_by:
+            out.append(f"selected by {name}" + (f" if {cond}" if cond != "y" else ""))
+        for name, cond in self.implied_by:
+            out.append(f"implied by {name}" + (f" if {cond}" if cond != "y" else ""))
+        if self.default:
+            out.append(f"default {self.default[0]}" + (f" if {self.default[1]}" if self.default[1] != "y" else ""))
+        if self.reason == "choice":
+            out.append(f"choice selection is {self.choice_selection or 'empty'}")
+        if self.user_value is not None and self.reason != "user":
+            out.append(f"user value {self.user_value!r} is "
+                       + ("overridden" if self.visible else "ignored, the symbol is not visible"))
+        elif not self.visible and self.reason != "user":
+            out.append("not user-settable here (no prompt, or its prompt's conditions are unmet)")
+        return out
+
+
+_REASONS = {
+    "user": "set by the user",
+    "selected": "forced by select",
+    "implied": "set by imply",
+    "default": "default value",
+    "choice": "choice member",
+    "dependencies": "held at n by its dependencies",
+    "unset": "no default applies",
+}
+
+
+class DependencyIndex:
+    """Reverse relations of every symbol in a loaded :class:`kconfiglib.Kconfig`."""
+
+    def __init__(self, kconf: Any):
+        self.kconf = kconf
+        self._lib = sys.modules[type(kconf).__module__]
+        lib = self._lib
+        # name -> relation -> [(symbol name, condition)]
+        self._reverse: dict[str, dict[str, list[tuple[str, Any]]]] = {}
+
+        for sym in kconf.unique_defined_syms:
+            for target, cond in sym.selects:
+                self._add(target, "selected_by", sym, cond)
+            for target, cond in sym.implies:
+                self._add(target, "implied_by", sym, cond)
+            for item in lib.expr_items(sym.direct_dep):
+                self._add(item, "depended_on_by", sym, sym.direct_dep)
+            for default, cond in sym.defaults:
+                for item in lib.expr_items(default) | lib.expr_items(cond):
+                    self._add(item, "defaulted_from_by", sym, cond)
+        for choice in kconf.unique_choices:
+            for item in lib.expr_items(choice.direct_dep):
+                self._add(item, "depended_on_by", choice, choice.direct_dep)
+
+    def _add(self, item: Any, relation: str, sc: Any, cond: Any) -> None:
+        if not isinstance(item, self._lib.Symbol) or item.is_constant:
+            return
+        entry = self._reverse.setdefault(item.name, {})
+        entry.setdefault(relation, []).append((sc.name or "<choice>", cond))
+
+    def _sym(self, name: str) -> Any:
+        name = name.removeprefix(self.kconf.config_prefix) if name not in self.kconf.syms else name
+        sym = self.kconf.syms.get(name)
+        if sym is None or not sym.nodes:
+            raise KconfigQueryError(f"{name} is not defined")
+        return sym
+
+    def reverse(self, name: str) -> dict[str, list[tuple[str, str]]]:
+        """Symbols that select, imply, depend on or default from *name*.
+
+        Conditions are returned as Kconfig expression strings.
+        """
+
+        sym = self._sym(name)
+        entry = self._reverse.get(sym.name, {})
+        return {rel: [(other, self._lib.expr_str(cond)) for other, cond in entry.get(rel, ())]
+                for rel in RELATIONS}
+
+    def _active(self, name: str, relation: str) -> list[tuple[str, str]]:
+        active = []
+        for other, cond in self._reverse.get(name, {}).get(relation, ()):
+            if self.kconf.syms[other].tri_value and self._lib.expr_value(cond):
+                active.append((other, self._lib.expr_str(cond)))
+        return active
+
+    def explain(self, name: str) -> Explanation:
+        """Why *name* has its current value."""
+
+        lib = self._lib
+        sym = self._sym(name)
+        value = sym.str_value
+        dep = sym.direct_dep
+        dep_val = lib.expr_value(dep)
+        blocked = []
+        if dep_val < 2:
+            for op in lib.split_expr(dep, lib.AND):
+                if lib.expr_value(op) < 2:
+                    blocked.append((lib.expr_str(op), lib.TRI_TO_STR[lib.expr_value(op)]))
+
+        selected = self._active(sym.name, "selected_by")
+        implied = self._active(sym.name, "implied_by") if dep_val else []
+        default = None
+        for val_expr, cond in sym.defaults:
+            if lib.expr_value(cond):
+                default = (lib.expr_str(val_expr), lib.expr_str(cond))
+                break
+
+        vis = sym.visibility
+        if sym.user_value is None:
+            user_value = None
+        elif isinstance(sym.user_value, int):
+            user_value = lib.TRI_TO_STR[sym.user_value]
+        else:
+            user_value = sym.user_value
+
+        is_bool = sym.orig_type in (lib.BOOL, lib.TRISTATE)
+        if sym.choice:
+            reason = "choice"
+        elif is_bool and selected and lib.expr_value(sym.rev_dep) >= sym.tri_value:
+            reason = "selected"
+        elif vis and user_value is not None:
+            reason = "user"
+        elif is_bool and implied and lib.expr_value(sym.weak_rev_dep) >= sym.tri_value:
+            reason = "implied"
+        elif default:
+            reason = "default"
+        elif is_bool and not dep_val:
+            reason = "dependencies"
+        else:
+            reason = "unset"
+
+        return Explanation(sym.name, lib.TYPE_TO_STR[sym.orig_type], value, reason, user_value, bool(vis),
+                           (lib.expr_str(dep), lib.TRI_TO_STR[dep_val]), blocked, selected, implied, default,
+                           sym.choice.selection.name if sym.choice and sym.choice.selection else None)
+
+
+@functools.lru_cache(maxsize=8)
+def dependency_index(kconf: Any) -> DependencyIndex:
+    """The :class:`DependencyIndex` of *kconf*, built on first use."""
+
+    return DependencyIndex(kconf)
+
+
+def _load(path: str, config: str | None) -> Any:
+    try:
+        from . import kernel_requirements
+    except ImportError:
+        import kernel_requirements  # run as a script from src/parsers
+
+    try:
+        if Path(path).is_dir():
+            kconf = kernel_requirements.load_kconfig(path)
+        else:
+            if str(kernel_requirements.KCONFIGLIB_DIR) not in sys.path:
+                sys.path.insert(0, str(kernel_requirements.KCONFIGLIB_DIR))
+            import kconfiglib
+
+            try:
+                kconf = kconfiglib.Kconfig(path, warn=False)
+            except kconfiglib.KconfigError as exc:
+                raise KconfigQueryError(f"cannot parse {path}: {exc}") from exc
+    except kernel_requirements.KernelRequirementsError as exc:
+        raise KconfigQueryError(str(exc)) from exc
+    if config:
+        kconf.load_config(config)
+    return kconf
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Explain the values of Kconfig symbols")
+    parser.add_argument("kconfig", help="Kernel source tree or Kconfig file")
+    parser.add_argument("symbols", nargs="+", help="Symbols to explain")
+    parser.add_argument("--config", help="Configuration to load first")
+    parser.add_argument("--reverse", action="store_true", help="Also list every reverse relation")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args()
+
+    try:
+        index = dependency_index(_load(args.kconfig, args.config))
+        results = {name: (index.explain(name), index.reverse(name) if args.reverse else None)
+                   for name in args.symbols}
+    except (OSError, KconfigQueryError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps({name: {**expl._asdict(), **({"reverse": rev} if rev else {})}
+                          for name, (expl, rev) in results.items()}, indent=2))
+        return
+    for name, (expl, rev) in results.items():
+        print("\n  ".join(expl.lines()))
+        for relation, items in (rev or {}).items():
+            if items:
+                print(f"  {RELATIONS[relation]}: {', '.join(dict.fromkeys(other for other, _ in items))}")
+
+
+if __name__ == "__main__":
+    _cli()
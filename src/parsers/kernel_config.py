@@ -0,0 +1,441 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Render "mconf"-style kernel configuration snippets from TOML requirements.
+
+This is the engine behind the books' ``kernel-config.py`` scripts.  Their
+output depends on two things: the menu structure of a kernel tree, and the
+options one TOML file asks for.  The structure is parsed once per tree and
+cached on disk, keyed by kernel version and the hash of every Kconfig file
+read.  :class:`KernelConfigRenderer` then renders any number of TOML files
+from it, so regenerating all the BLFS snippets costs one parse, not one per
+snippet.
+
+A TOML file lists options as for the original script::
+
+    EXT4 = "*"                   # bool/tristate: any of "*", "M", " "
+    HIGHMEM64G = "X"             # choice member
+    DRM_I915 = { value = " *M", comment = "for i915, crocus, or iris" }
+
+The books differ slightly in their output; ``--style`` selects LFS or BLFS
+(also used by GLFS).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tomllib
+from pathlib import Path
+from typing import Any, NamedTuple
+
+CACHE_FORMAT = 1
+CHOICE_BIT = 1 << 30
+MAX_LINE = 80
+DEFAULT_SRCARCH = "x86"
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("KERNEL_CONFIG_CACHE")
+    or Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "lfs-kernel-config"
+)
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE note PUBLIC "-//OASIS//DTD DocBook XML V4.5//EN"
+  "http://www.oasis-open.org/docbook/xml/4.5/docbookx.dtd">
+<!-- Automatically generated by kernel-config.py
+     DO NOT EDIT! -->
+"""
+
+
+class KernelConfigError(Exception):
+    """Raised when a TOML file does not fit the kernel's menu structure."""
+
+
+class Style(NamedTuple):
+    """Differences between the books' renderings."""
+
+    screen_role: str | None
+    # LFS skips only leading Y/M/N/H, dots and digits to find the hotkey
+    lstrip_hotkey: bool
+    # LFS prefixes blank comment lines with "# " as well
+    mark_blank_comments: bool
+
+
+STYLES = {
+    "lfs": Style("nodump", True, True),
+    "blfs": Style(None, False, False),
+    "glfs": Style(None, False, False),
+}
+
+
+def kernel_version(tree: str | Path) -> str:
+    """``VERSION.PATCHLEVEL.SUBLEVEL`` of *tree*, or ``unknown``."""
+
+    fields: dict[str, str] = {}
+    try:
+        with open(Path(tree) / "Makefile", encoding="utf-8") as fh:
+            for line in fh:
+                name, sep, value = line.partition("=")
+                if sep and name.strip() in ("VERSION", "PATCHLEVEL", "SUBLEVEL"):
+                    fields.setdefault(name.strip(), value.strip())
+    except OSError:
+        return "unknown"
+    if len(fields) != 3:
+        return "unknown"
+    return ".".join(fields[k] for k in ("VERSION", "PATCHLEVEL", "SUBLEVEL"))
+
+
+def _clean_dep(dep: str) -> str:
+    dep = dep.strip()
+    if dep.endswith("=y") or dep.endswith("=M"):
+        dep = dep[:-2]
+    elif dep.endswith(' != ""'):
+        dep = dep[:-6]
+    return dep
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class _KconfigParser:
+    """Flatten a Kconfig tree into menu entries, independent of any TOML."""
+
+    def __init__(self, tree: Path, srcarch: str):
+        self.tree = tree
+        self.variables = {"SRCARCH": srcarch}
+        self.ind0 = 0
+        self.ind1 = 0
+        self.menu_id = 1
+        self.stack: list[tuple[str, int, int, int]] = []
+        self.if_stack: list[list[str]] = []
+        self.main_dep: dict[str | int, str | int] = {}
+        self.files: list[str] = []
+
+    def _expand(self, text: str) -> str:
+        for name, value in self.variables.items():
+            text = text.replace(f"$({name})", value)
+        return text
+
+    def _pop(self, cond) -> None:
+        assert cond(self.stack[-1][0])
+        _, i0, i1, _ = self.stack.pop()
+        self.ind0 -= i0
+        self.ind1 -= i1
+
+    def _pop_while(self, cond) -> None:
+        while self.stack and cond(self.stack[-1][0]):
+            self._pop(cond)
+
+    def _cur_menu(self) -> int:
+        return self.stack[-1][3] if self.stack else 0
+
+    def _cur_if(self) -> list[str]:
+        return self.if_stack[-1][:] if self.if_stack else []
+
+    def _parse_config(self, buf: list[str]) -> list[Any]:
+        is_choice = buf[0].strip() == "choice"
+        is_menu = buf[0].startswith("menu") or is_choice
+        is_nonconfig_menu = buf[0].startswith("menu ") or is_choice
+        key = None if is_nonconfig_menu else buf[0].split()[1].strip()
+        title = buf[0][len("menu "):] if is_nonconfig_menu else None
+        deps = ["menu"] + self._cur_if()
+        klass = None
+
+        for line in buf[1:]:
+            line = line.strip()
+            if line.startswith("depends on "):
+                deps += [_clean_dep(x) for x in line[len("depends on "):].split("&&")]
+            elif line.startswith("prompt"):
+                title = line[len("prompt "):]
+            else:
+                for prefix in ("tristate", "bool", "string"):
+                    if line.startswith(prefix + " "):
+                        title = line[len(prefix) + 1:]
+                        klass = prefix
+                    elif line == prefix or line.startswith("def_" + prefix + " "):
+                        klass = prefix
+                    else:
+                        continue
+                    if '"' in line:
+                        tail = line[line.rfind('"') + 1:].strip()
+                        if tail[:3] == "if ":
+                            deps += [_clean_dep(x) for x in tail[3:].split("&&")]
+
+        self._pop_while(lambda x: x not in deps)
+
+        self.menu_id += is_menu
+        internal_key = key or self.menu_id
+        if self.stack:
+            parent = self.stack[-1][0]
+            self.main_dep[internal_key] = self._cur_menu() & ~CHOICE_BIT if parent == "menu" else parent
+
+        if title:
+            title = title.strip().lstrip('"')
+            title = title[:title.find('"')]
+        entry = [self.ind0, klass or "string", self.ind1, title, " --->" if is_menu else "",
+                 internal_key, self._cur_menu()]
+
+        # Untitled (internal) entries do not indent their children
+        indent = 2 if title else 0
+        menu = (self.menu_id if is_menu else self._cur_menu()) | (CHOICE_BIT if is_choice else 0)
+        stack_ent = (key or "menu", 2, 0, menu) if is_menu else (key or "menu", 0, indent, menu)
+        self.ind0 += stack_ent[1]
+        self.ind1 += stack_ent[2]
+        self.stack.append(stack_ent)
+        return entry
+
+    def load(self, name: str = "Kconfig") -> list[list[Any]]:
+        entries: list[list[Any]] = []
+        config_buf: list[str] = []
+        self.files.append(name)
+        with open(self.tree / name, encoding="utf-8") as fh:
+            for line in fh:
+                if config_buf:
+                    if not (line.startswith("\t") or line.startswith("    ")):
+                        entries.append(self._parse_config(config_buf))
+                        config_buf = []
+                    else:
+                        config_buf.append(line)
+                        continue
+                if line.startswith("source") or line.startswith("\tsource"):
+                    entries += self.load(self._expand(line.strip().split()[1].strip('"')))
+                elif line.startswith(("config", "menu", "choice")):
+                    config_buf = [line]
+                elif line.startswith("endmenu") or line.startswith("endchoice"):
+                    self._pop_while(lambda x: x != "menu")
+                    self._pop(lambda x: x == "menu")
+                elif line.startswith("if "):
+                    self.if_stack.append(self._cur_if() + [x.strip() for x in line[3:].split("&&")])
+                elif line.startswith("endif"):
+                    self.if_stack = self.if_stack[:-1]
+        if config_buf:
+            entries.append(self._parse_config(config_buf))
+        return entries
+
+
+def _escape(text: str) -> str:
+    return text.replace("<", "&lt;").replace(">", "&gt;")
+
+
+class KernelConfigRenderer:
+    """Parse a kernel tree's menus once and render TOML requirement files."""
+
+    def __init__(self, tree: str | Path, style: str = "blfs", cache_dir: str | Path | None = DEFAULT_CACHE_DIR,
+                 srcarch: str = DEFAULT_SRCARCH):
+        if style not in STYLES:
+            raise KernelConfigError(f"unknown style {style!r}")
+        self.tree = Path(tree).resolve()
+        self.style = STYLES[style]
+        self.srcarch = srcarch
+        self.version = kernel_version(self.tree)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.parsed = False
+        self._entries: list[list[Any]] | None = None
+        self._main_dep: dict[str | int, str | int] = {}
+
+    @property
+    def cache_file(self) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        tree_id = hashlib.sha1(f"{self.tree}\0{self.srcarch}".encode()).hexdigest()[:12]
+        return self.cache_dir / f"{self.version}-{tree_id}.json"
+
+    def _load_cache(self) -> bool:
+        path = self.cache_file
+        try:
+            data = json.loads(path.read_text(encoding="utf-8")) if path else None
+        except (OSError, ValueError):
+            return False
+        if not data or data.get("format") != CACHE_FORMAT or data.get("version") != self.version:
+            return False
+        for name, mtime_ns, size, digest in data["files"]:
+            try:
+                st = (self.tree / name).stat()
+                # A touched but unchanged Kconfig still matches by hash
+                if (st.st_mtime_ns, st.st_size) != (mtime_ns, size) and _hash_file(self.tree / name) != digest:
+                    return False
+            except OSError:
+                return False
+        self._entries = data["entries"]
+        self._main_dep = {k: v for k, v in data["main_dep"]}
+        return True
+
+    def _save_cache(self, files: list[str]) -> None:
+        path = self.cache_file
+        if path is None:
+            return
+        stamps = []
+        for name in dict.fromkeys(files):
+            st = (self.tree / name).stat()
+            stamps.append([name, st.st_mtime_ns, st.st_size, _hash_file(self.tree / name)])
+        data = {"format": CACHE_FORMAT, "tree": str(self.tree), "version": self.version,
+                "srcarch": self.srcarch, "files": stamps, "entries": self._entries,
+                "main_dep": [[k, v] for k, v in self._main_dep.items()]}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _menu(self) -> list[list[Any]]:
+        if self._entries is None and not self._load_cache():
+            parser = _KconfigParser(self.tree, self.srcarch)
+            self._entries = parser.load()
+            self._main_dep = parser.main_dep
+            self.parsed = True
+            self._save_cache(parser.files)
+        return self._entries
+
+    def _value(self, entry: list[Any], known_config: dict[str, Any]) -> tuple[str | None, Any]:
+        klass, key, menu = entry[1], entry[5], entry[6]
+        val = known_config.get(key) if isinstance(key, str) else None
+        comment = forced = None
+        if isinstance(val, dict):
+            comment = val.get("comment")
+            forced = val.get("forced")
+            val = val["value"]
+        if not val:
+            return val, comment
+        if klass == "string":
+            return "(" + val + ")", comment
+        if (val == "X") != bool(menu & CHOICE_BIT):
+            raise KernelConfigError(f"{key}: 'X' is only valid for choice members")
+        if val == "X":
+            return "(X)", comment
+        settings = sorted(val)
+        for c in settings:
+            if c not in "M* " or (c == "M" and klass != "tristate"):
+                raise KernelConfigError(f"unknown setting {c} for {key}")
+        if klass == "tristate" and forced != "*":
+            bracket = "{}" if forced else "<>"
+        else:
+            bracket = "--" if forced else "[]"
+        return bracket[0] + "/".join(settings) + bracket[1], comment
+
+    def render(self, known_config: dict[str, Any]) -> str:
+        """Return the DocBook ``<screen>`` for the options in *known_config*."""
+
+        rows = []
+        for entry in self._menu():
+            val, comment = self._value(entry, known_config)
+            rows.append([entry[0], val, entry[2], entry[3], entry[4], entry[5], entry[6], comment])
+
+        # Every selected option marks the menus it sits in as used
+        index_ikey = {}
+        for i in reversed(range(len(rows))):
+            index_ikey[rows[i][5]] = i
+        for i in reversed(range(len(rows))):
+            if rows[i][1] is None:
+                continue
+            key = rows[i][5]
+            parent = self._main_dep.get(key)
+            if not parent:
+                continue
+            j = index_ikey[parent]
+            if isinstance(parent, int) or not rows[j][3]:
+                # The main dependency is a menu or untitled magic entry
+                rows[j][1] = ""
+            if rows[j][1] is None:
+                raise KernelConfigError(f"[{key}] needs unselected [{parent}]")
+
+        rows = [row for row in rows if row[1] is not None and row[3]]
+        done = {row[5] for row in rows} | {"revision"}
+        for key in known_config:
+            if key not in done:
+                raise KernelConfigError(f"{key} seems not exist")
+
+        max_val_len: dict[int, int] = {}
+        for row in rows:
+            max_val_len[row[6]] = max(max_val_len.get(row[6], 0), len(row[1]))
+
+        buf: list[str] = []
+        for i0, val, i1, title, arrow, key, menu, comment in rows:
+            rem = MAX_LINE
+            is_choice = val == "(X)"
+            if val:
+                val += (max_val_len[menu] - len(val)) * " "
+            rem -= i0 + i1 + bool(val) + len(val)
+            line = i0 * " " + _escape(val) + (i1 + bool(val)) * " "
+            rem -= len(arrow)
+            if len(title) > rem:
+                title = title[:rem - 3] + "..."
+
+            # Highlight the first character mconf would use as hotkey
+            hotkey = title
+            if is_choice:
+                pass
+            elif self.style.lstrip_hotkey:
+                hotkey = hotkey.lstrip("YyMmNnHh.0123456789")
+            else:
+                while not (hotkey[0].isalpha() and hotkey[0] not in "YyMmNnHh"):
+                    hotkey = hotkey[1:]
+            lead = title[:len(title) - len(hotkey)]
+            line += (_escape(lead) + "<emphasis role='blue'>" + _escape(hotkey[0]) + "</emphasis>"
+                     + _escape(hotkey[1:]) + _escape(arrow))
+            rem -= len(title)
+
+            key = " [" + key + "]" if isinstance(key, str) else ""
+            if len(key) <= rem:
+                line += (rem - len(key)) * " " + key
+            else:
+                key = "... " + key
+                line += "\n" + " " * (MAX_LINE - len(key)) + key
+            if isinstance(comment, str):
+                comment = [comment]
+            if comment:
+                mark = (lambda c: "# ") if self.style.mark_blank_comments else (lambda c: "# " if c else "")
+                buf.append(_escape("\n".join(" " * i0 + mark(c) + c for c in comment)) + ":")
+            if not menu and buf:
+                buf.append("")
+            buf.append(line.rstrip())
+
+        attrs = ""
+        if self.style.screen_role:
+            attrs += f' role="{self.style.screen_role}"'
+        if known_config.get("revision"):
+            attrs += f' revision="{known_config["revision"]}"'
+        return HEADER + f"<screen{attrs}>" + "\n".join(buf) + "</screen>"
+
+    def render_file(self, toml_file: str | Path) -> str:
+        """Render the requirements in *toml_file*."""
+
+        with open(toml_file, "rb") as fh:
+            return self.render(tomllib.load(fh))
+
+
+def main(style: str = "blfs", argv: list[str] | None = None) -> None:
+    """Command line shared by the books' ``kernel-config.py`` scripts."""
+
+    parser = argparse.ArgumentParser(description="Render mconf-style kernel configuration from TOML files")
+    parser.add_argument("tree", help="Kernel source tree")
+    parser.add_argument("toml", nargs="+", help="Requirement files")
+    parser.add_argument("--style", choices=sorted(STYLES), default=style)
+    parser.add_argument("--output", metavar="TEMPLATE",
+                        help="Write each result to TEMPLATE, where {stem} is the TOML path without .toml "
+                             "(required for more than one TOML file; default stdout)")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Parsed menu cache")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the cache")
+    parser.add_argument("--srcarch", default=DEFAULT_SRCARCH)
+    args = parser.parse_args(argv)
+    if len(args.toml) > 1 and not args.output:
+        parser.error("--output is required with more than one TOML file")
+
+    renderer = KernelConfigRenderer(args.tree, args.style, None if args.no_cache else args.cache_dir, args.srcarch)
+    try:
+        for toml_file in args.toml:
+            text = renderer.render_file(toml_file)
+            if not args.output:
+                print(text)
+                continue
+            target = Path(args.output.format(stem=str(toml_file)[:-len(".toml")]))
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text + "\n", encoding="utf-8")
+    except KernelConfigError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
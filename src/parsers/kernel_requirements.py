@@ -0,0 +1,397 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Build a minimal kernel ``.config`` from the books' kernel requirements.
+
+The LFS, BLFS and GLFS pages list the kernel options each package needs as
+TOML files (see :mod:`kernel_config`).  This module picks the files that
+apply to a build profile and to ``config/hardware_support.conf``, merges
+them, and applies the result to a kernel tree with kconfiglib.  Symbols
+that a requirement depends on are enabled as well, selects are left to
+kconfiglib, and the outcome is checked against every requirement before it
+is written with ``write_min_config``::
+
+    PYTHONPATH=src python3 -m parsers.kernel_requirements /sources/linux-6.10.5 \\
+        --profile desktop_gnome --output /sources/linux-6.10.5/.config
+
+Run ``make olddefconfig`` on the result to expand it to a full ``.config``.
+
+A requirement string lists the acceptable settings as in the TOML files:
+``*`` built in, ``M`` module, a blank for disabled and ``X`` for a choice
+member.  Requirements from several files are intersected; options that may
+also stay disabled are optional and left at their defaults.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import os
+import sys
+import tomllib
+from pathlib import Path
+from typing import Any, Iterable, Mapping, NamedTuple
+
+try:
+    from . import kconfig_query, kernel_config
+except ImportError:
+    import kconfig_query  # run as a script from src/parsers
+    import kernel_config
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DOCS_ROOT = REPO_ROOT / "docs"
+KCONFIGLIB_DIR = DOCS_ROOT / "jhalfs" / "menu"
+PROFILE_DIR = REPO_ROOT / "config" / "build_profiles"
+HARDWARE_CONF = REPO_ROOT / "config" / "hardware_support.conf"
+DEFAULT_PROFILE = "desktop_gnome"
+MAX_PASSES = 8
+
+# LFS chapter 10 requirements, by init system
+INIT_REQUIREMENTS = {
+    "sysv": ("lfs-git/chapter10/kernel/sysv.toml",),
+    "systemd": ("lfs-git/chapter10/kernel/systemd.toml",),
+}
+
+# Requirement files pulled in by a boolean profile or hardware setting
+FEATURE_REQUIREMENTS = {
+    "GNOME_ENABLED": (
+        "blfs-git/kernel-config/introduction/important/cgroup.toml",
+        "blfs-git/kernel-config/general/sysutils/elogind.toml",
+        "blfs-git/kernel-config/general/sysutils/bubblewrap.toml",
+        "blfs-git/kernel-config/general/sysutils/power-profiles-daemon.toml",
+        "blfs-git/kernel-config/gnome/platform/localsearch.toml",
+        "blfs-git/kernel-config/postlfs/security/linux-pam.toml",
+        "blfs-git/kernel-config/general/genlib/libusb.toml",
+    ),
+    "NETWORKING_ENABLED": ("blfs-git/kernel-config/postlfs/security/iptables.toml",),
+    "ENABLE_MULTIMEDIA": ("blfs-git/kernel-config/multimedia/libdriv/alsa-lib.toml",),
+    "ENABLE_VIRTUALIZATION": (
+        "blfs-git/kernel-config/postlfs/virtualization/qemu-kvm.toml",
+        "blfs-git/kernel-config/postlfs/virtualization/qemu-bridge.toml",
+    ),
+    "ENABLE_WIRELESS": ("blfs-git/kernel-config/networking/netprogs/wireless-kernel.toml",),
+    "ENABLE_BLUETOOTH": ("blfs-git/kernel-config/general/sysutils/bluez.toml",),
+}
+
+# Requirement files pulled in by one entry of a comma-separated setting
+LIST_REQUIREMENTS = {
+    "ENABLE_AUDIO": {"*": ("blfs-git/kernel-config/multimedia/libdriv/alsa-lib.toml",)},
+    "ENABLE_GRAPHICS_DRIVERS": {"*": ("blfs-git/kernel-config/x/installing/mesa.toml",)},
+    "GRAPHICS_BACKEND": {
+        "x11": (
+            "blfs-git/kernel-config/x/installing/xorg-server.toml",
+            "blfs-git/kernel-config/x/installing/libevdev.toml",
+        ),
+    },
+    "FIRMWARE_SUPPORT": {"uefi": ("blfs-git/kernel-config/postlfs/filesystems/uefi-bootloaders/grub-setup.toml",)},
+}
+
+# The DRM driver mesa lists as optional for each graphics vendor
+GRAPHICS_DRIVERS = {
+    "intel": {"DRM_I915": "*M"},
+    "amd": {"DRM_AMDGPU": "*M"},
+    "nvidia": {"DRM_NOUVEAU": "*M"},
+}
+
+# Kernel source architecture for TARGET_ARCH
+SRCARCH = {"x86_64": "x86", "i686": "x86", "i386": "x86", "aarch64": "arm64", "arm": "arm"}
+
+TRISTATE_SETTINGS = frozenset("*M X")
+SETTING_FOR = {"y": "*", "m": "M", "n": " "}
+
+
+class KernelRequirementsError(Exception):
+    """Raised when requirements conflict or cannot be applied to a kernel tree."""
+
+
+class Requirement(NamedTuple):
+    """The merged setting of one option and the files that asked for it."""
+
+    setting: str
+    sources: tuple[str, ...]
+
+    @property
+    def literal(self) -> bool:
+        """Whether *setting* is a value for a string or number option."""
+
+        return not set(self.setting) <= TRISTATE_SETTINGS
+
+    def target(self, prefer_modules: bool = False) -> str | None:
+        """The value to assign, or ``None`` for an optional requirement."""
+
+        if self.literal:
+            return self.setting
+        if self.setting == "X":
+            return "y"
+        if " " in self.setting:
+            return "n" if self.setting == " " else None
+        if "M" in self.setting and (prefer_modules or "*" not in self.setting):
+            return "m"
+        return "y"
+
+    def satisfied_by(self, value: str) -> bool:
+        if self.literal:
+            return value == self.setting
+        if self.setting == "X":
+            return value == "y"
+        return SETTING_FOR.get(value, "") in self.setting
+
+
+class Resolution(NamedTuple):
+    """Outcome of applying requirements to a kernel tree."""
+
+    values: dict[str, str]
+    # Symbols enabled because a requirement depends on them
+    added: dict[str, str]
+    # name -> (requirement, effective value)
+    unmet: dict[str, tuple[Requirement, str]]
+    unknown: list[str]
+
+
+def read_conf(path: str | Path) -> dict[str, str]:
+    """Return the ``KEY="value"`` assignments of a shell configuration file."""
+
+    settings = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        value = value.split(" #", 1)[0].strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        settings[key.removeprefix("export ").strip()] = value
+    return settings
+
+
+def profile_settings(profile: str, hardware: str | Path | None = HARDWARE_CONF) -> dict[str, str]:
+    """Merge the hardware baseline with *profile* (a name or a file path)."""
+
+    path = Path(profile)
+    if not path.suffix:
+        path = PROFILE_DIR / f"{profile}.conf"
+    if not path.is_file():
+        raise KernelRequirementsError(f"build profile {profile} not found")
+    settings = read_conf(hardware) if hardware else {}
+    settings.update(read_conf(path))
+    return settings
+
+
+def _enabled(value: str | None) -> bool:
+    return (value or "").lower() in ("1", "y", "yes", "true", "on")
+
+
+def requirement_files(settings: Mapping[str, str], docs_root: Path = DOCS_ROOT) -> list[Path]:
+    """The TOML files that apply to the profile *settings*, without duplicates."""
+
+    init = settings.get("INIT_SYSTEM", "sysv")
+    if init not in INIT_REQUIREMENTS:
+        raise KernelRequirementsError(f"unknown INIT_SYSTEM {init}")
+    names = list(INIT_REQUIREMENTS[init])
+    for key, files in FEATURE_REQUIREMENTS.items():
+        if _enabled(settings.get(key)):
+            names.extend(files)
+    for key, choices in LIST_REQUIREMENTS.items():
+        items = [i.strip().lower() for i in settings.get(key, "").split(",") if i.strip()]
+        if items and items != ["none"]:
+            names.extend(choices.get("*", ()))
+            for item in items:
+                names.extend(choices.get(item, ()))
+    return [docs_root / name for name in dict.fromkeys(names)]
+
+
+def hardware_requirements(settings: Mapping[str, str]) -> dict[str, str]:
+    """Options the hardware settings ask for directly, such as GPU drivers."""
+
+    options = {}
+    for vendor in settings.get("ENABLE_GRAPHICS_DRIVERS", "").split(","):
+        options.update(GRAPHICS_DRIVERS.get(vendor.strip().lower(), {}))
+    return options
+
+
+def load_requirements(path: str | Path) -> dict[str, str]:
+    """Return the option settings of one TOML requirement file."""
+
+    with open(path, "rb") as fh:
+        data = tomllib.load(fh)
+    options = {}
+    for key, value in data.items():
+        if key == "revision":
+            continue
+        if isinstance(value, dict):
+            value = value["value"]
+        options[key] = value
+    return options
+
+
+def merge_requirements(sources: Iterable[tuple[str, Mapping[str, str]]]) -> dict[str, Requirement]:
+    """Intersect the settings of several ``(source, options)`` pairs."""
+
+    merged: dict[str, Requirement] = {}
+    for source, options in sources:
+        for key, setting in options.items():
+            new = Requirement(setting, (source,))
+            old = merged.get(key)
+            if old is None:
+                merged[key] = new
+                continue
+            if old.literal or new.literal:
+                if old.setting != setting:
+                    raise KernelRequirementsError(
+                        f"{key}: {', '.join(old.sources)} want {old.setting!r} but {source} wants {setting!r}")
+                common = setting
+            else:
+                common = "".join(c for c in "*M X" if c in old.setting and c in setting)
+                if not common:
+                    raise KernelRequirementsError(
+                        f"{key}: no setting satisfies both {', '.join(old.sources)} ({old.setting!r}) "
+                        f"and {source} ({setting!r})")
+            merged[key] = Requirement(common, old.sources + (source,))
+    return merged
+
+
+def kernel_environment(tree: str | Path, srcarch: str) -> dict[str, str]:
+    """The environment the kernel's Kconfig files expect, as set by its Makefile."""
+
+    tree = Path(tree).resolve()
+    return {
+        "srctree": str(tree),
+        "ARCH": srcarch,
+        "SRCARCH": srcarch,
+        "KERNELVERSION": kernel_config.kernel_version(tree),
+        "CC": os.environ.get("CC", "gcc"),
+        "LD": os.environ.get("LD", "ld"),
+        "HOSTCC": os.environ.get("HOSTCC", "gcc"),
+        "HOSTCXX": os.environ.get("HOSTCXX", "g++"),
+    }
+
+
+def load_kconfig(tree: str | Path, srcarch: str = kernel_config.DEFAULT_SRCARCH,
+                 cache_dir: str | Path | None = kernel_config.DEFAULT_CACHE_DIR) -> Any:
+    """Parse the Kconfig files of *tree*, reusing a kconfiglib snapshot in *cache_dir*."""
+
+    if str(KCONFIGLIB_DIR) not in sys.path:
+        sys.path.insert(0, str(KCONFIGLIB_DIR))
+    kconfiglib = importlib.import_module("kconfiglib")
+
+    env = kernel_environment(tree, srcarch)
+    os.environ.update(env)
+    snapshot = None
+    if cache_dir:
+        tree_id = hashlib.sha1(f"{env['srctree']}\0{srcarch}".encode()).hexdigest()[:12]
+        snapshot = Path(cache_dir) / f"{env['KERNELVERSION']}-{tree_id}.kconfig"
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        return kconfiglib.Kconfig(str(Path(env["srctree"]) / "Kconfig"), warn=False,
+                                  snapshot=str(snapshot) if snapshot else None)
+    except (OSError, kconfiglib.KconfigError) as exc:
+        raise KernelRequirementsError(f"cannot parse the Kconfig files of {tree}: {exc}") from exc
+
+
+def _missing_dependencies(kconfiglib: Any, sym: Any, want: str, requested: Mapping[str, str]) -> dict[str, str]:
+    """Symbols in the ``&&`` operands of *sym*'s dependencies that keep it below *want*."""
+
+    need = kconfiglib.STR_TO_TRI.get(want, 2)
+    missing = {}
+    for op in kconfiglib.split_expr(sym.direct_dep, kconfiglib.AND):
+        if (isinstance(op, kconfiglib.Symbol) and op.orig_type in (kconfiglib.BOOL, kconfiglib.TRISTATE)
+                and op.nodes and op.tri_value < need and op.name not in requested):
+            missing[op.name] = "y"
+    return missing
+
+
+def resolve(kconf: Any, requirements: Mapping[str, Requirement], prefer_modules: bool = False) -> Resolution:
+    """Apply *requirements* to *kconf*, enabling the symbols they depend on."""
+
+    kconfiglib = sys.modules[type(kconf).__module__]
+    values = {}
+    unknown = []
+    for name, req in requirements.items():
+        sym = kconf.syms.get(name)
+        if sym is None or not sym.nodes:
+            unknown.append(name)
+            continue
+        target = req.target(prefer_modules)
+        if target is not None:
+            values[name] = target
+
+    requested = dict(values)
+    added: dict[str, str] = {}
+    for _ in range(MAX_PASSES):
+        report = kconf.set_values(requested)
+        missing: dict[str, str] = {}
+        for name, (want, have) in report.items():
+            if have != want and want != "n":
+                for dep, val in _missing_dependencies(kconfiglib, kconf.syms[name], want, requested).items():
+                    missing.setdefault(dep, val)
+        if not missing:
+            break
+        requested.update(missing)
+        added.update(missing)
+
+    unmet = {}
+    for name, req in requirements.items():
+        if name in unknown:
+            continue
+        have = kconf.syms[name].str_value
+        if not req.satisfied_by(have):
+            unmet[name] = (req, have)
+    return Resolution(values, added, unmet, unknown)
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Write a minimal kernel .config for a build profile")
+    parser.add_argument("tree", help="Kernel source tree")
+    parser.add_argument("--profile", default=os.environ.get("BUILD_PROFILE", DEFAULT_PROFILE),
+                        help="Build profile name or .conf file (default $BUILD_PROFILE or %(default)s)")
+    parser.add_argument("--hardware", default=str(HARDWARE_CONF), help="Hardware baseline configuration")
+    parser.add_argument("--toml", action="append", default=[], help="Additional requirement file")
+    parser.add_argument("--base", help="Configuration to start from instead of the Kconfig defaults")
+    parser.add_argument("--modules", action="store_true", help="Prefer modules where either is allowed")
+    parser.add_argument("--output", help="Minimal configuration to write (default TREE/.config)")
+    parser.add_argument("--cache-dir", default=str(kernel_config.DEFAULT_CACHE_DIR), help="Parsed Kconfig cache")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the cache")
+    parser.add_argument("--list", action="store_true", help="Only list the requirement files used")
+    parser.add_argument("--force", action="store_true", help="Write the configuration despite unmet requirements")
+    args = parser.parse_args()
+
+    try:
+        settings = profile_settings(args.profile, args.hardware)
+        files = requirement_files(settings) + [Path(p) for p in args.toml]
+        if args.list:
+            print("\n".join(str(f) for f in files))
+            return
+        sources = [(str(f.relative_to(DOCS_ROOT)) if f.is_relative_to(DOCS_ROOT) else str(f),
+                    load_requirements(f)) for f in files]
+        sources.append((Path(args.hardware).name, hardware_requirements(settings)))
+        requirements = merge_requirements(sources)
+
+        srcarch = SRCARCH.get(settings.get("TARGET_ARCH", ""), kernel_config.DEFAULT_SRCARCH)
+        kconf = load_kconfig(args.tree, srcarch, None if args.no_cache else args.cache_dir)
+        if args.base:
+            kconf.load_config(args.base)
+        result = resolve(kconf, requirements, args.modules)
+    except (OSError, tomllib.TOMLDecodeError, KernelRequirementsError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    for name in result.unknown:
+        print(f"Warning: {name} is not defined by this kernel", file=sys.stderr)
+    for name, val in result.added.items():
+        print(f"Enabled {name}={val} as a dependency", file=sys.stderr)
+    if result.unmet:
+        index = kconfig_query.dependency_index(kconf)
+    for name, (req, have) in result.unmet.items():
+        print(f"Unmet: {name}={have}, {', '.join(req.sources)} want {req.setting!r}", file=sys.stderr)
+        for line in index.explain(name).lines()[1:]:
+            print(f"  {line}", file=sys.stderr)
+    if result.unmet and not args.force:
+        sys.exit(1)
+
+    output = args.output or str(Path(args.tree) / ".config")
+    print(kconf.write_min_config(output, f"# Minimal configuration for the {args.profile} profile\n"))
+
+
+if __name__ == "__main__":
+    _cli()
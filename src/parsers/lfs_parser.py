@@ -79,6 +79,11 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     BeautifulSoup = None
 
+try:
+    from . import instrumentation
+except ImportError:  # run as a script from src/parsers
+    import instrumentation
+
 DOCS_ROOT = Path(__file__).resolve().parents[2] / "docs"
 DEPENDENCY_XML = DOCS_ROOT / "lfs-git" / "appendices" / "dependencies.xml"
 
@@ -101,6 +106,7 @@ def is_build_command(cmd: str) -> bool:
     return bool(cmd and not cmd.startswith("#"))
 
 
+@instrumentation.track_file("extract_build_commands")
 def extract_build_commands(chapter_file: str | Path) -> list[str]:
     """Extract build commands from an LFS chapter file."""
 
@@ -130,6 +136,28 @@ def extract_build_commands(chapter_file: str | Path) -> list[str]:
     return commands
 
 
+# Parsed dependency documents keyed by path, invalidated by mtime and size
+_dependency_cache: dict[Path, tuple[tuple[int, int], str, object]] = {}
+
+
+def _load_dependency_file(dep_path: Path) -> tuple[str, object]:
+    """Return the text and parsed soup (or ``None``) of *dep_path*, cached."""
+
+    st = dep_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _dependency_cache.get(dep_path)
+    if cached and cached[0] == stamp:
+        instrumentation.cache_event("dependencies", hit=True)
+        return cached[1], cached[2]
+    instrumentation.cache_event("dependencies", hit=False)
+
+    with instrumentation.stage("parse_dependencies"):
+        text = dep_path.read_text(encoding="utf-8")
+        soup = BeautifulSoup(text, "xml") if BeautifulSoup else None
+    _dependency_cache[dep_path] = (stamp, text, soup)
+    return text, soup
+
+
 def resolve_dependencies(package_name: str, dependency_file: str | Path = DEPENDENCY_XML) -> list[str]:
     """Parse dependency information for *package_name* from ``dependencies.xml``."""
 
@@ -137,10 +165,9 @@ def resolve_dependencies(package_name: str, dependency_file: str | Path = DEPEND
     if not dep_path.exists():
         return []
 
-    text = dep_path.read_text(encoding="utf-8")
+    text, soup = _load_dependency_file(dep_path)
 
-    if BeautifulSoup:
-        soup = BeautifulSoup(text, "xml")
+    if soup is not None:
 
         bridge = None
         for b in soup.find_all("bridgehead"):
@@ -182,9 +209,11 @@ def resolve_dependencies(package_name: str, dependency_file: str | Path = DEPEND
 def _cli() -> None:
     parser = argparse.ArgumentParser(description="Extract build commands from an LFS chapter file")
     parser.add_argument("chapter", help="Path to chapter XML/HTML file")
+    instrumentation.add_arguments(parser)
     args = parser.parse_args()
 
-    commands = extract_build_commands(args.chapter)
+    with instrumentation.session("lfs_parser", args):
+        commands = extract_build_commands(args.chapter)
     for cmd in commands:
         print(cmd)
 
@@ -9,6 +9,7 @@ import argparse
 import os
 from pathlib import Path
 
+from . import instrumentation
 from .lfs_parser import extract_build_commands, resolve_dependencies
 
 DOCS_ROOT = Path(__file__).resolve().parents[2] / "docs"
@@ -26,7 +27,8 @@ def _find_package_file(package_name: str, root: Path = DOCS_ROOT) -> Path | None
 def analyze_package(package_name: str) -> dict:
     """Return build commands and dependencies for *package_name*."""
 
-    path = _find_package_file(package_name)
+    with instrumentation.stage("find_package_file"):
+        path = _find_package_file(package_name)
     if not path:
         return {}
 
@@ -44,9 +46,11 @@ def extract_requirements(package_name: str) -> list[str]:
 def _cli() -> None:
     parser = argparse.ArgumentParser(description="Analyze a package definition")
     parser.add_argument("package", help="Package name")
+    instrumentation.add_arguments(parser)
     args = parser.parse_args()
 
-    data = analyze_package(args.package)
+    with instrumentation.session("package_analyzer", args):
+        data = analyze_package(args.package)
     if not data:
         print("Package not found")
         return
@@ -9,9 +9,33 @@ source src/common/logging.sh
 source src/common/error_handling.sh
 source src/common/package_management.sh
 
+# Opt-in parser instrumentation: PARSER_PROFILE=timing|cprofile, --profile or --cprofile
+for arg in "$@"; do
+    case "$arg" in
+        --profile) PARSER_PROFILE=timing ;;
+        --cprofile) PARSER_PROFILE=cprofile ;;
+    esac
+done
+PARSER_PROFILE="${PARSER_PROFILE:-}"
+export PARSER_PROFILE
+export PARSER_PROFILE_DIR="${PARSER_PROFILE_DIR:-logs/parsing_logs/profile}"
+
 ensure_directories() {
     mkdir -p generated || handle_error "Failed to create generated directory"
     mkdir -p logs/parsing_logs || handle_error "Failed to create parsing logs directory"
+    if [[ -n "$PARSER_PROFILE" ]]; then
+        # Only this run's timings should end up in the summary
+        rm -rf "$PARSER_PROFILE_DIR"
+        mkdir -p "$PARSER_PROFILE_DIR" || handle_error "Failed to create profile directory"
+    fi
+}
+
+report_parser_timings() {
+    [[ -n "$PARSER_PROFILE" ]] || return 0
+    log_info "Parser timings (details in $PARSER_PROFILE_DIR)"
+    PYTHONPATH="src${PYTHONPATH:+:$PYTHONPATH}" \
+        python3 -m parsers.instrumentation summary "$PARSER_PROFILE_DIR" \
+        || log_warning "No parser timings were recorded"
 }
 
 run_parsers() {
@@ -37,6 +61,7 @@ main() {
     log_info "Regenerating build scripts"
     ensure_directories
     run_parsers
+    report_parser_timings
     log_success "Build script regeneration complete"
 }
 
@@ -0,0 +1 @@
+"""Source acquisition package"""
@@ -0,0 +1,242 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Check every book patch against its freshly extracted source tree up front.
+
+Patches listed in ``patches.ent`` are downloaded and verified against their
+book MD5, grouped with the tarball they belong to and tried with
+``patch --dry-run`` in parallel.  Only the files a patch touches are
+extracted, so even GCC or LLVM trees are checked in seconds.  Patches for
+the same package are applied in order inside the scratch tree so later
+patches see the earlier ones.  Failing packages are reported before the
+build starts instead of hours into a BLFS run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from .segmented_download import DownloadError, download
+
+try:
+    from ..parsers.book_entities import expand, load_entities
+except ImportError:
+    from parsers.book_entities import expand, load_entities  # run with src on PYTHONPATH
+
+DOCS_ROOT = Path(__file__).resolve().parents[2] / "docs"
+LFS_BOOK = DOCS_ROOT / "lfs-git"
+
+_PATCH_CMD_RE = re.compile(r"patch\s+-Np(\d)\s+-i\s+\.\./([^\s<]+)")
+_TARBALL_RE = re.compile(r"\.tar(\.\w+)?$|\.tgz$")
+
+
+class PatchResult(NamedTuple):
+    package: str
+    patch: str
+    ok: bool
+    output: str
+
+
+def book_entities(book_dir: str | Path = LFS_BOOK) -> dict[str, str]:
+    """Load the general, patch and package entities of a book."""
+
+    book_dir = Path(book_dir)
+    entities: dict[str, str] = {}
+    for name in ("general.ent", "patches.ent", "packages.ent"):
+        if (book_dir / name).exists():
+            load_entities(book_dir / name, entities)
+    return entities
+
+
+def book_patches(book_dir: str | Path = LFS_BOOK) -> dict[str, dict[str, str | None]]:
+    """Return ``{filename: {"md5": ..., "url": ...}}`` for patches in the book."""
+
+    entities = book_entities(book_dir)
+    root = expand(entities.get("patches-root", ""), entities)
+    result: dict[str, dict[str, str | None]] = {}
+    for key, value in entities.items():
+        if not key.endswith("-patch") or f"{key}-md5" not in entities:
+            continue
+        name = expand(value, entities)
+        if "&" in name:
+            continue
+        url = root + name if root and "&" not in root else None
+        result[name] = {"md5": entities[f"{key}-md5"], "url": url}
+    return result
+
+
+def strip_levels(book_dir: str | Path = LFS_BOOK) -> dict[str, int]:
+    """Return the ``-pN`` level the book uses for each patch file."""
+
+    book_dir = Path(book_dir)
+    entities = book_entities(book_dir)
+    levels: dict[str, int] = {}
+    for xml in book_dir.rglob("*.xml"):
+        text = xml.read_text(encoding="utf-8", errors="replace")
+        if "patch -Np" not in text:
+            continue
+        for level, name in _PATCH_CMD_RE.findall(text):
+            name = expand(name, entities)
+            if name.endswith(".patch"):
+                levels.setdefault(name, int(level))
+    return levels
+
+
+def touched_paths(patch_file: str | Path, strip: int) -> set[str]:
+    """Return the tree-relative paths a unified diff modifies."""
+
+    paths: set[str] = set()
+    with open(patch_file, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            if not (line.startswith("--- ") or line.startswith("+++ ")):
+                continue
+            path = line[4:].split("\t")[0].strip()
+            if path == "/dev/null":
+                continue
+            parts = path.split("/")[strip:]
+            if parts:
+                paths.add("/".join(parts))
+    return paths
+
+
+def match_tarball(patch_name: str, tarballs: list[Path]) -> Path | None:
+    """Return the tarball a ``<pkg>-<version>-<fix>.patch`` belongs to."""
+
+    best = None
+    for tarball in tarballs:
+        stem = _TARBALL_RE.sub("", tarball.name)
+        if patch_name.startswith(stem + "-") and (best is None or len(stem) > len(_TARBALL_RE.sub("", best.name))):
+            best = tarball
+    return best
+
+
+def _extract_subset(tarball: Path, paths: set[str], dest: Path) -> Path:
+    """Extract only *paths* (relative to the top directory) and return the tree root."""
+
+    top = None
+    with tarfile.open(tarball) as tar:
+        selected = []
+        for member in tar:
+            parts = member.name.lstrip("./").split("/", 1)
+            if top is None:
+                top = parts[0]
+            if len(parts) == 2 and parts[1] in paths and (member.isfile() or member.issym()):
+                selected.append(member)
+        kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+        tar.extractall(dest, members=selected, **kwargs)
+    root = dest / (top or "")
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def check_package(tarball: Path, patches: list[Path], levels: dict[str, int], workdir: Path) -> list[PatchResult]:
+    """Dry-run *patches* in order against a scratch extraction of *tarball*."""
+
+    package = _TARBALL_RE.sub("", tarball.name)
+    wanted: set[str] = set()
+    for patch in patches:
+        wanted |= touched_paths(patch, levels.get(patch.name, 1))
+    try:
+        root = _extract_subset(tarball, wanted, Path(tempfile.mkdtemp(dir=workdir, prefix=package + ".")))
+    except (tarfile.TarError, OSError) as exc:
+        return [PatchResult(package, p.name, False, f"cannot extract {tarball.name}: {exc}") for p in patches]
+
+    results = []
+    for patch in patches:
+        base = ["patch", "-N", f"-p{levels.get(patch.name, 1)}", "-i", str(patch.resolve()), "-d", str(root)]
+        dry = subprocess.run(base + ["--dry-run"], capture_output=True, text=True)
+        ok = dry.returncode == 0
+        if ok:
+            # Apply for real in the scratch tree so the next patch sees it
+            subprocess.run(base + ["-s"], capture_output=True, text=True)
+        results.append(PatchResult(package, patch.name, ok, (dry.stdout + dry.stderr).strip()))
+    return results
+
+
+def fetch_patches(sources: Path, book: dict[str, dict[str, str | None]]) -> list[str]:
+    """Download missing book patches and verify MD5s; return problems found."""
+
+    problems = []
+    for name, info in sorted(book.items()):
+        path = sources / name
+        if not path.exists() and info["url"]:
+            try:
+                download(info["url"], path)
+            except DownloadError as exc:
+                problems.append(f"{name}: {exc}")
+                continue
+        if path.exists() and info["md5"]:
+            actual = hashlib.md5(path.read_bytes()).hexdigest()
+            if actual != info["md5"]:
+                problems.append(f"{name}: md5 mismatch (expected {info['md5']}, got {actual})")
+    return problems
+
+
+def precheck(
+    sources_dir: str | Path,
+    book_dir: str | Path | None = LFS_BOOK,
+    jobs: int | None = None,
+) -> tuple[list[PatchResult], list[str]]:
+    """Check every patch in *sources_dir*; return results and unmatched patches."""
+
+    sources = Path(sources_dir)
+    levels = strip_levels(book_dir) if book_dir else {}
+    tarballs = [p for p in sources.iterdir() if _TARBALL_RE.search(p.name)]
+    groups: dict[Path, list[Path]] = {}
+    orphans: list[str] = []
+    for patch in sorted(sources.glob("*.patch")):
+        tarball = match_tarball(patch.name, tarballs)
+        if tarball is None:
+            orphans.append(patch.name)
+        else:
+            groups.setdefault(tarball, []).append(patch)
+
+    results: list[PatchResult] = []
+    with tempfile.TemporaryDirectory(prefix="patch-precheck.") as workdir:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            futures = [pool.submit(check_package, t, p, levels, Path(workdir)) for t, p in groups.items()]
+            for future in futures:
+                results.extend(future.result())
+    return results, orphans
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Dry-run all patches against their source trees before building")
+    parser.add_argument("--sources", default=".", help="Directory holding tarballs and patches")
+    parser.add_argument("--book", default=str(LFS_BOOK), help="Book directory with patches.ent")
+    parser.add_argument("--download", action="store_true", help="Download and verify missing book patches first")
+    parser.add_argument("--jobs", type=int, help="Parallel checks (default: CPU count)")
+    args = parser.parse_args()
+
+    sources = Path(args.sources)
+    problems: list[str] = []
+    if args.download:
+        problems = fetch_patches(sources, book_patches(args.book))
+    results, orphans = precheck(sources, args.book, args.jobs)
+
+    failed = [r for r in results if not r.ok]
+    for result in results:
+        print(f"{'OK  ' if result.ok else 'FAIL'} {result.package}: {result.patch}")
+    for name in orphans:
+        print(f"SKIP {name}: no matching tarball")
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if failed or problems:
+        print("\nPatches that will not apply:", file=sys.stderr)
+        for result in failed:
+            print(f"--- {result.package}: {result.patch}\n{result.output}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,228 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Build-ordered source prefetch with per-package readiness markers.
+
+``fetch`` downloads sources in the order they are given, which callers keep
+equal to the build order, using a few workers so the first packages are
+available as early as possible.  Every verified file is announced with an
+atomic ``<name>.ready`` marker (``<name>.failed`` on error), and ``wait``
+blocks a build step only until its own sources are ready, letting download
+and compilation overlap.  Size, download time and whether the source was
+already available are appended to ``fetch-stats.jsonl`` for metrics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .segmented_download import DownloadError, download
+from .source_store import SourceStore, StoreError, sha256_file
+
+READY_SUFFIX = ".ready"
+FAILED_SUFFIX = ".failed"
+DONE_MARKER = "prefetch.done"
+STATS_FILE = "fetch-stats.jsonl"
+DEFAULT_JOBS = 3
+
+
+class PrefetchError(Exception):
+    """Raised when a source a build step waits for cannot be provided."""
+
+
+def _mark(ready_dir: Path, name: str, text: str) -> None:
+    tmp = ready_dir / f".{name}.tmp"
+    tmp.write_text(text + "\n", encoding="utf-8")
+    os.replace(tmp, ready_dir / name)
+
+
+def _record_stats(ready_dir: Path, entry: dict) -> None:
+    line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+    fd = os.open(ready_dir / STATS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def load_checksums(path: str | Path) -> dict[str, str]:
+    """Read a ``sha256sum``-style file into a ``{filename: digest}`` map."""
+
+    checksums: dict[str, str] = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if len(parts) == 2 and not line.startswith("#"):
+            checksums[os.path.basename(parts[1].lstrip("*"))] = parts[0].lower()
+    return checksums
+
+
+def fetch_one(
+    url: str,
+    dest_dir: Path,
+    ready_dir: Path,
+    checksum: str | None = None,
+    store: SourceStore | None = None,
+    fetcher: Callable[[str, Path], object] = download,
+) -> bool:
+    """Fetch and verify one source, then publish its readiness marker."""
+
+    name = os.path.basename(url.rstrip("/"))
+    dest = dest_dir / name
+    downloaded = []
+    started = time.time()
+
+    def counted(target: Path) -> None:
+        begin = time.monotonic()
+        fetcher(url, target)
+        downloaded.append(time.monotonic() - begin)
+
+    try:
+        if store is not None:
+            digest = store.fetch(name, counted, dest, checksum)
+        else:
+            digest = sha256_file(dest) if dest.exists() and dest.stat().st_size else None
+            if digest is None or (checksum and digest != checksum):
+                counted(dest)
+                digest = sha256_file(dest)
+            if checksum and digest != checksum:
+                dest.unlink(missing_ok=True)
+                raise PrefetchError(f"checksum mismatch for {name}")
+        if dest.stat().st_size == 0:
+            raise PrefetchError(f"downloaded file is empty: {name}")
+    except (DownloadError, StoreError, PrefetchError, OSError, ValueError) as exc:
+        # ValueError: urllib rejects a malformed URL before any download
+        _mark(ready_dir, name + FAILED_SUFFIX, str(exc))
+        return False
+    # Hits are sources that needed no download (store or sources directory)
+    _record_stats(ready_dir, {
+        "name": name,
+        "bytes": dest.stat().st_size,
+        "seconds": round(sum(downloaded), 3),
+        "cache": "miss" if downloaded else "hit",
+        "start": round(started, 3),
+    })
+    _mark(ready_dir, name + READY_SUFFIX, digest)
+    return True
+
+
+def prefetch(
+    urls: Iterable[str],
+    dest_dir: str | Path,
+    ready_dir: str | Path,
+    jobs: int = DEFAULT_JOBS,
+    checksums: dict[str, str] | None = None,
+    store: SourceStore | None = None,
+    fetcher: Callable[[str, Path], object] = download,
+) -> list[str]:
+    """Fetch *urls* in order and return the names that failed."""
+
+    dest_dir = Path(dest_dir)
+    ready_dir = Path(ready_dir)
+    ready_dir.mkdir(parents=True, exist_ok=True)
+    for stale in ready_dir.iterdir():
+        if stale.name in (DONE_MARKER, STATS_FILE) or stale.suffix in (READY_SUFFIX, FAILED_SUFFIX):
+            stale.unlink()
+
+    urls = list(urls)
+    checksums = checksums or {}
+    # The executor hands out work in submission order, so earlier (sooner
+    # built) packages always start downloading first
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        results = list(pool.map(
+            lambda url: fetch_one(
+                url, dest_dir, ready_dir, checksums.get(os.path.basename(url.rstrip("/"))), store, fetcher
+            ),
+            urls,
+        ))
+    failed = [os.path.basename(u.rstrip("/")) for u, ok in zip(urls, results) if not ok]
+    _mark(ready_dir, DONE_MARKER, f"{len(urls) - len(failed)} ready, {len(failed)} failed")
+    return failed
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether process *pid* exists, even if owned by another user."""
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def wait_ready(
+    names: Iterable[str],
+    ready_dir: str | Path,
+    pid: int | None = None,
+    timeout: float | None = None,
+    poll: float = 0.5,
+) -> None:
+    """Block until every file in *names* is ready; raise on failure."""
+
+    ready_dir = Path(ready_dir)
+    pending = list(names)
+    deadline = time.monotonic() + timeout if timeout else None
+    while pending:
+        for name in list(pending):
+            if (ready_dir / (name + READY_SUFFIX)).exists():
+                pending.remove(name)
+                continue
+            failed = ready_dir / (name + FAILED_SUFFIX)
+            if failed.exists():
+                raise PrefetchError(f"{name}: {failed.read_text(encoding='utf-8').strip()}")
+        if not pending:
+            break
+        if (ready_dir / DONE_MARKER).exists() or (pid is not None and not pid_alive(pid)):
+            # Re-check once: the marker may have landed after the scan above
+            if all((ready_dir / (n + READY_SUFFIX)).exists() for n in pending):
+                break
+            raise PrefetchError(f"prefetch finished without providing: {', '.join(pending)}")
+        if deadline and time.monotonic() > deadline:
+            raise PrefetchError(f"timed out waiting for: {', '.join(pending)}")
+        time.sleep(poll)
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Prefetch sources in build order and publish readiness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch = sub.add_parser("fetch", help="Download URLs in the given (build) order")
+    fetch.add_argument("urls", nargs="+", help="Source URLs in build order")
+    fetch.add_argument("--dest", default=".", help="Sources directory")
+    fetch.add_argument("--ready-dir", required=True, help="Directory for readiness markers")
+    fetch.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Concurrent downloads")
+    fetch.add_argument("--checksums", help="sha256sum-style file with expected checksums")
+    fetch.add_argument("--store", default=os.environ.get("SOURCE_STORE"), help="Shared source store root")
+
+    wait = sub.add_parser("wait", help="Block until the named sources are ready")
+    wait.add_argument("names", nargs="+", help="Source file names")
+    wait.add_argument("--ready-dir", required=True, help="Directory for readiness markers")
+    wait.add_argument("--pid", type=int, help="Prefetch process to watch")
+    wait.add_argument("--timeout", type=float, help="Give up after this many seconds")
+
+    args = parser.parse_args()
+    if args.command == "fetch":
+        checksums = load_checksums(args.checksums) if args.checksums else None
+        store = SourceStore(args.store) if args.store else None
+        failed = prefetch(args.urls, args.dest, args.ready_dir, args.jobs, checksums, store)
+        for name in failed:
+            print(f"Failed to prefetch {name}", file=sys.stderr)
+        sys.exit(1 if failed else 0)
+
+    try:
+        wait_ready(args.names, args.ready_dir, args.pid, args.timeout)
+    except PrefetchError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,239 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Segmented HTTP range downloads for large source tarballs.
+
+Files above a size threshold are fetched as several parallel ``Range``
+requests written straight into a preallocated ``<name>.part`` file.  Progress
+of every segment is kept in a ``<name>.part.state`` sidecar so an interrupted
+download resumes each segment independently.  Servers that do not honour
+ranges fall back to a single sequential stream.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+USER_AGENT = "Auto-LFS-Builder/1.0"
+CHUNK_SIZE = 1 << 20
+DEFAULT_SEGMENTS = 4
+DEFAULT_THRESHOLD = 32 * 1024 * 1024
+STATE_VERSION = 1
+
+
+class DownloadError(Exception):
+    """Raised when a source download cannot be completed."""
+
+
+class RangeNotSupported(DownloadError):
+    """Raised when the server ignores ``Range`` requests."""
+
+
+def probe(url: str, timeout: float = 30) -> tuple[int | None, bool, str]:
+    """Return ``(size, accepts_ranges, effective_url)`` for *url*."""
+
+    req = Request(url, method="HEAD", headers={"User-Agent": USER_AGENT})
+    try:
+        with urlopen(req, timeout=timeout) as resp:
+            length = resp.headers.get("Content-Length")
+            ranges = resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+            return (int(length) if length else None), ranges, resp.geturl()
+    except (HTTPError, URLError, HTTPException, OSError, ValueError):
+        # Some mirrors reject HEAD or drop it; let the caller stream the file instead
+        return None, False, url
+
+
+def plan_segments(size: int, count: int) -> list[dict[str, int]]:
+    """Split *size* bytes into *count* contiguous inclusive byte ranges."""
+
+    count = max(1, min(count, size))
+    step = size // count
+    segments = []
+    for i in range(count):
+        start = i * step
+        end = size - 1 if i == count - 1 else start + step - 1
+        segments.append({"start": start, "end": end, "done": 0})
+    return segments
+
+
+class _SegmentState:
+    """Thread-safe sidecar recording how far each segment has progressed."""
+
+    def __init__(self, path: Path, url: str, size: int, segments: list[dict[str, int]]):
+        self.path = path
+        self.url = url
+        self.size = size
+        self.segments = segments
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    @classmethod
+    def load(cls, path: Path, url: str, size: int) -> "_SegmentState | None":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != STATE_VERSION or data.get("url") != url or data.get("size") != size:
+            return None
+        return cls(path, url, size, data["segments"])
+
+    def checkpoint(self, force: bool = False) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_write < 1.0:
+                return
+            self._last_write = now
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(
+                json.dumps({"version": STATE_VERSION, "url": self.url, "size": self.size, "segments": self.segments}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+
+
+def _preallocate(fd: int, size: int) -> None:
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        os.ftruncate(fd, size)
+
+
+def _fetch_segment(url: str, fd: int, seg: dict[str, int], state: _SegmentState, timeout: float, retries: int) -> None:
+    length = seg["end"] - seg["start"] + 1
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    attempt = 0
+    while seg["done"] < length:
+        offset = seg["start"] + seg["done"]
+        req = Request(url, headers={"Range": f"bytes={offset}-{seg['end']}", "User-Agent": USER_AGENT})
+        try:
+            with urlopen(req, timeout=timeout) as resp:
+                if resp.status != 206:
+                    raise RangeNotSupported(f"server ignored range request for {url}")
+                while seg["done"] < length:
+                    n = resp.readinto(buf)
+                    if not n:
+                        break
+                    n = min(n, length - seg["done"])
+                    written = 0
+                    while written < n:
+                        written += os.pwrite(fd, view[written:n], seg["start"] + seg["done"] + written)
+                    seg["done"] += n
+                    state.checkpoint()
+        except RangeNotSupported:
+            raise
+        except (HTTPError, URLError, HTTPException, OSError) as exc:
+            # HTTPException covers IncompleteRead from a dropped connection
+            attempt += 1
+            if attempt > retries:
+                raise DownloadError(f"segment {seg['start']}-{seg['end']} of {url} failed: {exc}") from exc
+            time.sleep(min(2 ** attempt, 10))
+            continue
+        if seg["done"] < length:
+            attempt += 1
+            if attempt > retries:
+                raise DownloadError(f"segment {seg['start']}-{seg['end']} of {url} ended early")
+
+
+def _download_single(url: str, dest: Path, timeout: float) -> None:
+    part = dest.with_name(dest.name + ".part")
+    # The segment offsets of an earlier attempt no longer describe the .part
+    # this rewrites, so a later segmented run must start over
+    dest.with_name(dest.name + ".part.state").unlink(missing_ok=True)
+    req = Request(url, headers={"User-Agent": USER_AGENT})
+    try:
+        with urlopen(req, timeout=timeout) as resp, open(part, "wb") as out:
+            shutil.copyfileobj(resp, out, CHUNK_SIZE)
+    except (HTTPError, URLError, HTTPException, OSError) as exc:
+        raise DownloadError(f"failed to download {url}: {exc}") from exc
+    os.replace(part, dest)
+
+
+def download(
+    url: str,
+    dest: str | Path,
+    segments: int = DEFAULT_SEGMENTS,
+    threshold: int = DEFAULT_THRESHOLD,
+    timeout: float = 30,
+    retries: int = 3,
+) -> Path:
+    """Download *url* to *dest*, using parallel ranges for large files."""
+
+    dest = Path(dest)
+    part = dest.with_name(dest.name + ".part")
+    state_path = dest.with_name(dest.name + ".part.state")
+
+    size, ranges, effective_url = probe(url, timeout)
+    if not size or not ranges or size < threshold or segments < 2:
+        _download_single(url, dest, timeout)
+        return dest
+
+    state = _SegmentState.load(state_path, url, size) if part.exists() else None
+    if state is None:
+        state = _SegmentState(state_path, url, size, plan_segments(size, segments))
+
+    fd = os.open(part, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != size:
+            _preallocate(fd, size)
+        state.checkpoint(force=True)
+        with ThreadPoolExecutor(max_workers=len(state.segments)) as pool:
+            futures = [
+                pool.submit(_fetch_segment, effective_url, fd, seg, state, timeout, retries)
+                for seg in state.segments
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                state.checkpoint(force=True)
+    except RangeNotSupported:
+        os.close(fd)
+        fd = -1
+        part.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+        _download_single(url, dest, timeout)
+        return dest
+    finally:
+        if fd >= 0:
+            os.close(fd)
+
+    os.replace(part, dest)
+    state_path.unlink(missing_ok=True)
+    return dest
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Download a source tarball using parallel HTTP ranges")
+    parser.add_argument("url", help="URL to download")
+    parser.add_argument("-o", "--output", help="Destination file (default: basename of URL)")
+    parser.add_argument("--segments", type=int, default=int(os.environ.get("DOWNLOAD_SEGMENTS", DEFAULT_SEGMENTS)),
+                        help="Number of parallel segments")
+    parser.add_argument("--threshold", type=int,
+                        default=int(os.environ.get("SEGMENT_THRESHOLD", DEFAULT_THRESHOLD)),
+                        help="Minimum size in bytes before segmenting")
+    parser.add_argument("--timeout", type=float, default=30, help="Socket timeout in seconds")
+    args = parser.parse_args()
+
+    dest = args.output or os.path.basename(args.url.rstrip("/"))
+    try:
+        path = download(args.url, dest, segments=args.segments, threshold=args.threshold, timeout=args.timeout)
+    except DownloadError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+    print(path)
+
+
+if __name__ == "__main__":
+    _cli()
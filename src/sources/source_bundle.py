@@ -0,0 +1,205 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Single-file source bundles for offline builders and container seeding.
+
+A bundle is the concatenation of every tarball and patch followed by a JSON
+index and a fixed-size trailer::
+
+    LFSBNDL1 | member data ... | index (JSON) | LFSBIDX1 <index offset> <index length>
+
+The index records name, offset, length and SHA256 of every member, so a
+single member can be extracted with one seek and the whole bundle can be
+verified in one sequential pass.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+from pathlib import Path, PurePosixPath
+from typing import Iterable, NamedTuple
+
+MAGIC = b"LFSBNDL1"
+INDEX_MAGIC = b"LFSBIDX1"
+TRAILER = struct.Struct("<8sQQ")
+CHUNK_SIZE = 1 << 20
+
+
+class BundleError(Exception):
+    """Raised for malformed bundles or missing members."""
+
+
+class BundleMember(NamedTuple):
+    name: str
+    offset: int
+    length: int
+    sha256: str
+
+
+def create_bundle(bundle: str | Path, files: Iterable[str | Path], base: str | Path | None = None) -> list[BundleMember]:
+    """Write *files* into *bundle*, hashing each member while it is copied."""
+
+    bundle = Path(bundle)
+    tmp = bundle.with_name(bundle.name + ".tmp")
+    members: list[BundleMember] = []
+    seen: set[str] = set()
+    with open(tmp, "wb") as out:
+        out.write(MAGIC)
+        for path in files:
+            path = Path(path)
+            name = path.relative_to(base).as_posix() if base else path.name
+            if name in seen:
+                raise BundleError(f"duplicate member name: {name}")
+            seen.add(name)
+            digest = hashlib.sha256()
+            offset = out.tell()
+            with open(path, "rb") as src:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+            members.append(BundleMember(name, offset, out.tell() - offset, digest.hexdigest()))
+        index = json.dumps([m._asdict() for m in members]).encode("utf-8")
+        index_offset = out.tell()
+        out.write(index)
+        out.write(TRAILER.pack(INDEX_MAGIC, index_offset, len(index)))
+    os.replace(tmp, bundle)
+    return members
+
+
+def read_index(bundle: str | Path) -> dict[str, BundleMember]:
+    """Return the members of *bundle* keyed by name."""
+
+    with open(bundle, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise BundleError(f"{bundle} is not a source bundle")
+        fh.seek(-TRAILER.size, os.SEEK_END)
+        magic, offset, length = TRAILER.unpack(fh.read(TRAILER.size))
+        if magic != INDEX_MAGIC:
+            raise BundleError(f"{bundle} has no index trailer")
+        fh.seek(offset)
+        entries = json.loads(fh.read(length).decode("utf-8"))
+    return {e["name"]: BundleMember(**e) for e in entries}
+
+
+def _safe_target(dest_dir: Path, name: str) -> Path:
+    rel = PurePosixPath(name)
+    if rel.is_absolute() or ".." in rel.parts:
+        raise BundleError(f"refusing unsafe member name: {name}")
+    return dest_dir.joinpath(*rel.parts)
+
+
+def extract(
+    bundle: str | Path,
+    names: Iterable[str] | None = None,
+    dest_dir: str | Path = ".",
+    verify: bool = True,
+) -> list[Path]:
+    """Extract *names* (or every member) from *bundle* into *dest_dir*."""
+
+    index = read_index(bundle)
+    wanted = list(names) if names else list(index)
+    missing = [n for n in wanted if n not in index]
+    if missing:
+        raise BundleError(f"not in bundle: {', '.join(missing)}")
+
+    dest_dir = Path(dest_dir)
+    written: list[Path] = []
+    with open(bundle, "rb") as src:
+        for name in wanted:
+            member = index[name]
+            target = _safe_target(dest_dir, name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".bundle-tmp")
+            digest = hashlib.sha256()
+            with open(tmp, "wb") as out:
+                src.seek(member.offset)
+                remaining = member.length
+                while remaining:
+                    chunk = src.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise BundleError(f"{bundle} is truncated inside {name}")
+                    if verify:
+                        digest.update(chunk)
+                    out.write(chunk)
+                    remaining -= len(chunk)
+            if verify and digest.hexdigest() != member.sha256:
+                tmp.unlink()
+                raise BundleError(f"checksum mismatch for {name}")
+            os.replace(tmp, target)
+            written.append(target)
+    return written
+
+
+def verify_bundle(bundle: str | Path) -> list[str]:
+    """Stream *bundle* once and return the names of corrupt members."""
+
+    members = sorted(read_index(bundle).values(), key=lambda m: m.offset)
+    bad: list[str] = []
+    with open(bundle, "rb") as fh:
+        for member in members:
+            fh.seek(member.offset)
+            digest = hashlib.sha256()
+            remaining = member.length
+            while remaining:
+                chunk = fh.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+            if remaining or digest.hexdigest() != member.sha256:
+                bad.append(member.name)
+    return bad
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Create and read indexed source bundles")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    create = sub.add_parser("create", help="Bundle a source directory")
+    create.add_argument("bundle", help="Bundle file to write")
+    create.add_argument("source_dir", help="Directory of tarballs and patches")
+
+    listing = sub.add_parser("list", help="List bundle members")
+    listing.add_argument("bundle")
+
+    ext = sub.add_parser("extract", help="Extract members (all by default)")
+    ext.add_argument("bundle")
+    ext.add_argument("names", nargs="*", help="Members to extract")
+    ext.add_argument("-C", "--directory", default=".", help="Destination directory")
+    ext.add_argument("--no-verify", action="store_true", help="Skip checksum verification")
+
+    check = sub.add_parser("verify", help="Verify every member checksum")
+    check.add_argument("bundle")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "create":
+            root = Path(args.source_dir)
+            files = sorted(p for p in root.rglob("*") if p.is_file())
+            members = create_bundle(args.bundle, files, base=root)
+            print(f"Bundled {len(members)} files into {args.bundle}")
+        elif args.command == "list":
+            for member in read_index(args.bundle).values():
+                print(f"{member.sha256}  {member.length:>12}  {member.name}")
+        elif args.command == "extract":
+            for path in extract(args.bundle, args.names, args.directory, verify=not args.no_verify):
+                print(path)
+        else:
+            bad = verify_bundle(args.bundle)
+            for name in bad:
+                print(f"Corrupt member: {name}", file=sys.stderr)
+            if bad:
+                sys.exit(1)
+            print(f"{args.bundle}: OK")
+    except (BundleError, OSError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,336 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Host-wide content-addressed store for source tarballs and patches.
+
+Objects live under ``objects/<aa>/<sha256>`` and are published with an
+atomic rename, so concurrent builders never see a partial file.  Each object
+is guarded by its own ``flock`` while it is fetched or evicted, and the store
+keeps a ``names/`` index so files without a known checksum are still
+downloaded only once.  Workspaces receive a hardlink, a reflink, a symlink or
+(as a last resort) a copy of the stored object.  Least recently used objects
+are evicted once the store grows past its size cap, except those a workspace
+symlink still points to: each symlink is recorded under ``pins/<sha256>/``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .segmented_download import DownloadError, download
+
+DEFAULT_ROOT = Path(os.environ.get("SOURCE_STORE", "/var/cache/lfs-sources"))
+DEFAULT_MAX_SIZE = "20G"
+LINK_MODES = ("auto", "hardlink", "reflink", "symlink", "copy")
+FICLONE = 0x40049409
+# Objects used this recently are never evicted, protecting in-flight fetches
+EVICT_GRACE = 300
+_SIZE_SUFFIXES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+class StoreError(Exception):
+    """Raised when the source store cannot satisfy a request."""
+
+
+def parse_size(text: str) -> int:
+    """Convert a size such as ``20G`` or ``512M`` into bytes."""
+
+    text = text.strip().upper().rstrip("B").rstrip("I")
+    suffix = text[-1] if text and text[-1] in _SIZE_SUFFIXES else ""
+    number = text[: -1] if suffix else text
+    try:
+        return int(float(number) * _SIZE_SUFFIXES[suffix])
+    except ValueError as exc:
+        raise StoreError(f"invalid size: {text}") from exc
+
+
+def sha256_file(path: str | Path) -> str:
+    """Return the hex SHA256 digest of *path*."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    with open(src, "rb") as fin, open(dest, "wb") as fout:
+        fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+
+
+class SourceStore:
+    """Content-addressed source cache shared by all builders on a host."""
+
+    def __init__(self, root: str | Path = DEFAULT_ROOT, max_size: int | None = None):
+        self.root = Path(root)
+        self.max_size = max_size
+        self.objects = self.root / "objects"
+        self.names = self.root / "names"
+        self.locks = self.root / "locks"
+        self.tmp = self.root / "tmp"
+        self.pins = self.root / "pins"
+        for directory in (self.objects, self.names, self.locks, self.tmp, self.pins):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    # -- locking -----------------------------------------------------------
+
+    @contextmanager
+    def _lock(self, name: str, blocking: bool = True) -> Iterator[bool]:
+        fd = os.open(self.locks / f"{name}.lock", os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+        finally:
+            os.close(fd)
+
+    # -- object access -----------------------------------------------------
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def lookup(self, digest: str) -> Path | None:
+        """Return the stored path for *digest* and mark it as recently used."""
+
+        path = self.object_path(digest)
+        if not path.exists():
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Owned by another builder: keep its last-used time
+            pass
+        return path
+
+    def digest_for_name(self, name: str) -> str | None:
+        try:
+            digest = (self.names / name).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return digest if self.object_path(digest).exists() else None
+
+    def publish(self, path: str | Path, name: str | None = None, digest: str | None = None) -> str:
+        """Move *path* into the store atomically and return its digest."""
+
+        path = Path(path)
+        actual = sha256_file(path)
+        if digest and actual != digest.lower():
+            path.unlink(missing_ok=True)
+            raise StoreError(f"checksum mismatch for {name or path.name}: expected {digest}, got {actual}")
+        target = self.object_path(actual)
+        target.parent.mkdir(exist_ok=True)
+        os.chmod(path, 0o444)
+        os.replace(path, target)
+        if name:
+            self._record_name(name, actual)
+        return actual
+
+    def _record_name(self, name: str, digest: str) -> None:
+        tmp = self.names / f".{name}.{os.getpid()}"
+        tmp.write_text(digest + "\n", encoding="utf-8")
+        os.replace(tmp, self.names / name)
+
+    def add(self, path: str | Path) -> str:
+        """Copy an existing file into the store without consuming it."""
+
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=self.tmp)
+        os.close(fd)
+        shutil.copyfile(path, tmp)
+        digest = self.publish(tmp, name=path.name)
+        self.evict()
+        return digest
+
+    def materialize(self, digest: str, dest: str | Path, mode: str = "auto") -> str:
+        """Place stored object *digest* at *dest*; return the link mode used."""
+
+        src = self.lookup(digest)
+        if src is None:
+            raise StoreError(f"object {digest} is not in the store")
+        dest = Path(dest)
+        if dest.exists() or dest.is_symlink():
+            try:
+                if os.path.samefile(src, dest):
+                    if dest.is_symlink():
+                        self._pin(digest, dest)
+                    return "present"
+            except OSError:
+                pass
+            dest.unlink()
+
+        attempts = ("hardlink", "reflink", "copy") if mode == "auto" else (mode,)
+        for attempt in attempts:
+            try:
+                if attempt == "hardlink":
+                    os.link(src, dest)
+                elif attempt == "reflink":
+                    _reflink(src, dest)
+                elif attempt == "symlink":
+                    os.symlink(src, dest)
+                    self._pin(digest, dest)
+                else:
+                    shutil.copyfile(src, dest)
+                return attempt
+            except OSError:
+                dest.unlink(missing_ok=True)
+                if mode != "auto":
+                    raise
+        raise StoreError(f"could not materialize {digest} at {dest}")
+
+    def fetch(
+        self,
+        name: str,
+        fetcher: Callable[[Path], None],
+        dest: str | Path,
+        digest: str | None = None,
+        mode: str = "auto",
+    ) -> str:
+        """Ensure *name* is stored, downloading it once host-wide, then materialize it."""
+
+        key = digest.lower() if digest else f"name-{name}"
+        with self._lock(key):
+            known = digest.lower() if digest else self.digest_for_name(name)
+            if not known or self.lookup(known) is None:
+                # A stable name under the lock lets an interrupted download resume
+                tmp = self.tmp / key
+                fetcher(tmp)
+                known = self.publish(tmp, name=name, digest=digest)
+            elif digest:
+                self._record_name(name, known)
+            self.materialize(known, dest, mode)
+        self.evict()
+        return known
+
+    # -- eviction ----------------------------------------------------------
+
+    def _pin(self, digest: str, link: Path) -> None:
+        pins = self.pins / digest
+        pins.mkdir(exist_ok=True)
+        target = os.path.abspath(link)
+        pin = pins / hashlib.sha256(target.encode()).hexdigest()[:16]
+        try:
+            os.symlink(target, pin)
+        except FileExistsError:
+            pass
+
+    def pinned(self, digest: str) -> bool:
+        """Whether a workspace symlink still points to object *digest*.
+
+        Pins of symlinks that were removed or replaced are dropped.
+        """
+
+        pins = self.pins / digest
+        if not pins.is_dir():
+            return False
+        src = str(self.object_path(digest))
+        live = False
+        for pin in pins.iterdir():
+            try:
+                if os.readlink(os.readlink(pin)) == src:
+                    live = True
+                    continue
+            except OSError:
+                pass
+            pin.unlink(missing_ok=True)
+        return live
+
+    def entries(self) -> list[tuple[float, int, Path]]:
+        """Return ``(last_used, size, path)`` for every stored object."""
+
+        result = []
+        for path in self.objects.glob("*/*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            result.append((st.st_mtime, st.st_size, path))
+        return result
+
+    def evict(self, max_size: int | None = None) -> list[Path]:
+        """Remove least recently used objects until the store fits *max_size*."""
+
+        limit = max_size if max_size is not None else self.max_size
+        if limit is None:
+            return []
+        removed: list[Path] = []
+        with self._lock("store"):
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            cutoff = time.time() - EVICT_GRACE
+            for last_used, size, path in entries:
+                if total <= limit or last_used > cutoff:
+                    break
+                with self._lock(path.name, blocking=False) as acquired:
+                    if not acquired or self.pinned(path.name):
+                        continue
+                    path.unlink(missing_ok=True)
+                    shutil.rmtree(self.pins / path.name, ignore_errors=True)
+                total -= size
+                removed.append(path)
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        entries = self.entries()
+        return {"objects": len(entries), "bytes": sum(size for _, size, _ in entries)}
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Shared content-addressed source store")
+    parser.add_argument("--root", default=str(DEFAULT_ROOT), help="Store directory")
+    parser.add_argument("--max-size", default=os.environ.get("SOURCE_STORE_MAX", DEFAULT_MAX_SIZE),
+                        help="Size cap before LRU eviction, e.g. 20G")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch = sub.add_parser("fetch", help="Download through the store and link into a workspace")
+    fetch.add_argument("url", help="Source URL")
+    fetch.add_argument("-o", "--output", help="Destination file (default: basename of URL)")
+    fetch.add_argument("--sha256", help="Expected SHA256 checksum")
+    fetch.add_argument("--link", choices=LINK_MODES, default=os.environ.get("SOURCE_STORE_LINK", "auto"),
+                       help="How to materialize the object in the workspace")
+
+    add = sub.add_parser("add", help="Publish existing files into the store")
+    add.add_argument("files", nargs="+", help="Files to add")
+
+    sub.add_parser("evict", help="Apply the size cap now")
+    sub.add_parser("stats", help="Show object count and total size")
+
+    args = parser.parse_args()
+    try:
+        store = SourceStore(args.root, parse_size(args.max_size))
+        if args.command == "fetch":
+            name = os.path.basename(args.url.rstrip("/"))
+            dest = args.output or name
+            start = time.monotonic()
+            digest = store.fetch(name, lambda tmp: download(args.url, tmp), dest, args.sha256 or None, args.link)
+            print(f"{digest}  {dest}  ({time.monotonic() - start:.1f}s)")
+        elif args.command == "add":
+            for path in args.files:
+                print(f"{store.add(path)}  {path}")
+        elif args.command == "evict":
+            for path in store.evict():
+                print(f"evicted {path.name}")
+        else:
+            info = store.stats()
+            print(f"Objects: {info['objects']}")
+            print(f"Size: {info['bytes']} bytes")
+    except (StoreError, DownloadError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1 @@
+"""Build telemetry package"""
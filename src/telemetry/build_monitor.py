@@ -0,0 +1,338 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Event-driven build monitor.
+
+The log and the telemetry stream are followed from a saved byte offset, so
+only new lines are read and a restarted monitor does not replay the whole
+build.  Wake-ups come from inotify on the log directory, falling back to a
+slow poll where inotify is unavailable.  Disk usage is taken from
+``statvfs`` on the workspace filesystem (and write bytes from the build
+cgroup when one is given), never by walking the tree.  Running package,
+queue depth and ETA come from the status file written by ``sbu_eta``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .resource_collector import read_io_stat
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+# Lines of an existing log shown when first attaching
+TAIL_LINES = 20
+
+BLUE = "\033[0;34m"
+YELLOW = "\033[1;33m"
+NC = "\033[0m"
+
+
+def _tail_offset(path: Path, lines: int, block: int = 65536) -> int:
+    """Offset of the start of the last *lines* lines of *path*."""
+
+    with open(path, "rb") as fh:
+        end = pos = fh.seek(0, os.SEEK_END)
+        if lines <= 0:
+            return end
+        # The newline ending the last line does not start another one
+        found = 0
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            fh.seek(pos)
+            data = fh.read(step)
+            idx = len(data) - 1 if pos + step == end and data.endswith(b"\n") else len(data)
+            while (idx := data.rfind(b"\n", 0, idx)) >= 0:
+                found += 1
+                if found == lines:
+                    return pos + idx + 1
+        return 0
+
+
+class LogFollower:
+    """Read lines appended to *path* since the last call.
+
+    The offset survives restarts through *offset_file*.  Without a saved
+    offset, following starts at the last *tail* lines of an existing file
+    (all of it when *tail* is None).  A new inode or a file shorter than the
+    offset (rotation or truncation) seen later starts over at 0.
+    """
+
+    def __init__(self, path: str | Path, offset_file: str | Path | None = None, tail: int | None = TAIL_LINES):
+        self.path = Path(path)
+        self.offset_file = Path(offset_file) if offset_file else None
+        self.inode = None
+        self.offset = 0
+        self._partial = b""
+        if self.offset_file and self.offset_file.exists():
+            try:
+                saved = json.loads(self.offset_file.read_text())
+                self.inode, self.offset = saved["inode"], saved["offset"]
+                return
+            except (ValueError, KeyError, OSError):
+                pass
+        if tail is not None:
+            try:
+                self.inode, self.offset = os.stat(self.path).st_ino, _tail_offset(self.path, tail)
+            except FileNotFoundError:
+                pass
+
+    def read_lines(self) -> list[str]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.inode, self.offset, self._partial = st.st_ino, 0, b""
+        if st.st_size == self.offset:
+            return []
+        with open(self.path, "rb") as fh:
+            fh.seek(self.offset)
+            data = fh.read(st.st_size - self.offset)
+        self.offset += len(data)
+        data = self._partial + data
+        *lines, self._partial = data.split(b"\n")
+        self._save()
+        return [line.decode("utf-8", "replace") for line in lines]
+
+    def _save(self) -> None:
+        if not self.offset_file:
+            return
+        tmp = self.offset_file.with_suffix(".tmp")
+        # Only whole lines count as consumed
+        tmp.write_text(json.dumps({"inode": self.inode, "offset": self.offset - len(self._partial)}))
+        os.replace(tmp, self.offset_file)
+
+
+class DirWatcher:
+    """Block until something in the watched directories changes."""
+
+    def __init__(self, dirs: list[Path], fallback_interval: float = 2.0):
+        self.fd = -1
+        self.fallback_interval = fallback_interval
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            return
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        watched = 0
+        for d in dict.fromkeys(dirs):
+            if d.is_dir() and libc.inotify_add_watch(fd, os.fsencode(d), mask) >= 0:
+                watched += 1
+        if watched:
+            self.fd = fd
+        else:
+            os.close(fd)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self.fd >= 0
+
+    def wait(self, timeout: float) -> set[str]:
+        """Return the names that changed, or an empty set on timeout."""
+
+        if self.fd < 0:
+            time.sleep(min(timeout, self.fallback_interval))
+            return set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        names = set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        pos = 0
+        while pos + _EVENT.size <= len(buf):
+            _, _, _, length = _EVENT.unpack_from(buf, pos)
+            pos += _EVENT.size
+            names.add(buf[pos:pos + length].rstrip(b"\0").decode("utf-8", "replace"))
+            pos += length
+        return names
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def disk_usage(path: str | Path) -> dict[str, int] | None:
+    """Filesystem totals for *path* from ``statvfs``."""
+
+    try:
+        st = os.statvfs(path)
+    except OSError:
+        return None
+    total = st.f_blocks * st.f_frsize
+    free = st.f_bavail * st.f_frsize
+    return {"total": total, "used": total - st.f_bfree * st.f_frsize, "free": free}
+
+
+def pressure(resource: str = "cpu") -> float | None:
+    """The ``some avg10`` PSI value for *resource*, if the kernel exposes it."""
+
+    try:
+        with open(f"/proc/pressure/{resource}", encoding="utf-8") as fh:
+            for field in fh.readline().split():
+                if field.startswith("avg10="):
+                    return float(field[6:])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _human(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if size < 1024 or unit == "TiB":
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TiB"
+
+
+class BuildMonitor:
+    """Combine log, telemetry, status and system readings into a status line."""
+
+    def __init__(
+        self,
+        log: str | Path,
+        workspace: str | Path,
+        telemetry: str | Path | None = None,
+        status: str | Path | None = None,
+        cgroup: str | Path | None = None,
+        state_dir: str | Path | None = None,
+        write: Callable[[str], None] | None = None,
+    ):
+        self.log_path = Path(log)
+        self.workspace = Path(workspace)
+        self.status_path = Path(status) if status else None
+        self.cgroup = Path(cgroup) if cgroup else None
+        state = Path(state_dir) if state_dir else None
+        if state:
+            state.mkdir(parents=True, exist_ok=True)
+        self.log = LogFollower(log, state / "log.offset" if state else None)
+        # Telemetry is reset per build and all of it feeds the status line
+        self.telemetry = (LogFollower(telemetry, state / "telemetry.offset" if state else None, tail=None)
+                          if telemetry else None)
+        self.write = write or (lambda text: print(text, flush=True))
+        self.finished: list[dict[str, Any]] = []
+        self.status: dict[str, Any] = {}
+        self.started = time.time()
+        self._last_line = ""
+
+    def watch_dirs(self) -> list[Path]:
+        paths = [self.log_path, self.status_path, self.telemetry.path if self.telemetry else None]
+        return [p.parent for p in paths if p is not None]
+
+    def _read_status(self) -> None:
+        if not self.status_path:
+            return
+        try:
+            self.status = json.loads(self.status_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+
+    def update(self) -> None:
+        """Consume new input and print log lines plus a changed status line."""
+
+        for line in self.log.read_lines():
+            self.write(line)
+        if self.telemetry:
+            for line in self.telemetry.read_lines():
+                try:
+                    self.finished.append(json.loads(line))
+                except ValueError:
+                    continue
+        self._read_status()
+        line = self.status_line()
+        if line != self._last_line:
+            self._last_line = line
+            self.write(f"{BLUE}{line}{NC}")
+
+    def status_line(self) -> str:
+        parts = []
+        st = self.status
+        if st:
+            queued = max(st.get("total", 0) - st.get("done", 0) - (1 if st.get("current") else 0), 0)
+            parts.append(f"running: {st.get('current') or '-'}")
+            parts.append(f"queue: {queued}")
+            parts.append(f"{st.get('percent', 0):.1f}% done")
+            if st.get("eta"):
+                parts.append("ETA " + time.strftime("%H:%M", time.localtime(st["eta"])))
+        elif self.finished:
+            parts.append(f"finished: {self.finished[-1].get('package')} ({len(self.finished)} steps)")
+        load = os.getloadavg()[0]
+        parts.append(f"load {load:.2f}")
+        psi = pressure("cpu")
+        if psi is not None:
+            parts.append(f"cpu psi {psi:.0f}%")
+        usage = disk_usage(self.workspace)
+        if usage:
+            parts.append(f"disk {_human(usage['used'])} used, {_human(usage['free'])} free")
+        if self.cgroup:
+            io = read_io_stat(self.cgroup / "io.stat")
+            if io:
+                parts.append(f"written {_human(io['wbytes'])}")
+        # Whole minutes keep the line stable between real changes
+        elapsed = int(time.time() - self.started) // 60
+        parts.append(f"elapsed {elapsed // 60}h {elapsed % 60}m")
+        return " | ".join(parts)
+
+    def run(self, refresh: float = 10.0) -> None:
+        """Follow the build until interrupted."""
+
+        watcher = DirWatcher(self.watch_dirs())
+        mode = "inotify" if watcher.uses_inotify else "polling"
+        self.write(f"{YELLOW}=== Build Monitor ({mode}) watching {self.log_path} ==={NC}")
+        try:
+            while True:
+                self.update()
+                watcher.wait(refresh)
+        finally:
+            watcher.close()
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Follow an LFS build without polling the workspace")
+    parser.add_argument("--log", required=True, help="Build log to follow")
+    parser.add_argument("--workspace", required=True, help="Workspace whose filesystem usage is reported")
+    parser.add_argument("--telemetry", help="Telemetry JSON lines file")
+    parser.add_argument("--status", help="Status JSON written by telemetry.sbu_eta")
+    parser.add_argument("--cgroup", default=os.environ.get("TELEMETRY_CGROUP"),
+                        help="Build cgroup v2 directory for write accounting")
+    parser.add_argument("--state-dir", help="Directory that keeps read offsets between runs")
+    parser.add_argument("--refresh", type=float, default=10.0,
+                        help="Seconds between load/disk refreshes when nothing changes")
+    args = parser.parse_args()
+
+    monitor = BuildMonitor(args.log, args.workspace, args.telemetry, args.status, args.cgroup, args.state_dir)
+    try:
+        monitor.run(args.refresh)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,157 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Chrome/Perfetto trace-event timeline of a build.
+
+The build driver appends begin/end events to a JSON lines file using only
+shell builtins (``$EPOCHREALTIME``), one pair per package and per stage.
+The command line turns them into the Trace Event Format understood by
+``chrome://tracing`` and https://ui.perfetto.dev: every package becomes a
+complete (``X``) span on a worker lane and its stages nest inside it.
+Stage names follow the book's ``remap`` roles (``pre``, ``configure``,
+``make``, ``test``, ``install``) plus ``extract``.  Source downloads from the
+prefetcher's ``fetch-stats.jsonl`` go on lanes of their own, so idle cores,
+serial configure steps and downloads the build waited for stand out.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from .resource_collector import read_records
+
+BUILD_PID = 1
+DOWNLOAD_PID = 2
+PACKAGE_STAGE = "package"
+# Book remap roles and the trace category each one is shown under
+REMAP_CATEGORIES = {
+    "pre": "prepare",
+    "extract": "prepare",
+    "configure": "configure",
+    "make": "make",
+    "test": "check",
+    "check": "check",
+    "install": "install",
+    "download": "download",
+}
+
+
+def pair_events(events: list[dict[str, Any]], end_ts: int | None = None) -> list[dict[str, Any]]:
+    """Match ``B``/``E`` events into spans; spans still open end at *end_ts*."""
+
+    open_spans: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    spans = []
+    for event in sorted(events, key=lambda e: e["ts"]):
+        key = (event.get("package", ""), event["name"])
+        if event["ph"] == "B":
+            open_spans.setdefault(key, []).append(event)
+        elif event["ph"] == "E" and open_spans.get(key):
+            begin = open_spans[key].pop()
+            spans.append(_span(begin, event["ts"], event.get("status")))
+    if end_ts is not None:
+        for stack in open_spans.values():
+            for begin in stack:
+                spans.append(_span(begin, max(end_ts, begin["ts"]), "unfinished"))
+    return sorted(spans, key=lambda s: (s["ts"], -s["dur"]))
+
+
+def _span(begin: dict[str, Any], end_ts: int, status: Any) -> dict[str, Any]:
+    span = {"name": begin["name"], "package": begin.get("package", ""),
+            "ts": begin["ts"], "dur": end_ts - begin["ts"]}
+    if status not in (None, 0, "0"):
+        span["status"] = status
+    return span
+
+
+def assign_lanes(intervals: list[tuple[int, int]]) -> list[int]:
+    """Give each ``(start, end)`` interval the lowest lane free at its start."""
+
+    lane_ends: list[int] = []
+    lanes = []
+    for start, end in intervals:
+        for lane, busy_until in enumerate(lane_ends):
+            if busy_until <= start:
+                lane_ends[lane] = end
+                break
+        else:
+            lane = len(lane_ends)
+            lane_ends.append(end)
+        lanes.append(lane)
+    return lanes
+
+
+def build_trace(
+    events: list[dict[str, Any]],
+    fetch_stats: list[dict[str, Any]] | None = None,
+    end_ts: int | None = None,
+) -> dict[str, Any]:
+    """Return a Trace Event Format document for the recorded build."""
+
+    spans = pair_events(events, end_ts)
+    packages = [s for s in spans if s["name"] == PACKAGE_STAGE]
+    stages = [s for s in spans if s["name"] != PACKAGE_STAGE]
+
+    trace: list[dict[str, Any]] = [
+        {"ph": "M", "name": "process_name", "pid": BUILD_PID, "args": {"name": "build"}},
+        {"ph": "M", "name": "process_name", "pid": DOWNLOAD_PID, "args": {"name": "downloads"}},
+    ]
+    lane_of: dict[str, int] = {}
+    for span, lane in zip(packages, assign_lanes([(s["ts"], s["ts"] + s["dur"]) for s in packages])):
+        lane_of[span["package"]] = lane
+        trace.append(_event(span["package"], "package", span, BUILD_PID, lane + 1))
+    worker_lanes = max(lane_of.values(), default=-1) + 1
+    # Stages outside any package span (or without one) get a lane of their own
+    loose = worker_lanes + 1
+    for span in stages:
+        lane = lane_of.get(span["package"])
+        tid = lane + 1 if lane is not None else loose
+        name = span["name"] if lane is not None else f"{span['package']}: {span['name']}"
+        trace.append(_event(name, REMAP_CATEGORIES.get(span["name"], span["name"]), span, BUILD_PID, tid))
+    for lane in range(worker_lanes):
+        trace.append({"ph": "M", "name": "thread_name", "pid": BUILD_PID, "tid": lane + 1,
+                      "args": {"name": f"worker {lane + 1}"}})
+    if any(s["package"] not in lane_of for s in stages):
+        trace.append({"ph": "M", "name": "thread_name", "pid": BUILD_PID, "tid": loose,
+                      "args": {"name": "driver"}})
+
+    downloads = [d for d in fetch_stats or [] if d.get("start") is not None]
+    intervals = [(int(d["start"] * 1e6), int((d["start"] + d.get("seconds", 0)) * 1e6)) for d in downloads]
+    for entry, lane, (start, end) in zip(downloads, assign_lanes(intervals), intervals):
+        span = {"ts": start, "dur": end - start}
+        event = _event(entry["name"], "download", span, DOWNLOAD_PID, lane + 1)
+        event["args"].update(bytes=entry.get("bytes"), cache=entry.get("cache"))
+        trace.append(event)
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def _event(name: str, category: str, span: dict[str, Any], pid: int, tid: int) -> dict[str, Any]:
+    args = {k: span[k] for k in ("package", "status") if span.get(k)}
+    return {"ph": "X", "name": name, "cat": category, "ts": span["ts"], "dur": span["dur"],
+            "pid": pid, "tid": tid, "args": args}
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Render recorded build events as a Chrome/Perfetto trace")
+    parser.add_argument("--events", required=True, help="JSON lines of B/E events written by the build driver")
+    parser.add_argument("--fetch-stats", help="fetch-stats.jsonl written by sources.prefetch")
+    parser.add_argument("--output", required=True, help="Trace JSON to write")
+    args = parser.parse_args()
+
+    events = [e for e in read_records(args.events) if {"ph", "name", "ts"} <= e.keys()]
+    stats = read_records(args.fetch_stats) if args.fetch_stats else []
+    last = max((e["ts"] for e in events), default=None)
+    trace = build_trace(events, stats, last)
+
+    tmp = args.output + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(trace, fh)
+    os.replace(tmp, args.output)
+    print(f"Wrote {len(trace['traceEvents'])} trace events to {Path(args.output)}")
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,253 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Buffered per-package log writer with rotation, compression and an index.
+
+``make_build`` pipes a package's output into this sidecar instead of
+``tee -a build.log``.  The stream goes to ``<dir>/<package>.<n>.log``
+through a large write buffer, so gigabytes of verbose compiler output cost a few
+thousand ``write`` calls rather than one per line.  When a segment reaches
+the rotation size the next one is started and the full one is compressed
+in a background thread: with zstd when the ``zstd`` command or the
+``zstandard`` module is available, otherwise with gzip.  Every segment is
+recorded in ``index.jsonl`` with its byte range in the package stream, so a
+tool can jump straight to a package, or to an offset within it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+DEFAULT_DIR = Path(os.environ.get("PACKAGE_LOG_DIR", "logs/packages"))
+DEFAULT_ROTATE = 64 * 1024 * 1024
+BUFFER_SIZE = 1024 * 1024
+INDEX_NAME = "index.jsonl"
+
+
+def compressor() -> str:
+    """Name of the compression used for rotated segments."""
+
+    if zstandard is not None or shutil.which("zstd"):
+        return "zst"
+    return "gz"
+
+
+def compress_file(path: Path, kind: str | None = None) -> Path:
+    """Compress *path* in place, returning the new file name."""
+
+    kind = kind or compressor()
+    target = path.with_name(f"{path.name}.{kind}")
+    if kind == "zst" and zstandard is not None:
+        with open(path, "rb") as src, open(target, "wb") as dst:
+            zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(src, dst)
+    elif kind == "zst":
+        subprocess.run(["zstd", "-q", "-3", "-T0", "-f", "-o", str(target), str(path)], check=True)
+    else:
+        with open(path, "rb") as src, gzip.open(target, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, BUFFER_SIZE)
+    path.unlink()
+    return target
+
+
+def _append_index(index: Path, entry: dict[str, Any]) -> None:
+    line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+    fd = os.open(index, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def read_index(log_dir: str | Path = DEFAULT_DIR, package: str | None = None) -> list[dict[str, Any]]:
+    """Index entries (optionally only those of *package*) in write order."""
+
+    entries = []
+    try:
+        with open(Path(log_dir) / INDEX_NAME, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if package is None or entry["package"] == package:
+                    entries.append(entry)
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _open_segment(path: Path) -> BinaryIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        if zstandard is not None:
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        proc = subprocess.run(["zstd", "-q", "-d", "-c", str(path)], check=True, capture_output=True)
+        return io.BytesIO(proc.stdout)
+    return open(path, "rb")
+
+
+def read_range(log_dir: str | Path, package: str, start: int = 0, length: int | None = None) -> bytes:
+    """Return *length* bytes of *package*'s stream from offset *start*."""
+
+    log_dir = Path(log_dir)
+    end = None if length is None else start + length
+    chunks = []
+    for entry in read_index(log_dir, package):
+        if entry["end"] <= start or (end is not None and entry["start"] >= end):
+            continue
+        path = log_dir / entry["file"]
+        if not path.exists() and path.suffix in (".gz", ".zst"):
+            # Compression of the rotated segment has not finished yet
+            path = path.with_suffix("")
+        with _open_segment(path) as fh:
+            skip = max(start - entry["start"], 0)
+            while skip:
+                skipped = len(fh.read(min(skip, BUFFER_SIZE)))
+                if not skipped:
+                    break
+                skip -= skipped
+            want = None if end is None else min(end, entry["end"]) - max(start, entry["start"])
+            chunks.append(fh.read() if want is None else fh.read(want))
+    return b"".join(chunks)
+
+
+class PackageLog:
+    """Write one package's stream to rotating, compressed segments."""
+
+    def __init__(self, log_dir: str | Path, package: str, rotate_size: int = DEFAULT_ROTATE,
+                 compress: bool = True):
+        self.dir = Path(log_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.package = package
+        self.name = re.sub(r"[^\w.+-]", "_", package)
+        self.rotate_size = rotate_size
+        self.compress = compress
+        self.index = self.dir / INDEX_NAME
+        # Continue the package's byte offsets after earlier runs
+        previous = read_index(self.dir, package)
+        self.stream_offset = previous[-1]["end"] if previous else 0
+        self.segment = max((e["segment"] for e in previous), default=0)
+        self._threads: list[threading.Thread] = []
+        self._open()
+
+    def _open(self) -> None:
+        self.segment += 1
+        self.path = self.dir / f"{self.name}.{self.segment}.log"
+        self.fh: BinaryIO = open(self.path, "wb", buffering=BUFFER_SIZE)
+        self.start = self.stream_offset
+        self.size = 0
+        self.started = time.time()
+
+    def write(self, data: bytes) -> None:
+        while data:
+            room = self.rotate_size - self.size
+            # Prefer to cut segments at a line boundary
+            cut = len(data) if len(data) < room else (data.rfind(b"\n", 0, room) + 1 or room)
+            self.fh.write(data[:cut])
+            self.size += cut
+            self.stream_offset += cut
+            data = data[cut:]
+            if self.size >= self.rotate_size or data:
+                self._rotate(final=False)
+                self._open()
+
+    def _rotate(self, final: bool) -> None:
+        self.fh.close()
+        if final and not self.size:
+            self.path.unlink()
+            return
+        entry = {
+            "package": self.package,
+            "segment": self.segment,
+            "start": self.start,
+            "end": self.stream_offset,
+            "opened": round(self.started, 3),
+            "closed": round(time.time(), 3),
+            "file": self.path.name,
+        }
+        # The last segment stays plain so the build does not wait for it
+        if self.compress and not final:
+            kind = compressor()
+            entry["file"] = f"{self.path.name}.{kind}"
+            thread = threading.Thread(target=compress_file, args=(self.path, kind))
+            thread.start()
+            self._threads.append(thread)
+        _append_index(self.index, entry)
+
+    def close(self) -> None:
+        self._rotate(final=True)
+        for thread in self._threads:
+            thread.join()
+
+
+def pump(source: BinaryIO, log: PackageLog, echo: BinaryIO | None = None) -> int:
+    """Copy *source* into *log* (and *echo*) until EOF; return bytes copied."""
+
+    total = 0
+    # read1 returns whatever the pipe holds instead of waiting for a full buffer
+    read = getattr(source, "read1", source.read)
+    while True:
+        chunk = read(BUFFER_SIZE)
+        if not chunk:
+            break
+        log.write(chunk)
+        if echo is not None:
+            echo.write(chunk)
+            echo.flush()
+        total += len(chunk)
+    return total
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Write a package's build output to rotating compressed logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write = sub.add_parser("write", help="Read stdin into the package's log")
+    write.add_argument("--package", required=True)
+    write.add_argument("--dir", default=str(DEFAULT_DIR), help="Per-package log directory")
+    write.add_argument("--rotate-size", type=int,
+                       default=int(os.environ.get("LOG_ROTATE_SIZE", DEFAULT_ROTATE)),
+                       help="Rotate the live file at this many bytes")
+    write.add_argument("--no-compress", action="store_true", help="Keep rotated segments uncompressed")
+    write.add_argument("--echo", action="store_true", help="Also copy the stream to stdout")
+
+    show = sub.add_parser("index", help="Print the segments recorded for a package")
+    show.add_argument("package", nargs="?")
+    show.add_argument("--dir", default=str(DEFAULT_DIR))
+    args = parser.parse_args()
+
+    if args.command == "index":
+        for entry in read_index(args.dir, args.package):
+            print(f"{entry['package']:<28} #{entry['segment']:<3} {entry['start']:>12} - {entry['end']:<12} "
+                  f"{entry['file']}")
+        return
+
+    log = PackageLog(args.dir, args.package, args.rotate_size, not args.no_compress)
+    try:
+        pump(sys.stdin.buffer, log, sys.stdout.buffer if args.echo else None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,328 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Historical build-performance database and cross-run regression checks.
+
+Each finished build's telemetry is stored in an SQLite file as one run,
+keyed by host fingerprint, book revision, compiler flags and parallelism,
+with one row per package and phase.  ``compare`` diffs a run against
+another run or against a rolling baseline of earlier comparable runs: with
+three or more baseline runs a package is a regression only if it falls
+outside the one-sided 95% prediction interval of the baseline *and* grew by
+more than the relative threshold; with fewer runs only the threshold
+applies.  ``expected_durations`` gives the scheduler and ETA the median
+time each package really took on this kind of host.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .resource_collector import read_records
+
+DOCS_ROOT = Path(__file__).resolve().parents[2] / "docs"
+DEFAULT_DB = Path(os.environ.get("PERF_HISTORY_DB", "logs/perf-history.sqlite"))
+DEFAULT_THRESHOLD = 0.05
+DEFAULT_BASELINE_RUNS = 5
+
+# One-sided 95% Student t quantiles by degrees of freedom
+_T95 = {1: 6.314, 2: 2.920, 3: 2.353, 4: 2.132, 5: 2.015, 6: 1.943, 7: 1.895,
+        8: 1.860, 9: 1.833, 10: 1.812, 15: 1.753, 20: 1.725, 30: 1.697}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded REAL NOT NULL,
+    label TEXT,
+    host TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    book_revision TEXT NOT NULL,
+    flags TEXT NOT NULL,
+    jobs INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (fingerprint, book_revision, flags, jobs);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    package TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    wall_s REAL NOT NULL,
+    user_s REAL,
+    sys_s REAL,
+    max_rss_kb INTEGER,
+    read_bytes INTEGER,
+    write_bytes INTEGER,
+    exit_status INTEGER
+);
+CREATE INDEX IF NOT EXISTS samples_package ON samples (package, phase);
+"""
+
+
+class HistoryError(Exception):
+    """Raised for unknown runs or unusable telemetry."""
+
+
+class Change(NamedTuple):
+    package: str
+    phase: str
+    baseline_s: float
+    current_s: float
+    ratio: float
+    significant: bool
+
+
+def host_fingerprint() -> str:
+    """Hash of CPU model, CPU count, memory size and kernel release."""
+
+    model = platform.processor()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("model name"):
+                    model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1 << 30)
+    except (ValueError, OSError):
+        memory = 0
+    ident = f"{model}|{os.cpu_count()}|{memory}GiB|{platform.release()}"
+    return hashlib.sha256(ident.encode()).hexdigest()[:16]
+
+
+def book_revision(book_dir: str | Path = DOCS_ROOT / "lfs-git") -> str:
+    """``<relnum>+<packages.ent hash>`` for the vendored book."""
+
+    book_dir = Path(book_dir)
+    relnum = "unknown"
+    try:
+        match = re.search(r'<!ENTITY % relnum "([^"]+)"', (book_dir / "general.ent").read_text())
+        if match:
+            relnum = match.group(1)
+        digest = hashlib.sha256((book_dir / "packages.ent").read_bytes()).hexdigest()[:12]
+    except OSError:
+        return relnum
+    return f"{relnum}+{digest}"
+
+
+def connect(path: str | Path = DEFAULT_DB) -> sqlite3.Connection:
+    """Open (and create if needed) the history database at *path*."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def record_run(
+    conn: sqlite3.Connection,
+    records: list[dict[str, Any]],
+    jobs: int,
+    flags: str = "",
+    revision: str | None = None,
+    label: str | None = None,
+    fingerprint: str | None = None,
+) -> int:
+    """Store telemetry *records* as a new run and return its id."""
+
+    if not records:
+        raise HistoryError("no telemetry records to store")
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO runs (recorded, label, host, fingerprint, book_revision, flags, jobs)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), label, records[0].get("host", platform.node()),
+             fingerprint or host_fingerprint(), revision or book_revision(), flags, jobs),
+        )
+        run_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, r["package"], r.get("phase", "build"), r["wall_s"], r.get("user_s"),
+              r.get("sys_s"), r.get("max_rss_kb"), r.get("read_bytes"), r.get("write_bytes"),
+              r.get("exit_status", 0)) for r in records],
+        )
+    return run_id
+
+
+def _run(conn: sqlite3.Connection, run_id: int | None) -> sqlite3.Row:
+    if run_id is None:
+        row = conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+    else:
+        row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if row is None:
+        raise HistoryError(f"no such run: {run_id if run_id is not None else 'latest'}")
+    return row
+
+
+def _timings(conn: sqlite3.Connection, run_ids: list[int]) -> dict[tuple[str, str], list[float]]:
+    """``{(package, phase): [wall_s per run]}`` for successful samples."""
+
+    per_run: dict[tuple[str, str], dict[int, float]] = {}
+    marks = ",".join("?" * len(run_ids))
+    for row in conn.execute(
+        f"SELECT run_id, package, phase, wall_s FROM samples"
+        f" WHERE run_id IN ({marks}) AND exit_status = 0", run_ids
+    ):
+        runs = per_run.setdefault((row["package"], row["phase"]), {})
+        runs[row["run_id"]] = runs.get(row["run_id"], 0.0) + row["wall_s"]
+    return {key: list(runs.values()) for key, runs in per_run.items()}
+
+
+def baseline_runs(conn: sqlite3.Connection, run: sqlite3.Row, count: int = DEFAULT_BASELINE_RUNS) -> list[int]:
+    """Ids of the *count* latest runs before *run* with the same key."""
+
+    rows = conn.execute(
+        "SELECT id FROM runs WHERE fingerprint = ? AND book_revision = ? AND flags = ? AND jobs = ?"
+        " AND id < ? ORDER BY id DESC LIMIT ?",
+        (run["fingerprint"], run["book_revision"], run["flags"], run["jobs"], run["id"], count),
+    )
+    return [row["id"] for row in rows]
+
+
+def _t95(df: int) -> float:
+    known = [d for d in _T95 if d <= df]
+    return _T95[max(known)] if known else _T95[1]
+
+
+def is_significant(baseline: list[float], value: float, threshold: float = DEFAULT_THRESHOLD) -> bool:
+    """Whether *value* is a regression against the *baseline* samples."""
+
+    mean = statistics.fmean(baseline)
+    if value <= mean * (1 + threshold):
+        return False
+    if len(baseline) < 3:
+        return True
+    sd = statistics.stdev(baseline)
+    # Upper bound of the prediction interval for one new observation
+    limit = mean + _t95(len(baseline) - 1) * sd * math.sqrt(1 + 1 / len(baseline))
+    return value > limit
+
+
+def compare(
+    conn: sqlite3.Connection,
+    run_id: int | None = None,
+    against: int | None = None,
+    baseline: int = DEFAULT_BASELINE_RUNS,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Change]:
+    """Compare a run with run *against*, or with its rolling baseline."""
+
+    run = _run(conn, run_id)
+    ref_ids = [_run(conn, against)["id"]] if against is not None else baseline_runs(conn, run, baseline)
+    if not ref_ids:
+        raise HistoryError(f"run {run['id']} has no comparable earlier runs")
+    current = _timings(conn, [run["id"]])
+    reference = _timings(conn, ref_ids)
+    changes = []
+    for key, values in sorted(current.items()):
+        if key not in reference:
+            continue
+        mean = statistics.fmean(reference[key])
+        value = values[0]
+        changes.append(Change(key[0], key[1], round(mean, 3), round(value, 3),
+                              round(value / mean, 3) if mean else math.inf,
+                              is_significant(reference[key], value, threshold)))
+    return changes
+
+
+def expected_durations(
+    conn: sqlite3.Connection,
+    jobs: int | None = None,
+    fingerprint: str | None = None,
+    runs: int = DEFAULT_BASELINE_RUNS,
+) -> dict[str, float]:
+    """Median wall time per package over the latest runs on this host."""
+
+    query = "SELECT id FROM runs WHERE fingerprint = ?"
+    params: list[Any] = [fingerprint or host_fingerprint()]
+    if jobs is not None:
+        query += " AND jobs = ?"
+        params.append(jobs)
+    ids = [row["id"] for row in conn.execute(query + " ORDER BY id DESC LIMIT ?", (*params, runs))]
+    if not ids:
+        return {}
+    totals: dict[str, list[float]] = {}
+    for (package, _), values in _timings(conn, ids).items():
+        totals.setdefault(package, []).append(statistics.median(values))
+    return {package: round(sum(values), 3) for package, values in totals.items()}
+
+
+def _format_changes(changes: list[Change]) -> str:
+    lines = [f"{'package':<28}{'phase':<10}{'baseline':>10}{'current':>10}{'change':>9}"]
+    for c in changes:
+        flag = "  REGRESSION" if c.significant else ""
+        lines.append(f"{c.package:<28}{c.phase:<10}{c.baseline_s:>9.1f}s{c.current_s:>9.1f}s"
+                     f"{(c.ratio - 1) * 100:>+8.1f}%{flag}")
+    return "\n".join(lines)
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Store build timings and detect cross-run regressions")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="SQLite history database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Store a finished build's telemetry as a run")
+    rec.add_argument("--telemetry", default=os.environ.get("TELEMETRY_FILE", "logs/telemetry.jsonl"))
+    rec.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    rec.add_argument("--flags", default=os.environ.get("CFLAGS", ""), help="Compiler flags of the build")
+    rec.add_argument("--book-revision", default=os.environ.get("BOOK_REVISION"))
+    rec.add_argument("--label")
+
+    cmp_ = sub.add_parser("perf-compare", help="Compare a run with another run or a rolling baseline")
+    cmp_.add_argument("run", nargs="?", type=int, help="Run id (default: latest)")
+    cmp_.add_argument("--against", type=int, help="Compare with this run instead of the baseline")
+    cmp_.add_argument("--baseline", type=int, default=DEFAULT_BASELINE_RUNS, help="Runs in the rolling baseline")
+    cmp_.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum relative slowdown")
+    cmp_.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+
+    sub.add_parser("runs", help="List stored runs")
+
+    est = sub.add_parser("estimates", help="Print expected per-package durations as JSON")
+    est.add_argument("--jobs", type=int)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    try:
+        if args.command == "record":
+            run_id = record_run(conn, read_records(args.telemetry), args.jobs, args.flags,
+                                args.book_revision, args.label)
+            print(f"Recorded run {run_id}")
+        elif args.command == "perf-compare":
+            changes = compare(conn, args.run, args.against, args.baseline, args.threshold)
+            if args.json:
+                print(json.dumps([c._asdict() for c in changes], indent=2))
+            else:
+                print(_format_changes(changes))
+            if any(c.significant for c in changes):
+                sys.exit(1)
+        elif args.command == "runs":
+            for row in conn.execute("SELECT * FROM runs ORDER BY id"):
+                stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["recorded"]))
+                print(f"{row['id']:>4}  {stamp}  {row['host']}  {row['book_revision']}  -j{row['jobs']}"
+                      f"  {row['flags'] or '-'}  {row['label'] or ''}")
+        else:
+            print(json.dumps(expected_durations(conn, args.jobs), indent=2, sort_keys=True))
+    except HistoryError as exc:
+        print(f"perf_history: {exc}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    _cli()
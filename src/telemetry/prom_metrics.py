@@ -0,0 +1,235 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Prometheus node_exporter textfile export of build progress and host pressure.
+
+The exporter turns the files the build already writes into metrics: the
+status from ``sbu_eta`` (packages done and remaining, ETA), the telemetry
+records (per-phase and per-package durations), and the prefetcher's
+``fetch-stats.jsonl`` (source cache hits and download throughput).  To
+these it adds the configured parallelism and PSI cpu/memory/io pressure.
+The file is written to a temporary name and renamed, so node_exporter's
+textfile collector never reads a partial file.  ``--interval`` keeps
+rewriting it until the build process named by ``--pid`` exits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from .resource_collector import read_records
+
+try:
+    from ..sources.prefetch import pid_alive
+except ImportError:
+    from sources.prefetch import pid_alive  # run with src on PYTHONPATH
+
+PREFIX = "lfs_build"
+PSI_RESOURCES = ("cpu", "memory", "io")
+
+
+def read_pressure(resource: str, root: str | Path = "/proc/pressure") -> dict[str, dict[str, float]]:
+    """``{"some": {"avg10": .., "total": ..}, "full": {...}}`` for *resource*."""
+
+    result: dict[str, dict[str, float]] = {}
+    try:
+        with open(Path(root) / resource, encoding="utf-8") as fh:
+            for line in fh:
+                kind, *fields = line.split()
+                values = dict(field.split("=", 1) for field in fields)
+                result[kind] = {key: float(value) for key, value in values.items()}
+    except (OSError, ValueError):
+        pass
+    return result
+
+
+def _number(value: float) -> str:
+    # "%g" would round timestamps to six significant digits
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricSet:
+    """Collect samples and render them in the text exposition format."""
+
+    def __init__(self, labels: dict[str, str] | None = None):
+        self.labels = labels or {}
+        self._metrics: dict[str, tuple[str, str, list[tuple[dict[str, str], float]]]] = {}
+
+    def add(self, metric: str, metric_type: str, help_text: str, value: float, **labels: str) -> None:
+        name = f"{PREFIX}_{metric}"
+        entry = self._metrics.setdefault(name, (metric_type, help_text, []))
+        entry[2].append(({**self.labels, **labels}, value))
+
+    def render(self) -> str:
+        lines = []
+        for name, (metric_type, help_text, samples) in self._metrics.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items()))
+                sample = f"{name}{{{label_text}}}" if label_text else name
+                lines.append(f"{sample} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _load_json(path: str | Path | None) -> dict[str, Any]:
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_lines(path: str | Path | None) -> Iterable[dict[str, Any]]:
+    return read_records(path) if path else []
+
+
+def collect(
+    status_file: str | Path | None = None,
+    telemetry_file: str | Path | None = None,
+    fetch_stats: str | Path | None = None,
+    jobs: int | None = None,
+    labels: dict[str, str] | None = None,
+    pressure_root: str | Path = "/proc/pressure",
+    now: float | None = None,
+) -> MetricSet:
+    """Gather every build and host metric into a :class:`MetricSet`."""
+
+    now = time.time() if now is None else now
+    metrics = MetricSet(labels)
+    metrics.add("last_update_timestamp_seconds", "gauge", "When this file was written.", now)
+
+    status = _load_json(status_file)
+    if status:
+        metrics.add("packages_done", "gauge", "Packages finished in this build.", status.get("done", 0))
+        metrics.add("packages_remaining", "gauge", "Packages left in the build plan.",
+                    max(status.get("total", 0) - status.get("done", 0), 0))
+        metrics.add("progress_ratio", "gauge", "Completed share of the plan, weighted by book SBU.",
+                    status.get("percent", 0) / 100)
+        if status.get("remaining_s") is not None:
+            metrics.add("eta_seconds", "gauge", "Predicted seconds until the build finishes.",
+                        status["remaining_s"])
+        if status.get("sbu_seconds"):
+            metrics.add("sbu_seconds", "gauge", "Measured length of one SBU on this host.",
+                        status["sbu_seconds"])
+        if jobs is None:
+            jobs = status.get("jobs")
+    if jobs:
+        metrics.add("parallel_jobs", "gauge", "Configured make parallelism.", jobs)
+
+    phases: dict[str, float] = {}
+    # One series per (package, phase): a retried step reports its latest run
+    durations: dict[tuple[str, str], float] = {}
+    last_end = 0.0
+    failures = 0
+    for rec in _load_lines(telemetry_file):
+        phase = rec.get("phase", "build")
+        phases[phase] = phases.get(phase, 0.0) + rec.get("wall_s", 0.0)
+        durations[(rec.get("package", ""), phase)] = rec.get("wall_s", 0.0)
+        last_end = max(last_end, rec.get("end", 0.0))
+        failures += rec.get("exit_status", 0) != 0
+    for (package, phase), seconds in durations.items():
+        metrics.add("package_duration_seconds", "gauge", "Wall time of a package build step.",
+                    seconds, package=package, phase=phase)
+    for phase, seconds in sorted(phases.items()):
+        metrics.add("phase_duration_seconds_total", "counter", "Wall time spent per build phase.",
+                    seconds, phase=phase)
+    if last_end:
+        metrics.add("last_step_end_timestamp_seconds", "gauge", "When the last build step finished.", last_end)
+        metrics.add("step_failures_total", "counter", "Build steps that exited non-zero.", failures)
+
+    hits = misses = 0
+    downloaded = seconds = 0.0
+    for entry in _load_lines(fetch_stats):
+        if entry.get("cache") == "hit":
+            hits += 1
+        else:
+            misses += 1
+            downloaded += entry.get("bytes", 0)
+            seconds += entry.get("seconds", 0.0)
+    if hits or misses:
+        metrics.add("source_cache_hits_total", "counter", "Sources found without downloading.", hits)
+        metrics.add("source_cache_misses_total", "counter", "Sources that had to be downloaded.", misses)
+        metrics.add("source_cache_hit_ratio", "gauge", "Share of sources served from cache.",
+                    hits / (hits + misses))
+        metrics.add("download_bytes_total", "counter", "Bytes downloaded for sources.", downloaded)
+        metrics.add("download_seconds_total", "counter", "Time spent downloading sources.", seconds)
+        if seconds:
+            metrics.add("download_throughput_bytes_per_second", "gauge",
+                        "Average source download throughput.", downloaded / seconds)
+
+    for resource in PSI_RESOURCES:
+        for kind, values in read_pressure(resource, pressure_root).items():
+            if "avg10" in values:
+                metrics.add("pressure_avg10_ratio", "gauge", "PSI stall share over the last 10 seconds.",
+                            values["avg10"] / 100, resource=resource, kind=kind)
+            if "total" in values:
+                metrics.add("pressure_stall_seconds_total", "counter", "PSI total stall time.",
+                            values["total"] / 1e6, resource=resource, kind=kind)
+    return metrics
+
+
+def write_textfile(path: str | Path, text: str) -> None:
+    """Atomically replace *path* with *text*."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Write build metrics as a node_exporter textfile")
+    parser.add_argument("--output", required=True, help="Textfile to write (e.g. .../textfile_collector/lfs.prom)")
+    parser.add_argument("--status", help="Status JSON written by telemetry.sbu_eta")
+    parser.add_argument("--telemetry", help="Telemetry JSON lines file")
+    parser.add_argument("--fetch-stats", help="fetch-stats.jsonl written by sources.prefetch")
+    parser.add_argument("--jobs", type=int, help="Configured parallel jobs")
+    parser.add_argument("--label", action="append", default=[], metavar="KEY=VALUE",
+                        help="Constant label added to every sample (repeatable)")
+    parser.add_argument("--interval", type=float, help="Rewrite every INTERVAL seconds instead of once")
+    parser.add_argument("--pid", type=int, help="Stop when this process exits")
+    args = parser.parse_args()
+
+    labels = {"builder": socket.gethostname()}
+    for item in args.label:
+        key, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"label must be KEY=VALUE: {item}")
+        labels[key] = value
+
+    def once() -> None:
+        metrics = collect(args.status, args.telemetry, args.fetch_stats, args.jobs, labels)
+        write_textfile(args.output, metrics.render())
+
+    once()
+    if not args.interval:
+        return
+    try:
+        while args.pid is None or pid_alive(args.pid):
+            time.sleep(args.interval)
+            once()
+    except KeyboardInterrupt:
+        sys.exit(0)
+    # Leave a final sample behind; last_update stops advancing from here
+    once()
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Run a package build step and record its resource usage as a JSON line.
+
+The command's rusage from ``wait4`` covers wall time, user and system CPU,
+peak RSS of the process tree, block I/O and context switches.  When a
+delegated cgroup v2 directory is given (for example the ``jhalfs`` group
+set up by ``run-in-cgroup.sh``), the build runs in its own child cgroup and
+``cpu.stat``, ``memory.peak`` and ``io.stat`` replace the rusage values,
+which also accounts for daemonized or unreaped processes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+DEFAULT_OUTPUT = Path(os.environ.get("TELEMETRY_FILE", "logs/telemetry.jsonl"))
+
+
+def _read_kv(path: Path) -> dict[str, int]:
+    values: dict[str, int] = {}
+    try:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            key, _, value = line.partition(" ")
+            if value.strip().isdigit():
+                values[key] = int(value)
+    except OSError:
+        pass
+    return values
+
+
+def read_io_stat(path: Path) -> dict[str, int]:
+    """Sum the read and written bytes of all devices in a cgroup ``io.stat``."""
+
+    totals = {"rbytes": 0, "wbytes": 0}
+    try:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition("=")
+                if key in totals:
+                    totals[key] += int(value)
+    except OSError:
+        return {}
+    return totals
+
+
+class _Cgroup:
+    """Per-build child cgroup under a delegated cgroup v2 directory."""
+
+    def __init__(self, parent: Path, name: str):
+        self.path = parent / f"{name}.{os.getpid()}"
+        self.path.mkdir()
+
+    def enter(self) -> None:
+        # Runs in the child between fork and exec
+        (self.path / "cgroup.procs").write_text(str(os.getpid()))
+
+    def stats(self) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        cpu = _read_kv(self.path / "cpu.stat")
+        if cpu:
+            result["user_s"] = cpu.get("user_usec", 0) / 1e6
+            result["sys_s"] = cpu.get("system_usec", 0) / 1e6
+        try:
+            result["max_rss_kb"] = int((self.path / "memory.peak").read_text()) // 1024
+        except (OSError, ValueError):
+            pass
+        io = read_io_stat(self.path / "io.stat")
+        if io:
+            result["read_bytes"] = io["rbytes"]
+            result["write_bytes"] = io["wbytes"]
+        return result
+
+    def remove(self) -> None:
+        try:
+            self.path.rmdir()
+        except OSError:
+            # Leftover daemons keep the group alive; leave it for inspection
+            pass
+
+
+def run_and_record(
+    cmd: list[str],
+    package: str,
+    output: str | Path = DEFAULT_OUTPUT,
+    phase: str = "build",
+    cgroup_root: str | Path | None = None,
+) -> int:
+    """Run *cmd*, append a telemetry record for *package* and return its exit status."""
+
+    cgroup = None
+    if cgroup_root:
+        try:
+            cgroup = _Cgroup(Path(cgroup_root), package.replace("/", "_"))
+        except OSError:
+            cgroup = None
+
+    start = time.time()
+    begin = time.monotonic()
+    proc = subprocess.Popen(cmd, preexec_fn=cgroup.enter if cgroup else None)
+    while True:
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+            break
+        except InterruptedError:
+            continue
+    wall = time.monotonic() - begin
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    exit_code = proc.returncode if proc.returncode >= 0 else 128 - proc.returncode
+
+    record: dict[str, Any] = {
+        "package": package,
+        "phase": phase,
+        "host": socket.gethostname(),
+        "start": round(start, 3),
+        "end": round(start + wall, 3),
+        "wall_s": round(wall, 3),
+        "user_s": round(usage.ru_utime, 3),
+        "sys_s": round(usage.ru_stime, 3),
+        "max_rss_kb": usage.ru_maxrss,
+        "read_bytes": usage.ru_inblock * 512,
+        "write_bytes": usage.ru_oublock * 512,
+        "voluntary_ctxt": usage.ru_nvcsw,
+        "involuntary_ctxt": usage.ru_nivcsw,
+        "exit_status": exit_code,
+        "source": "rusage",
+    }
+    if cgroup:
+        stats = cgroup.stats()
+        if stats:
+            record.update({k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()})
+            record["source"] = "cgroup"
+        cgroup.remove()
+
+    write_record(record, output)
+    return exit_code
+
+
+def write_record(record: dict[str, Any], output: str | Path = DEFAULT_OUTPUT) -> None:
+    """Append *record* to *output* as a single JSON line."""
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(record, sort_keys=True) + "\n").encode("utf-8")
+    # One O_APPEND write keeps lines from concurrent builds intact
+    fd = os.open(output, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def read_records(path: str | Path = DEFAULT_OUTPUT) -> list[dict[str, Any]]:
+    """Load all telemetry records from *path*, skipping damaged lines."""
+
+    records = []
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a build command and record its resource usage",
+        usage="%(prog)s --package NAME [options] -- command [args...]",
+    )
+    parser.add_argument("--package", required=True, help="Package being built")
+    parser.add_argument("--phase", default="build", help="Build phase label")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Telemetry JSON lines file")
+    parser.add_argument("--cgroup-root", default=os.environ.get("TELEMETRY_CGROUP"),
+                        help="Delegated cgroup v2 directory for per-build accounting")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run")
+    args = parser.parse_args()
+
+    cmd = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not cmd:
+        parser.error("no command given")
+    sys.exit(run_and_record(cmd, args.package, args.output, args.phase, args.cgroup_root))
+
+
+if __name__ == "__main__":
+    _cli()
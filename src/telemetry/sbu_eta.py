@@ -0,0 +1,250 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Live SBU calibration and ETA prediction for an in-flight build.
+
+The book expresses build times in SBUs, the time binutils pass 1 takes on
+the reader's machine.  This module measures that unit from the running
+build's telemetry, scales a previous calibration when the parallelism
+changed, and combines it with the book SBU of every package left in the
+build plan.  The prediction is refined as packages finish by comparing the
+measured times with the predicted ones, and packages with durations from
+earlier runs in the performance history use those instead.  When the plan
+carries dependencies the ETA follows the critical path instead of the plain
+sum.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from . import perf_history
+from .resource_collector import read_records
+
+try:
+    from ..parsers.book_entities import expand, load_entities
+except ImportError:
+    from parsers.book_entities import expand, load_entities  # run with src on PYTHONPATH
+
+DOCS_ROOT = Path(__file__).resolve().parents[2] / "docs"
+PACKAGES_ENT = DOCS_ROOT / "lfs-git" / "packages.ent"
+REFERENCE_KEY = "binutils-tmpp1"
+PARALLEL_EFFICIENCY = 0.7
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+class PlanEntry(NamedTuple):
+    package: str
+    sbu: float
+    deps: tuple[str, ...] = ()
+    reference: bool = False
+
+
+def parse_sbu(text: str) -> float | None:
+    """Convert a book SBU string such as ``less than 0.1 SBU`` into a number."""
+
+    typical = re.search(r"typically about (\d+(?:\.\d+)?)", text)
+    if typical:
+        return float(typical.group(1))
+    match = _NUMBER_RE.search(text)
+    return float(match.group(0)) if match else None
+
+
+def book_sbu(packages_ent: str | Path = PACKAGES_ENT) -> dict[str, float]:
+    """Return ``{"gcc-tmpp1": 3.2, ...}`` from the book's ``*-sbu`` entities."""
+
+    result = {}
+    entities = load_entities(packages_ent)
+    for key, value in entities.items():
+        if key.endswith("-sbu"):
+            sbu = parse_sbu(expand(value, entities))
+            if sbu is not None:
+                result[key[: -len("-sbu")]] = sbu
+    return result
+
+
+def speedup(jobs: int, efficiency: float = PARALLEL_EFFICIENCY) -> float:
+    """Rough parallel speed-up of a typical package build at ``-j<jobs>``."""
+
+    return 1 + efficiency * (max(jobs, 1) - 1)
+
+
+def scale_sbu(seconds: float, from_jobs: int, to_jobs: int) -> float:
+    """Translate an SBU measured at ``-j<from_jobs>`` to ``-j<to_jobs>``."""
+
+    return seconds * speedup(from_jobs) / speedup(to_jobs)
+
+
+def load_plan(path: str | Path, sbus: dict[str, float] | None = None) -> list[PlanEntry]:
+    """Parse a plan of ``<package> <sbu-key|number> [dep,dep...]`` lines."""
+
+    sbus = book_sbu() if sbus is None else sbus
+    plan = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        ref = parts[1] if len(parts) > 1 else parts[0]
+        try:
+            sbu = float(ref)
+        except ValueError:
+            sbu = sbus.get(ref, 1.0 if ref == REFERENCE_KEY else 0.1)
+        deps = tuple(parts[2].split(",")) if len(parts) > 2 else ()
+        plan.append(PlanEntry(parts[0], sbu, deps, ref == REFERENCE_KEY))
+    return plan
+
+
+def critical_path(plan: list[PlanEntry], cost: dict[str, float]) -> float:
+    """Length of the longest dependency chain through *cost*."""
+
+    names = {e.package for e in plan}
+    longest: dict[str, float] = {}
+    for entry in plan:  # plan order is a valid topological order
+        before = max((longest.get(d, 0.0) for d in entry.deps if d in names), default=0.0)
+        longest[entry.package] = before + cost.get(entry.package, 0.0)
+    return max(longest.values(), default=0.0)
+
+
+def estimate(
+    plan: list[PlanEntry],
+    records: list[dict[str, Any]],
+    jobs: int,
+    workers: int = 1,
+    calibration: dict[str, Any] | None = None,
+    now: float | None = None,
+    history: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """Return progress and ETA for *plan* given telemetry *records*.
+
+    *history* maps packages to durations measured by earlier runs on this
+    host (see ``perf_history.expected_durations``); those replace the SBU
+    prediction for the packages they cover.
+    """
+
+    now = time.time() if now is None else now
+    durations: dict[str, float] = {}
+    last_end = None
+    for rec in records:
+        if rec.get("exit_status", 0) == 0:
+            durations[rec["package"]] = durations.get(rec["package"], 0.0) + rec["wall_s"]
+            last_end = max(last_end or 0.0, rec["end"])
+
+    reference = next((e for e in plan if e.reference and e.package in durations), None)
+    sbu_seconds = None
+    source = None
+    if reference is not None:
+        sbu_seconds = durations[reference.package] / (reference.sbu or 1.0)
+        source = "measured"
+    elif calibration and calibration.get("sbu_seconds"):
+        sbu_seconds = scale_sbu(calibration["sbu_seconds"], calibration.get("jobs", jobs), jobs)
+        source = "previous run"
+
+    done = [e for e in plan if e.package in durations]
+    remaining = [e for e in plan if e.package not in durations]
+    total_sbu = sum(e.sbu for e in plan) or 1.0
+    done_sbu = sum(e.sbu for e in done)
+    result: dict[str, Any] = {
+        "updated": round(now, 3),
+        "jobs": jobs,
+        "done": len(done),
+        "total": len(plan),
+        "percent": round(100.0 * done_sbu / total_sbu, 1),
+        "current": remaining[0].package if remaining else None,
+        "sbu_seconds": round(sbu_seconds, 2) if sbu_seconds else None,
+        "calibration": source,
+        "remaining_s": None,
+        "eta": None,
+    }
+    history = history or {}
+    if not sbu_seconds and not all(e.package in history for e in remaining):
+        return result
+    sbu_seconds = sbu_seconds or 0.0
+
+    # Correct the book's relative SBUs with what this host actually did
+    predicted_done = sum(e.sbu for e in done) * sbu_seconds
+    actual_done = sum(durations[e.package] for e in done)
+    correction = actual_done / predicted_done if done and predicted_done else 1.0
+
+    cost = {e.package: history.get(e.package, e.sbu * sbu_seconds * correction) for e in remaining}
+    if remaining and last_end:
+        # The first remaining package is in flight since the last one ended
+        running = remaining[0].package
+        cost[running] = max(cost[running] - (now - last_end), 0.0)
+
+    total = sum(cost.values())
+    if any(e.deps for e in plan):
+        left = critical_path(remaining, cost)
+        left = max(left, total / max(workers, 1))
+    else:
+        left = total / max(workers, 1) if workers > 1 else total
+    result.update(
+        remaining_s=round(left, 1),
+        eta=round(now + left, 1),
+        correction=round(correction, 3),
+    )
+    return result
+
+
+def format_summary(status: dict[str, Any]) -> str:
+    """Render *status* as a single log line."""
+
+    head = f"{status['percent']:.1f}% complete ({status['done']}/{status['total']} packages)"
+    if status.get("remaining_s") is None:
+        return f"{head}, calibrating SBU"
+    left = int(status["remaining_s"])
+    eta = time.strftime("%H:%M", time.localtime(status["eta"]))
+    basis = (f"1 SBU = {status['sbu_seconds']:.0f}s at -j{status['jobs']}" if status["sbu_seconds"]
+             else "from build history")
+    return f"{head}, ~{left // 3600}h {left % 3600 // 60}m remaining (ETA {eta}, {basis})"
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Estimate build progress and time remaining from SBUs")
+    parser.add_argument("--plan", required=True, help="Build plan: '<package> <sbu-key|number> [deps]' per line")
+    parser.add_argument("--telemetry", default=os.environ.get("TELEMETRY_FILE", "logs/telemetry.jsonl"),
+                        help="Telemetry JSON lines written by resource_collector")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Configured parallel jobs")
+    parser.add_argument("--workers", type=int, default=1, help="Packages built concurrently")
+    parser.add_argument("--packages-ent", default=str(PACKAGES_ENT), help="Book packages.ent")
+    parser.add_argument("--calibration", help="File remembering the SBU between runs")
+    parser.add_argument("--output", help="Write the status as JSON to this file")
+    parser.add_argument("--history", help="perf_history database with earlier runs on this host")
+    args = parser.parse_args()
+
+    calibration = None
+    if args.calibration and os.path.exists(args.calibration):
+        with open(args.calibration, encoding="utf-8") as fh:
+            calibration = json.load(fh)
+
+    history = None
+    if args.history and os.path.exists(args.history):
+        conn = perf_history.connect(args.history)
+        try:
+            history = perf_history.expected_durations(conn, args.jobs)
+        finally:
+            conn.close()
+
+    plan = load_plan(args.plan, book_sbu(args.packages_ent))
+    status = estimate(plan, read_records(args.telemetry), args.jobs, args.workers, calibration,
+                      history=history)
+
+    if args.calibration and status["calibration"] == "measured":
+        with open(args.calibration, "w", encoding="utf-8") as fh:
+            json.dump({"sbu_seconds": status["sbu_seconds"], "jobs": args.jobs}, fh)
+    if args.output:
+        tmp = args.output + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(status, fh, indent=2)
+        os.replace(tmp, args.output)
+    print(format_summary(status))
+
+
+if __name__ == "__main__":
+    _cli()
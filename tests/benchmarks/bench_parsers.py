@@ -0,0 +1,260 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 The LFS Automation Team
+
+"""Benchmarks of the documentation parsers against the vendored ``docs/`` trees.
+
+Each benchmark runs a fixed workload: the build commands of every LFS
+chapter, the full-book LFS dependency graph and its build order, the BLFS
+dependency graph, and loading and evaluating jhalfs' ``Config.in`` and the
+BLFS kernel-config test Kconfig with kconfiglib.
+
+*Cold* is the first run in a fresh interpreter, including the imports the
+workload needs and any parse caches starting empty.  *Warm* is the best and
+median of repeated runs in one process after a warm-up.  Peak memory is the
+tracemalloc peak of one warm run.  Results are written as JSON tagged with
+the git commit, so two commits can be compared with ``--compare``::
+
+    python3 -m tests.benchmarks.bench_parsers --output bench.json
+    python3 -m tests.benchmarks.bench_parsers --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+from typing import Any, Callable
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DOCS_ROOT = REPO_ROOT / "docs"
+KCONFIGLIB_DIR = DOCS_ROOT / "jhalfs" / "menu"
+KCONFIG_FILES = {
+    "jhalfs": DOCS_ROOT / "jhalfs" / "Config.in",
+    "kernel_testdata": DOCS_ROOT / "blfs-git" / "kernel-config" / "testdata" / "Kconfig",
+}
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10
+# Timing differences below this are noise, whatever the ratio
+MIN_DELTA_S = 0.005
+
+
+class BenchmarkError(Exception):
+    """Raised when a benchmark cannot be run or compared."""
+
+
+def _lfs_chapters() -> list[Path]:
+    return sorted(p for p in (DOCS_ROOT / "lfs-git").glob("chapter*/*.xml"))
+
+
+def _lfs_packages() -> list[str]:
+    from src.parsers.dependency_resolver import DEPENDENCY_XML
+
+    text = DEPENDENCY_XML.read_text(encoding="utf-8")
+    return [name.strip() for name in re.findall(r"<bridgehead[^>]*>(.*?)</bridgehead>", text, re.DOTALL)]
+
+
+def bench_lfs_commands() -> int:
+    """Extract build commands from every LFS chapter file."""
+
+    from src.parsers.lfs_parser import extract_build_commands
+
+    return sum(len(extract_build_commands(path)) for path in _lfs_chapters())
+
+
+def bench_lfs_graph() -> int:
+    """Build the dependency graph of the whole LFS book and sort it."""
+
+    from src.parsers.dependency_resolver import build_dependency_graph, topological_sort
+
+    return len(topological_sort(build_dependency_graph(_lfs_packages())))
+
+
+def bench_blfs_graph() -> int:
+    """Extract the required and recommended dependency graph of BLFS."""
+
+    from src.parsers.dependency_resolver import build_blfs_graph
+
+    return len(build_blfs_graph())
+
+
+def _kconfig(name: str) -> Callable[[], int]:
+    def run() -> int:
+        if str(KCONFIGLIB_DIR) not in sys.path:
+            sys.path.insert(0, str(KCONFIGLIB_DIR))
+        kconfiglib = importlib.import_module("kconfiglib")
+
+        path = KCONFIG_FILES[name]
+        kconf = kconfiglib.Kconfig(str(path), warn=False)
+        # Evaluate every symbol, which forces each dependency expression
+        return sum(len(sym.str_value) for sym in kconf.unique_defined_syms)
+
+    run.__doc__ = f"Load and evaluate {KCONFIG_FILES[name].relative_to(DOCS_ROOT)} with kconfiglib."
+    return run
+
+
+BENCHMARKS: dict[str, Callable[[], int]] = {
+    "lfs_extract_build_commands": bench_lfs_commands,
+    "lfs_dependency_graph_sort": bench_lfs_graph,
+    "blfs_dependency_graph": bench_blfs_graph,
+    "kconfig_jhalfs_load_eval": _kconfig("jhalfs"),
+    "kconfig_kernel_testdata_load_eval": _kconfig("kernel_testdata"),
+}
+
+
+def _maxrss_kib() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_cold(name: str) -> dict[str, Any]:
+    """Time the first run of *name* in a fresh interpreter."""
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "tests.benchmarks.bench_parsers", "--cold-child", name],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise BenchmarkError(f"cold run of {name} failed: {proc.stderr.strip()}")
+    return json.loads(proc.stdout)
+
+
+def _cold_child(name: str) -> None:
+    start = time.perf_counter()
+    BENCHMARKS[name]()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"cold_s": round(elapsed, 6), "maxrss_kib": _maxrss_kib()}))
+
+
+def run_warm(name: str, repeat: int = DEFAULT_REPEAT) -> dict[str, Any]:
+    """Time *repeat* runs of *name* after a warm-up and measure its peak memory."""
+
+    func = BENCHMARKS[name]
+    size = func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "warm_min_s": round(min(times), 6),
+        "warm_median_s": round(statistics.median(times), 6),
+        "runs": repeat,
+        "peak_kib": peak // 1024,
+        "result_size": size,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        proc = subprocess.run(["git", "-C", str(REPO_ROOT), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip()
+
+
+def run_benchmarks(names: list[str] | None = None, repeat: int = DEFAULT_REPEAT, cold: bool = True) -> dict[str, Any]:
+    """Run the selected benchmarks (all by default) and return the JSON report."""
+
+    names = names or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise BenchmarkError(f"unknown benchmark(s): {', '.join(unknown)}")
+    results = {}
+    for name in names:
+        result = run_cold(name) if cold else {}
+        result.update(run_warm(name, repeat))
+        results[name] = result
+    return {
+        "commit": _git_commit(),
+        "timestamp": round(time.time(), 3),
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> list[tuple[str, str, float, float, bool]]:
+    """``(benchmark, metric, baseline, current, regressed)`` for shared metrics."""
+
+    rows = []
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        for metric in ("cold_s", "warm_min_s", "peak_kib"):
+            if metric in result and old.get(metric):
+                regressed = result[metric] > old[metric] * (1 + threshold)
+                if metric.endswith("_s"):
+                    regressed = regressed and result[metric] - old[metric] >= MIN_DELTA_S
+                rows.append((name, metric, old[metric], result[metric], regressed))
+    return rows
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [f"{'benchmark':<36} {'cold':>9} {'warm min':>9} {'median':>9} {'peak KiB':>9}"]
+    for name, r in report["results"].items():
+        cold = f"{r['cold_s']:.3f}s" if "cold_s" in r else "-"
+        lines.append(f"{name:<36} {cold:>9} {r['warm_min_s']:>8.3f}s {r['warm_median_s']:>8.3f}s "
+                     f"{r['peak_kib']:>9}")
+    return "\n".join(lines)
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the documentation parsers")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run (default all: {', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Warm runs per benchmark")
+    parser.add_argument("--no-cold", action="store_true", help="Skip the fresh-interpreter run")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare with an earlier JSON report")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown counted as a regression")
+    parser.add_argument("--cold-child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # bs4 warns about parsing the book's XML as HTML on every chapter
+    warnings.simplefilter("ignore")
+
+    if args.cold_child:
+        _cold_child(args.cold_child)
+        return
+
+    try:
+        report = run_benchmarks(args.benchmarks, args.repeat, cold=not args.no_cold)
+    except BenchmarkError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(2)
+    print(format_report(report))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        rows = compare(report, baseline, args.threshold)
+        print(f"Compared with {baseline.get('commit') or args.compare}:")
+        for name, metric, old, new, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {name:<36} {metric:<12} {old:>10} -> {new:<10}{flag}")
+        if any(row[4] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,21 @@
+import pytest
+
+from tests.benchmarks import bench_parsers
+
+
+def test_warm_run_and_compare():
+    report = bench_parsers.run_benchmarks(["kconfig_kernel_testdata_load_eval"], repeat=1, cold=False)
+    result = report["results"]["kconfig_kernel_testdata_load_eval"]
+    assert result["runs"] == 1
+    assert result["result_size"] > 0
+    assert result["peak_kib"] >= 0
+
+    baseline = {"results": {"kconfig_kernel_testdata_load_eval": {"warm_min_s": 1.0, "peak_kib": 1}}}
+    rows = {metric: regressed for _, metric, _, _, regressed in bench_parsers.compare(report, baseline)}
+    assert rows["warm_min_s"] is False
+    assert rows["peak_kib"] is (result["peak_kib"] > 1.1)
+
+
+def test_unknown_benchmark_is_an_error():
+    with pytest.raises(bench_parsers.BenchmarkError, match="nope"):
+        bench_parsers.run_benchmarks(["nope"])
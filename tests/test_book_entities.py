@@ -0,0 +1,20 @@
+from src.parsers import book_entities
+
+
+def test_entities_follow_includes_and_expand(tmp_path):
+    (tmp_path / "packages.ent").write_text(
+        '<!ENTITY gcc-version "14.2.0">\n<!-- <!ENTITY gcc-version "0"> -->\n'
+        '<!ENTITY gcc-url "&gnu;gcc/gcc-&gcc-version;/gcc-&gcc-version;.tar.xz">\n'
+    )
+    (tmp_path / "book.ent").write_text(
+        '<!ENTITY gnu "https://ftp.gnu.org/gnu/">\n<!ENTITY gcc-version "13.2.0">\n'
+        '<!ENTITY % packages-entities SYSTEM "packages.ent">\n%packages-entities;\n'
+    )
+    entities = book_entities.load_entities(tmp_path / "book.ent")
+    # First declaration wins, as in XML
+    assert entities["gcc-version"] == "13.2.0"
+    assert "packages-entities" not in entities
+    assert book_entities.expand(entities["gcc-url"], entities) == (
+        "https://ftp.gnu.org/gnu/gcc/gcc-13.2.0/gcc-13.2.0.tar.xz"
+    )
+    assert book_entities.expand("&unknown;", entities) == "&unknown;"
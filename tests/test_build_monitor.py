@@ -0,0 +1,51 @@
+import json
+
+from src.telemetry import build_monitor
+
+
+def test_log_follower_resumes_and_handles_rotation(tmp_path):
+    log = tmp_path / "build.log"
+    offsets = tmp_path / "log.offset"
+    log.write_text("one\ntwo\npart")
+    follower = build_monitor.LogFollower(log, offsets)
+    assert follower.read_lines() == ["one", "two"]
+    with open(log, "a") as fh:
+        fh.write("ial\n")
+    assert follower.read_lines() == ["partial"]
+
+    # A restarted monitor continues where the last one stopped
+    with open(log, "a") as fh:
+        fh.write("three\n")
+    assert build_monitor.LogFollower(log, offsets).read_lines() == ["three"]
+
+    log.unlink()
+    log.write_text("fresh\n")
+    assert follower.read_lines() == ["fresh"]
+
+
+def test_log_follower_attaches_at_the_tail(tmp_path):
+    log = tmp_path / "build.log"
+    log.write_text("".join(f"line {i}\n" for i in range(100000)))
+    follower = build_monitor.LogFollower(log, tmp_path / "log.offset", tail=3)
+    assert follower.read_lines() == ["line 99997", "line 99998", "line 99999"]
+    assert build_monitor.LogFollower(log, tail=0).read_lines() == []
+
+
+def test_watcher_and_status_line(tmp_path):
+    watcher = build_monitor.DirWatcher([tmp_path])
+    (tmp_path / "build-status.json").write_text(json.dumps(
+        {"total": 5, "done": 2, "current": "gcc-13.2.0", "percent": 40.0, "eta": 0}))
+    if watcher.uses_inotify:
+        assert "build-status.json" in watcher.wait(1.0)
+    watcher.close()
+
+    lines = []
+    monitor = build_monitor.BuildMonitor(tmp_path / "build.log", tmp_path,
+                                         status=tmp_path / "build-status.json", write=lines.append)
+    (tmp_path / "build.log").write_text("[INFO] building gcc\n")
+    monitor.update()
+    assert lines[0] == "[INFO] building gcc"
+    assert "running: gcc-13.2.0 | queue: 2 | 40.0% done" in lines[1]
+    assert "disk" in lines[1]
+    monitor.update()
+    assert len(lines) == 2
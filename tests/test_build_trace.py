@@ -0,0 +1,33 @@
+from src.telemetry import build_trace
+
+
+def _ev(ph, name, package, ts, status=0):
+    return {"ph": ph, "name": name, "package": package, "ts": ts, "status": status}
+
+
+def test_packages_get_lanes_and_stages_nest():
+    events = [
+        _ev("B", "package", "gmp", 0), _ev("B", "configure", "gmp", 10), _ev("E", "configure", "gmp", 40),
+        _ev("B", "make", "gmp", 40), _ev("E", "make", "gmp", 90), _ev("E", "package", "gmp", 100),
+        _ev("B", "package", "mpfr", 50), _ev("B", "test", "mpfr", 60), _ev("E", "test", "mpfr", 70, 2),
+        _ev("E", "package", "mpfr", 80),
+        _ev("B", "package", "mpc", 100), _ev("B", "make", "mpc", 110),
+    ]
+    stats = [{"name": "gmp.tar.xz", "start": 0.0, "seconds": 0.00002, "bytes": 10, "cache": "miss"},
+             {"name": "mpc.tar.gz", "start": 0.00001, "seconds": 0.00001, "bytes": 5, "cache": "hit"}]
+    trace = build_trace.build_trace(events, stats, end_ts=150)["traceEvents"]
+    spans = {(e["pid"], e["name"], e["args"].get("package")): e for e in trace if e["ph"] == "X"}
+
+    assert spans[(1, "gmp", "gmp")]["tid"] == 1
+    assert spans[(1, "mpfr", "mpfr")]["tid"] == 2
+    assert spans[(1, "mpc", "mpc")]["tid"] == 1
+    assert spans[(1, "configure", "gmp")]["tid"] == 1
+    check = spans[(1, "test", "mpfr")]
+    assert (check["cat"], check["tid"], check["args"]["status"]) == ("check", 2, 2)
+    assert spans[(1, "make", "mpc")]["dur"] == 40
+    assert spans[(1, "make", "mpc")]["args"]["status"] == "unfinished"
+
+    downloads = [e for e in trace if e["ph"] == "X" and e["pid"] == build_trace.DOWNLOAD_PID]
+    assert [d["tid"] for d in downloads] == [1, 2]
+    names = {e["args"]["name"] for e in trace if e["name"] == "thread_name"}
+    assert names == {"worker 1", "worker 2"}
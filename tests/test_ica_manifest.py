@@ -0,0 +1,87 @@
+import gzip
+import importlib.util
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "docs" / "jhalfs" / "extras" / "ica_manifest.py"
+spec = importlib.util.spec_from_file_location("ica_manifest", SCRIPT)
+ica_manifest = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ica_manifest)
+
+
+def _replace(path, data, **gzip_args):
+    # Like install(1): a new inode rather than a rewrite in place
+    path.unlink(missing_ok=True)
+    if gzip_args:
+        path.write_bytes(gzip.compress(data, **gzip_args))
+    else:
+        path.write_bytes(data)
+
+
+def test_iterations_compare_by_manifest(tmp_path):
+    root, ica, logs = tmp_path / "root", tmp_path / "ICA", tmp_path / "logs"
+    (root / "usr" / "bin").mkdir(parents=True)
+    (root / "etc").mkdir()
+    (root / "usr" / "lib" / "__pycache__").mkdir(parents=True)
+    (root / "var").mkdir()
+    (root / "usr" / "bin" / "same").write_bytes(b"\x00binary")
+    (root / "etc" / "conf").write_text("a=1\nb=2\n")
+    (root / "etc" / "gone").write_text("x")
+    (root / "usr" / "bin" / "tool").write_bytes(b"\x00v1")
+    _replace(root / "etc" / "page.gz", b"manual\n", mtime=1)
+    (root / "usr" / "bin" / "link").symlink_to("same")
+    (root / "usr" / "lib" / "__pycache__" / "m.pyc").write_bytes(b"1")
+    (root / "var" / "log").write_text("noise")
+
+    args = ["scan", str(root), str(ica), "iteration-1", "--prune", "/var /tools", "--exclude-name", "__pycache__"]
+    assert ica_manifest.main(args) == 0
+    first = ica_manifest.read_manifest(str(ica / "iteration-1.manifest"))
+    assert sorted(first) == ["etc/conf", "etc/gone", "etc/page.gz", "usr/bin/link", "usr/bin/same", "usr/bin/tool"]
+    assert first["etc/page.gz"].norm == "gz" and first["usr/bin/link"].digest == "same"
+
+    # Second iteration: rebuilt files get new inodes
+    _replace(root / "etc" / "conf", b"a=1\nb=3\n")
+    _replace(root / "etc" / "page.gz", b"manual\n", mtime=2)
+    _replace(root / "usr" / "bin" / "tool", b"\x00v2")
+    (root / "etc" / "gone").unlink()
+    (root / "etc" / "new").write_text("y")
+    (root / "usr" / "bin" / "same").chmod(0o700)
+
+    entries, rehashed = ica_manifest.scan(str(root), str(ica), "iteration-2", ["/var"], ["__pycache__"])
+    # Only the replaced and new files are hashed again
+    assert rehashed == 4
+
+    assert ica_manifest.main(["compare", str(ica), "iteration-1", "iteration-2", str(logs)]) == 0
+    report = (logs / "REPORT.iteration-1Viteration-2").read_text()
+    assert "Binary files iteration-1/usr/bin/tool and iteration-2/usr/bin/tool differ\n" in report
+    assert "iteration-2/usr/bin/same differ in type or mode" in report
+    assert "page.gz" not in report
+    assert "Only in iteration-1/etc: gone\nOnly in iteration-2/etc: new\n" in report
+    text = (logs / "iteration-1Viteration-2.ASCII.DIFF").read_text()
+    assert "-b=2\n+b=3\n" in text
+
+    # Both versions of the differing files are kept; other objects are dropped
+    kept = ica / "iteration-1Viteration-2"
+    assert (kept / "iteration-1" / "usr/bin/tool").read_bytes() == b"\x00v1"
+    assert (kept / "iteration-2" / "usr/bin/tool").read_bytes() == b"\x00v2"
+    objects = {name for _, _, files in os.walk(ica / "objects") for name in files}
+    assert objects == {e.digest for e in entries.values() if e.type == "f"}
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="needs a C compiler")
+def test_relocatable_objects_keep_symbols_and_relocations(tmp_path):
+    def compile(name, source, *flags):
+        (tmp_path / "src.c").write_text(source)
+        subprocess.run(["cc", "-O2", "-c", *flags, "-o", str(tmp_path / name), str(tmp_path / "src.c")], check=True)
+        return ica_manifest.file_digest(str(tmp_path / name))
+
+    plain = compile("plain.o", "extern int e(int);\nint f(int x) { return e(x); }\n")
+    assert plain[0] == "elf"
+    # Debug information is left out, as do_ica_prep stripped it
+    assert compile("debug.o", "extern int e(int);\nint f(int x) { return e(x); }\n", "-g") == plain
+    # The code is the same, only the relocation's symbol differs
+    assert compile("other.o", "extern int e2(int);\nint f(int x) { return e2(x); }\n") != plain
@@ -0,0 +1,74 @@
+import importlib.util
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "docs" / "jhalfs" / "common" / "install_tracker.py"
+spec = importlib.util.spec_from_file_location("install_tracker", SCRIPT)
+install_tracker = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(install_tracker)
+
+
+def _install(root):
+    (root / "usr" / "bin").mkdir(parents=True)
+    (root / "usr" / "bin" / "tool").write_text("#!/bin/sh\n")
+    (root / "usr" / "bin" / "tool").chmod(0o755)
+    (root / "usr" / "bin" / "alias").symlink_to("tool")
+    (root / "scratch").write_text("gone")
+    (root / "scratch").unlink()
+
+
+def _log(path):
+    return [line.split("\t") for line in path.read_text().splitlines()]
+
+
+def test_find_fallback_logs_and_indexes(tmp_path):
+    root = tmp_path / "root"
+    (root / "sources").mkdir(parents=True)
+    (root / "old").write_text("before")
+    marker = root / "sources" / "timestamp-marker"
+    marker.touch()
+    os.utime(root / "old", ns=(0, 0))
+    os.utime(marker, ns=(10**9, 10**9))
+    _install(root)
+
+    index = tmp_path / "installed-files.db"
+    assert install_tracker.main(["stop", str(tmp_path / "state"), "tool", "--log", str(tmp_path / "tool"),
+                                 "--index", str(index), "--marker", str(marker), "--root", str(root),
+                                 "--exclude", str(root / "sources")]) == 0
+    log = _log(tmp_path / "tool")
+    assert [entry[0] for entry in log] == [str(root / "usr/bin/alias"), str(root / "usr/bin/tool")]
+    assert log[1][1:4] == ["10", log[1][2], "755"] and log[0][4] == "tool"
+
+    conn = sqlite3.connect(index)
+    assert conn.execute("SELECT method, files FROM packages").fetchall() == [("find", 2)]
+    assert install_tracker.main(["owner", "--index", str(index), str(root / "usr/bin/tool")]) == 0
+    assert install_tracker.main(["owner", "--index", str(index), str(root / "old")]) == 1
+
+
+def test_fanotify_tracks_only_the_installed_files(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    state = tmp_path / "state"
+    if not install_tracker.start(str(state)):
+        pytest.skip("fanotify is not usable here")
+    _install(root)
+
+    index = tmp_path / "installed-files.db"
+    install_tracker.stop(str(state), "tool", str(tmp_path / "tool"), str(index),
+                         excludes=[str(state), str(tmp_path / "tool"), str(index)])
+    logged = [entry[0] for entry in _log(tmp_path / "tool")]
+    # Other activity on the file system may show up, but nothing else in root
+    assert [p for p in logged if p.startswith(str(root))] == [str(root / "usr/bin/alias"),
+                                                              str(root / "usr/bin/tool")]
+    conn = sqlite3.connect(index)
+    assert conn.execute("SELECT method FROM packages").fetchone() == ("fanotify",)
+
+    # Files removed by a later package leave the index
+    assert install_tracker.start(str(state))
+    (root / "usr" / "bin" / "alias").unlink()
+    install_tracker.stop(str(state), "cleanup", str(tmp_path / "cleanup"), str(index), excludes=[str(state)])
+    assert conn.execute("SELECT path FROM files WHERE package = 'tool' AND path LIKE ?",
+                        (str(root) + "/%",)).fetchall() == [(str(root / "usr/bin/tool"),)]
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from src.parsers import instrumentation, lfs_parser
+
+
+def test_disabled_recorder_records_nothing(monkeypatch):
+    monkeypatch.setattr(instrumentation, "recorder", instrumentation.Recorder())
+    with instrumentation.stage("total"):
+        lfs_parser.extract_build_commands(Path('docs/lfs-git/chapter05/binutils-pass1.xml'))
+    assert instrumentation.recorder.stages == {}
+    assert instrumentation.recorder.files == []
+
+
+def test_timings_cache_and_summary(monkeypatch, tmp_path):
+    recorder = instrumentation.Recorder(enabled=True, out_dir=tmp_path)
+    monkeypatch.setattr(instrumentation, "recorder", recorder)
+    deps = tmp_path / "dependencies.xml"
+    deps.write_text(
+        "<appendix><bridgehead>Foo</bridgehead>"
+        "<segmentedlist id='foo-depends'><seg>Bar and Baz</seg></segmentedlist></appendix>"
+    )
+
+    with instrumentation.session("lfs_parser"):
+        lfs_parser.extract_build_commands(Path('docs/lfs-git/chapter05/binutils-pass1.xml'))
+        assert lfs_parser.resolve_dependencies("Foo", deps) == ["Bar", "Baz"]
+        assert lfs_parser.resolve_dependencies("Foo", deps) == ["Bar", "Baz"]
+
+    assert {"total", "extract_build_commands"} <= recorder.stages.keys()
+    assert recorder.cache["dependencies"] == [1, 1]
+
+    reports = instrumentation.load_reports(tmp_path)
+    assert list(reports) == ["lfs_parser"]
+    text = instrumentation.format_summary(reports, top=1)
+    assert "Slowest documents (top 1 of 1)" in text
+    assert "binutils-pass1.xml" in text
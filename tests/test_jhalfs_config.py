@@ -0,0 +1,41 @@
+import pytest
+
+from src.parsers import jhalfs_config
+
+
+@pytest.fixture
+def config(monkeypatch):
+    # JhalfsConfig sets these for kconfiglib; restore them afterwards
+    monkeypatch.setenv("CONFIG_", "")
+    monkeypatch.setenv("srctree", str(jhalfs_config.JHALFS_DIR))
+    return jhalfs_config.JhalfsConfig()
+
+
+def test_variants_from_one_parse(config, tmp_path):
+    assert config.configure() == {}
+    config.write(tmp_path / "default")
+    default = jhalfs_config.read_configuration(tmp_path / "default")
+    assert default["BOOK_LFS"] == "y" and default["BOOK_BLFS"] == "n" and default["INITSYS"] == "sysv"
+
+    assert config.configure({"BOOK_LFS_SYSD": "y", "ALL_CORES": "n"}, {"N_PARALLEL": "6"}) == {}
+    config.write(tmp_path / "systemd")
+    systemd = jhalfs_config.read_configuration(tmp_path / "systemd")
+    assert systemd["INITSYS"] == "systemd" and systemd["N_PARALLEL"] == "6"
+
+    # Each variant starts from the defaults again, or from a base file
+    assert config.configure() == {}
+    assert config.kconf.syms["INITSYS"].str_value == "sysv"
+    assert config.configure({"N_PARALLEL": "2"}, base=tmp_path / "systemd") == {}
+    assert config.kconf.syms["INITSYS"].str_value == "systemd"
+
+
+def test_overrides_are_validated(config, monkeypatch):
+    unmet = config.configure({"N_PARALLEL": "6"})
+    assert unmet == {"N_PARALLEL": ("6", "")}
+    assert "blocked by !ALL_CORES (=n)" in config.explain("N_PARALLEL")
+    with pytest.raises(jhalfs_config.JhalfsConfigError, match="unknown option.*NOPE"):
+        config.configure({"NOPE": "y"})
+
+    monkeypatch.setenv("JHALFS_OPT_BOOK_BLFS", "y")
+    monkeypatch.setenv("JHALFS_CONFIG", "/lfs-build/jhalfs/configuration")
+    assert jhalfs_config.env_overrides() == {"BOOK_BLFS": "y"}
@@ -0,0 +1,92 @@
+import pytest
+
+from src.parsers import kconfig_query, kernel_requirements
+
+KCONFIG = """\
+config EXPERT
+\tbool "Expert mode"
+
+config PCI
+\tbool "PCI support"
+\tdefault y
+
+config FB_CORE
+\tbool
+\tdefault PCI
+
+config FB
+\tbool "Framebuffer"
+\tselect FB_CORE if PCI
+
+config DRM
+\ttristate "DRM"
+\tdepends on PCI && !EXPERT
+\timply FB
+
+config LEGACY
+\tbool "Legacy drivers"
+\tdepends on PCI && EXPERT
+
+choice
+\tprompt "Panic screen"
+
+config PANIC_KMSG
+\tbool "kmsg"
+
+config PANIC_USER
+\tbool "user"
+
+endchoice
+"""
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    (tmp_path / "Kconfig").write_text(KCONFIG)
+    monkeypatch.setenv("srctree", str(tmp_path))
+    return kconfig_query.DependencyIndex(kconfig_query._load(str(tmp_path / "Kconfig"), None))
+
+
+def test_reverse_relations(index):
+    pci = index.reverse("PCI")
+    assert [name for name, _ in pci["depended_on_by"]] == ["DRM", "LEGACY"]
+    assert pci["defaulted_from_by"] == [("FB_CORE", "y")]
+    assert index.reverse("CONFIG_FB_CORE")["selected_by"] == [("FB", "PCI")]
+    assert index.reverse("FB")["implied_by"] == [("DRM", "PCI && !EXPERT")]
+    assert kconfig_query.dependency_index(index.kconf) is kconfig_query.dependency_index(index.kconf)
+    with pytest.raises(kconfig_query.KconfigQueryError, match="NOPE is not defined"):
+        index.reverse("NOPE")
+
+
+def test_explain_values(index):
+    kconf = index.kconf
+    assert index.explain("PCI").reason == "default"
+
+    kconf.set_values({"FB": "y", "DRM": "y", "LEGACY": "y", "PANIC_USER": "y"})
+    fb_core = index.explain("FB_CORE")
+    assert (fb_core.value, fb_core.reason, fb_core.selected_by) == ("y", "selected", [("FB", "PCI")])
+    assert not fb_core.visible
+
+    legacy = index.explain("LEGACY")
+    assert (legacy.value, legacy.reason) == ("n", "dependencies")
+    assert legacy.blocked_by == [("EXPERT", "n")]
+    assert "user value 'y' is ignored, the symbol is not visible" in legacy.lines()
+
+    assert index.explain("PANIC_KMSG").choice_selection == "PANIC_USER"
+
+    kconf.set_values({"FB": "n"})
+    fb = index.explain("FB")
+    assert (fb.value, fb.reason) == ("n", "user")
+    kconf.syms["FB"].unset_value()
+    fb = index.explain("FB")
+    assert (fb.value, fb.reason, fb.implied_by) == ("y", "implied", [("DRM", "PCI && !EXPERT")])
+
+
+def test_kernel_requirements_uses_the_index(tmp_path, monkeypatch):
+    (tmp_path / "Kconfig").write_text(KCONFIG)
+    monkeypatch.setenv("srctree", str(tmp_path))
+    kconf = kconfig_query._load(str(tmp_path / "Kconfig"), None)
+    result = kernel_requirements.resolve(kconf, kernel_requirements.merge_requirements(
+        [("a", {"EXPERT": " ", "LEGACY": "*"})]))
+    assert list(result.unmet) == ["LEGACY"]
+    assert kconfig_query.dependency_index(kconf).explain("LEGACY").blocked_by == [("EXPERT", "n")]
@@ -0,0 +1,71 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+MODULE = Path(__file__).resolve().parents[1] / "docs" / "jhalfs" / "menu" / "kconfiglib.py"
+kconfiglib = sys.modules.get("kconfiglib")
+if kconfiglib is None:
+    spec = importlib.util.spec_from_file_location("kconfiglib", MODULE)
+    kconfiglib = importlib.util.module_from_spec(spec)
+    sys.modules["kconfiglib"] = kconfiglib
+    spec.loader.exec_module(kconfiglib)
+
+KCONFIG = """\
+config MODULES
+\tbool "Modules"
+\toption modules
+
+config PCI
+\tbool "PCI support"
+
+config DRM
+\ttristate "DRM"
+\tdepends on PCI
+
+config FB
+\tbool "Framebuffer"
+\tselect PCI
+
+config NAME
+\tstring "Name"
+"""
+
+
+def _kconf(tmp_path, monkeypatch):
+    (tmp_path / "Kconfig").write_text(KCONFIG)
+    monkeypatch.setenv("srctree", str(tmp_path))
+    return kconfiglib.Kconfig("Kconfig", warn=False)
+
+
+def test_set_values_reports_requested_and_effective(tmp_path, monkeypatch):
+    kconf = _kconf(tmp_path, monkeypatch)
+    kconf.syms["DRM"].str_value  # cache a value that the batch must invalidate
+
+    report = kconf.set_values({"CONFIG_MODULES": "y", "DRM": 1, "PCI": "n", "FB": "y",
+                               "NAME": "lfs", "NOPE": "y"})
+    assert report == {
+        "MODULES": ("y", "y"),
+        "DRM": ("m", "m"),
+        # FB selects PCI, overriding the request
+        "PCI": ("n", "y"),
+        "FB": ("y", "y"),
+        "NAME": ("lfs", "lfs"),
+        "NOPE": ("y", None),
+    }
+
+
+def test_batch_matches_sequential_assignment(tmp_path, monkeypatch):
+    batched = _kconf(tmp_path, monkeypatch)
+    sequential = _kconf(tmp_path, monkeypatch)
+    values = [("PCI", "y"), ("DRM", "y"), ("MODULES", "y"), ("DRM", "m"), ("PCI", "n")]
+
+    for name, val in values:
+        sequential.syms[name].set_value(val)
+        sequential.syms["DRM"].str_value
+    with batched.batch():
+        with batched.batch():
+            for name, val in values:
+                batched.syms[name].set_value(val)
+        assert batched._batch_depth == 1
+    assert batched._config_contents("") == sequential._config_contents("")
+    assert batched.syms["DRM"].str_value == "n"
@@ -0,0 +1,96 @@
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+MODULE = Path(__file__).resolve().parents[1] / "docs" / "jhalfs" / "menu" / "kconfiglib.py"
+# Snapshots pickle classes by module name, so reuse an already imported copy
+kconfiglib = sys.modules.get("kconfiglib")
+if kconfiglib is None:
+    spec = importlib.util.spec_from_file_location("kconfiglib", MODULE)
+    kconfiglib = importlib.util.module_from_spec(spec)
+    sys.modules["kconfiglib"] = kconfiglib
+    spec.loader.exec_module(kconfiglib)
+
+KCONFIG = """\
+mainmenu "Test"
+
+config MODULES
+\tbool "Modules"
+\tdefault y
+
+source "$(ARCH)/Kconfig"
+
+menu "Drivers"
+
+config PCI
+\tbool "PCI support"
+\tdefault y
+
+config DRM
+\ttristate "DRM"
+\tdepends on PCI
+\tdefault m
+
+endmenu
+"""
+
+
+def _tree(tmp_path):
+    (tmp_path / "x86").mkdir()
+    (tmp_path / "Kconfig").write_text(KCONFIG)
+    (tmp_path / "x86" / "Kconfig").write_text('config X86\n\tdef_bool y\n')
+    return tmp_path
+
+
+def test_snapshot_skips_parsing_until_inputs_change(tmp_path, monkeypatch):
+    tree = _tree(tmp_path)
+    monkeypatch.setenv("srctree", str(tree))
+    monkeypatch.setenv("ARCH", "x86")
+    snap = tmp_path / "kconfig.snapshot"
+
+    fresh = kconfiglib.Kconfig("Kconfig", warn=False, snapshot=str(snap))
+    assert snap.exists()
+    assert fresh.env_vars == {"ARCH"}
+
+    # A warm load must not open any Kconfig file
+    def no_parse(*args, **kwargs):
+        raise AssertionError("parsed despite a valid snapshot")
+
+    with monkeypatch.context() as m:
+        m.setattr(kconfiglib.Kconfig, "_parse_block", no_parse)
+        warm = kconfiglib.Kconfig("Kconfig", warn=False, snapshot=str(snap))
+    assert warm._config_contents("") == fresh._config_contents("")
+    assert warm.syms["DRM"].kconfig is warm
+    assert warm.syms["DRM"].str_value == "m"
+    warm.syms["PCI"].set_value(0)
+    assert warm.syms["DRM"].str_value == "n"
+    assert warm.eval_string("X86 && MODULES") == 2
+
+    # Touching a file without changing it keeps the snapshot valid
+    os.utime(tree / "x86" / "Kconfig")
+    with monkeypatch.context() as m:
+        m.setattr(kconfiglib.Kconfig, "_parse_block", no_parse)
+        kconfiglib.Kconfig("Kconfig", warn=False, snapshot=str(snap))
+
+    (tree / "x86" / "Kconfig").write_text('config X86\n\tdef_bool y\n\nconfig X86_64\n\tdef_bool y\n')
+    assert "X86_64" in kconfiglib.Kconfig("Kconfig", warn=False, snapshot=str(snap)).syms
+
+    # A referenced environment variable invalidates it too
+    (tree / "arm").mkdir()
+    (tree / "arm" / "Kconfig").write_text('config ARM\n\tdef_bool y\n')
+    monkeypatch.setenv("ARCH", "arm")
+    arm = kconfiglib.Kconfig("Kconfig", warn=False, snapshot=str(snap))
+    assert "ARM" in arm.syms and "X86" not in arm.syms
+
+
+def test_corrupt_snapshot_falls_back_to_parsing(tmp_path, monkeypatch):
+    tree = _tree(tmp_path)
+    monkeypatch.setenv("srctree", str(tree))
+    monkeypatch.setenv("ARCH", "x86")
+    snap = tmp_path / "kconfig.snapshot"
+    snap.write_bytes(b"KCONFIGLIB-SNAPSHOT-1\ngarbage")
+
+    kconf = kconfiglib.Kconfig("Kconfig", warn=False, snapshot=str(snap))
+    assert kconf.syms["PCI"].str_value == "y"
+    assert snap.read_bytes() != b"KCONFIGLIB-SNAPSHOT-1\ngarbage"
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import tarfile
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = ROOT / "src" / "builders" / "kernel_builder.sh"
+
+# Stands in for the kernel's top-level Makefile, honouring O= like kbuild
+MAKEFILE = textwrap.dedent("""\
+    O ?= .
+    all:
+    \t@mkdir -p $(O)/arch/x86/boot
+    \t@echo build >> $(O)/builds.log
+    \t@cp $(O)/.config $(O)/arch/x86/boot/bzImage
+    \t@touch $(O)/System.map
+    olddefconfig:
+    \t@true
+    kernelrelease:
+    \t@echo 1.2.3
+    image_name:
+    \t@echo arch/x86/boot/bzImage
+    modules_install:
+    \t@mkdir -p $(INSTALL_MOD_PATH)/lib/modules/1.2.3/kernel
+    \t@touch $(INSTALL_MOD_PATH)/lib/modules/1.2.3/kernel/foo.ko
+    headers_install:
+    \t@mkdir -p $(INSTALL_HDR_PATH)/include/linux
+    \t@touch $(INSTALL_HDR_PATH)/include/linux/version.h
+""")
+
+
+def _tarball(tmp_path):
+    src = tmp_path / "linux-1.2.3"
+    src.mkdir()
+    (src / "Makefile").write_text(MAKEFILE)
+    tarball = tmp_path / "linux-1.2.3.tar.gz"
+    with tarfile.open(tarball, "w:gz") as tar:
+        tar.add(src, arcname="linux-1.2.3")
+    return tarball
+
+
+def _build(tarball, config, dest, cache):
+    env = dict(os.environ, KERNEL_CACHE_DIR=str(cache), KERNEL_CCACHE="false", KERNEL_JOBS="2")
+    env.pop("MAKEFLAGS", None)
+    result = subprocess.run([str(SCRIPT), str(tarball), str(config), str(dest)], cwd=cache.parent,
+                            env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def test_build_reuses_build_dir_and_artifacts(tmp_path):
+    tarball = _tarball(tmp_path)
+    cache = tmp_path / "cache"
+    config = tmp_path / "config"
+    config.write_text("CONFIG_MODULES=y\n")
+    builds = cache / "build" / "linux-1.2.3" / "builds.log"
+
+    out = _build(tarball, config, tmp_path / "root1", cache)
+    assert "Building kernel 1.2.3" in out
+    root = tmp_path / "root1"
+    assert (root / "boot" / "vmlinuz-1.2.3-lfs").read_text() == "CONFIG_MODULES=y\n"
+    assert (root / "boot" / "config-1.2.3").is_file()
+    assert (root / "lib" / "modules" / "1.2.3" / "kernel" / "foo.ko").is_file()
+    assert (root / "usr" / "include" / "linux" / "version.h").is_file()
+
+    # Unchanged kernel: installed from the artifact without running make
+    out = _build(tarball, config, tmp_path / "root2", cache)
+    assert "is cached, installing it" in out
+    assert (tmp_path / "root2" / "lib" / "modules" / "1.2.3" / "kernel" / "foo.ko").is_file()
+    assert builds.read_text().count("build") == 1
+
+    # Changed config: rebuilt in the same build directory
+    config.write_text("# CONFIG_MODULES is not set\n")
+    _build(tarball, config, tmp_path / "root3", cache)
+    assert builds.read_text().count("build") == 2
+    assert not (tmp_path / "root3" / "lib").exists()
+    assert len(list((cache / "artifacts").iterdir())) == 2
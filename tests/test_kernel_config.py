@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+
+from src.parsers import kernel_config
+
+TESTDATA = Path('docs/blfs-git/kernel-config/testdata')
+
+
+def _tree(root):
+    (root / 'drivers').mkdir(parents=True)
+    (root / 'Makefile').write_text('VERSION = 6\nPATCHLEVEL = 10\nSUBLEVEL = 5\n')
+    (root / 'Kconfig').write_text('source "drivers/Kconfig"\n')
+    (root / 'drivers' / 'Kconfig').write_text(
+        'menu "Device Drivers"\n\nconfig PCI\n\tbool "PCI support"\n\n'
+        'config DRM\n\ttristate "Direct Rendering Manager"\n\tdepends on PCI\n\nendmenu\n'
+    )
+    return root
+
+
+def test_renders_the_blfs_conventions_page(tmp_path):
+    renderer = kernel_config.KernelConfigRenderer(TESTDATA, 'blfs', tmp_path / 'cache')
+    text = renderer.render_file(TESTDATA / 'config.toml.example')
+    expected = Path('docs/blfs-git/introduction/welcome/conventions-kernel.xml').read_text()
+    assert text + '\n' == expected
+
+
+def test_parse_is_cached_until_a_kconfig_changes(tmp_path):
+    tree = _tree(tmp_path / 'linux')
+    cache = tmp_path / 'cache'
+
+    first = kernel_config.KernelConfigRenderer(tree, 'lfs', cache)
+    text = first.render({'PCI': '*', 'DRM': '*M'})
+    assert first.parsed
+    assert '<screen role="nodump">' in text
+    assert '[DRM]' in text and '&lt;*/M&gt;' in text
+    assert first.cache_file.name.startswith('6.10.5-')
+
+    second = kernel_config.KernelConfigRenderer(tree, 'lfs', cache)
+    assert second.render({'PCI': '*', 'DRM': '*M'}) == text
+    assert second.render({'PCI': '*'}) != text
+    assert not second.parsed
+
+    drivers = tree / 'drivers' / 'Kconfig'
+    drivers.write_text(drivers.read_text().replace('PCI support', 'PCI bus support'))
+    third = kernel_config.KernelConfigRenderer(tree, 'lfs', cache)
+    assert 'CI bus support' in third.render({'PCI': '*'})
+    assert third.parsed
+
+
+def test_unknown_option_is_an_error(tmp_path):
+    renderer = kernel_config.KernelConfigRenderer(_tree(tmp_path / 'linux'), 'blfs', None)
+    with pytest.raises(kernel_config.KernelConfigError, match='NOPE seems not exist'):
+        renderer.render({'NOPE': '*'})
+    with pytest.raises(kernel_config.KernelConfigError, match='unknown setting M for PCI'):
+        renderer.render({'PCI': 'M'})
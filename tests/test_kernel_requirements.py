@@ -0,0 +1,99 @@
+import pytest
+
+from src.parsers import kernel_requirements as kr
+
+KCONFIG = """\
+config MODULES
+\tbool "Modules"
+\tdefault y
+\toption modules
+
+config PCI
+\tbool "PCI support"
+
+config DRM
+\ttristate "DRM"
+\tdepends on PCI
+
+config DRM_I915
+\ttristate "Intel graphics"
+\tdepends on DRM && PCI
+
+config FB
+\tbool "Framebuffer"
+\tselect FB_CORE
+
+config FB_CORE
+\tbool
+
+config EXPERT
+\tbool "Expert mode"
+
+config TIMERFD
+\tbool "timerfd" if EXPERT
+\tdefault y
+
+config LEGACY
+\tbool "Legacy"
+\tdepends on !EXPERT
+
+config PANIC_SCREEN
+\tstring "Panic screen"
+\tdefault "user"
+"""
+
+
+def _tree(root):
+    root.mkdir()
+    (root / "Makefile").write_text("VERSION = 6\nPATCHLEVEL = 10\nSUBLEVEL = 5\n")
+    (root / "Kconfig").write_text(KCONFIG)
+    return root
+
+
+def test_profile_selects_existing_requirement_files():
+    settings = kr.profile_settings("desktop_gnome")
+    files = kr.requirement_files(settings)
+    assert files[0].name == "sysv.toml"
+    assert all(f.is_file() for f in files)
+    assert kr.DOCS_ROOT / "blfs-git/kernel-config/x/installing/mesa.toml" in files
+    assert kr.hardware_requirements(settings) == {"DRM_I915": "*M", "DRM_AMDGPU": "*M", "DRM_NOUVEAU": "*M"}
+    # Every mapped file loads and merges without conflicts
+    kr.merge_requirements((str(f), kr.load_requirements(f)) for f in files)
+
+
+def test_merge_intersects_settings():
+    merged = kr.merge_requirements([("a", {"DRM": "*M", "OPT": " *M", "LSM": "landlock"}),
+                                    ("b", {"DRM": "*", "OPT": "*M "})])
+    assert merged["DRM"] == kr.Requirement("*", ("a", "b"))
+    assert merged["OPT"].target() is None
+    assert merged["OPT"].target(prefer_modules=True) is None
+    assert merged["LSM"].literal and merged["LSM"].target() == "landlock"
+    with pytest.raises(kr.KernelRequirementsError, match="no setting satisfies"):
+        kr.merge_requirements([("a", {"DRM": "M"}), ("b", {"DRM": "*"})])
+
+
+def test_resolve_enables_dependencies_and_writes_min_config(tmp_path, monkeypatch):
+    tree = _tree(tmp_path / "linux")
+    for key, value in kr.kernel_environment(tree, "x86").items():
+        monkeypatch.setenv(key, value)
+    kconf = kr.load_kconfig(tree, cache_dir=tmp_path / "cache")
+    requirements = kr.merge_requirements([("toml", {
+        "DRM_I915": "*M", "FB": "*", "TIMERFD": "*", "PANIC_SCREEN": "kmsg",
+        "EXPERT": "* ", "NOT_IN_THIS_KERNEL": "*",
+    })])
+
+    result = kr.resolve(kconf, requirements, prefer_modules=True)
+    assert result.values == {"DRM_I915": "m", "FB": "y", "TIMERFD": "y", "PANIC_SCREEN": "kmsg"}
+    assert result.added == {"DRM": "y", "PCI": "y"}
+    assert result.unmet == {}
+    assert result.unknown == ["NOT_IN_THIS_KERNEL"]
+    assert kconf.syms["FB_CORE"].str_value == "y"
+
+    out = tmp_path / "min.config"
+    kconf.write_min_config(str(out))
+    lines = set(out.read_text().splitlines())
+    assert {"CONFIG_PCI=y", "CONFIG_DRM=y", "CONFIG_DRM_I915=m", 'CONFIG_PANIC_SCREEN="kmsg"'} <= lines
+    assert not any("TIMERFD" in line or "MODULES" in line for line in lines)
+
+    unmet = kr.resolve(kconf, kr.merge_requirements([("a", {"EXPERT": "*", "LEGACY": "*"})]))
+    assert list(unmet.unmet) == ["LEGACY"]
@@ -0,0 +1,26 @@
+import io
+
+from src.telemetry import log_sidecar
+
+
+def test_rotates_compresses_and_indexes(tmp_path):
+    data = b"".join(b"line %05d of compiler output\n" % i for i in range(2000))
+    log = log_sidecar.PackageLog(tmp_path, "gcc-13.2.0", rotate_size=16 * 1024)
+    assert log_sidecar.pump(io.BytesIO(data), log) == len(data)
+    log.close()
+
+    entries = log_sidecar.read_index(tmp_path, "gcc-13.2.0")
+    assert len(entries) > 2
+    assert entries[0]["start"] == 0 and entries[-1]["end"] == len(data)
+    assert entries[0]["file"].endswith(("gz", "zst"))
+    assert entries[-1]["file"] == f"gcc-13.2.0.{entries[-1]['segment']}.log"
+    assert all((tmp_path / e["file"]).exists() for e in entries)
+
+    assert log_sidecar.read_range(tmp_path, "gcc-13.2.0") == data
+    assert log_sidecar.read_range(tmp_path, "gcc-13.2.0", 20000, 5000) == data[20000:25000]
+
+    # A second build of the package continues the stream offsets
+    again = log_sidecar.PackageLog(tmp_path, "gcc-13.2.0")
+    log_sidecar.pump(io.BytesIO(b"rebuild\n"), again)
+    again.close()
+    assert log_sidecar.read_range(tmp_path, "gcc-13.2.0", len(data)) == b"rebuild\n"
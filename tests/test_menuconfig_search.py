@@ -0,0 +1,74 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+MENU_DIR = Path(__file__).resolve().parents[1] / "docs" / "jhalfs" / "menu"
+
+
+def _load(name):
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, MENU_DIR / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+kconfiglib = _load("kconfiglib")
+menuconfig = _load("menuconfig")
+
+KCONFIG = """\
+config USB
+\tbool "USB support"
+
+config USB_STORAGE
+\ttristate "USB Mass Storage"
+\tdepends on USB
+
+config DRM
+\tbool "Direct Rendering Manager"
+
+menu "Device drivers"
+endmenu
+
+comment "USB gadgets need a controller"
+"""
+
+
+def _search(words, entries=None):
+    return [entry[0] for entry in menuconfig._search_entries(words, entries or menuconfig._search_index())]
+
+
+
+def _labels(nodes):
+    return [node.item.name if isinstance(node.item, kconfiglib.Symbol) else node.prompt[0] for node in nodes]
+
+
+def test_indexed_search_and_narrowing(tmp_path, monkeypatch):
+    (tmp_path / "Kconfig").write_text(KCONFIG)
+    monkeypatch.setenv("srctree", str(tmp_path))
+    monkeypatch.setattr(menuconfig, "_kconf", kconfiglib.Kconfig("Kconfig", warn=False), raising=False)
+
+    assert _labels(_search(["usb"])) == ["USB", "USB_STORAGE", "USB gadgets need a controller"]
+    # Words match the name or the prompt, and regexes are matched per text
+    assert _labels(_search(["storage", "usb_"])) == ["USB_STORAGE"]
+    assert _labels(_search(["^usb$"])) == ["USB"]
+    assert _labels(_search(["rendering", "manager$"])) == ["DRM"]
+    assert _labels(_search(["device"])) == ["Device drivers"]
+
+    assert menuconfig._narrows_search(["us"], ["usb"])
+    assert menuconfig._narrows_search(["usb"], ["usb", "mass"])
+    assert menuconfig._narrows_search([], ["usb"])
+    assert not menuconfig._narrows_search(None, ["usb"])
+    assert not menuconfig._narrows_search(["usb"], ["us"])
+    assert not menuconfig._narrows_search(["ab"], ["ab?"])
+    assert not menuconfig._narrows_search(["usb", "mass"], ["usb"])
+
+    # Narrowed results equal a search of the whole index
+    narrowed = menuconfig._search_entries(["usb"], menuconfig._search_index())
+    assert _search(["usb_s"], narrowed) == _search(["usb_s"])
+
+    (usb,), (comment,) = _search(["^usb$"]), _search(["gadgets"])
+    assert menuconfig._jump_to_str(usb) == 'USB(=n) "USB support"'
+    assert menuconfig._jump_to_str(comment) == 'comment "USB gadgets need a controller"'
@@ -0,0 +1,38 @@
+import io
+import tarfile
+
+from src.sources import patch_precheck
+
+
+def _make_tarball(path, files):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, text in files.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def test_precheck_reports_failing_patch(tmp_path):
+    _make_tarball(tmp_path / "foo-1.0.tar.gz", {"foo-1.0/src/main.c": "int main;\n", "foo-1.0/README": "x\n"})
+    _make_tarball(tmp_path / "bar-2.1.tar.gz", {"bar-2.1/bar.c": "old\n"})
+    (tmp_path / "foo-1.0-fix-1.patch").write_text(
+        "--- a/src/main.c\n+++ b/src/main.c\n@@ -1 +1 @@\n-int main;\n+int main(void);\n"
+    )
+    (tmp_path / "bar-2.1-fix-1.patch").write_text(
+        "--- a/bar.c\n+++ b/bar.c\n@@ -1 +1 @@\n-something else\n+new\n"
+    )
+    (tmp_path / "baz-3.0-fix-1.patch").write_text("")
+
+    results, orphans = patch_precheck.precheck(tmp_path, book_dir=None, jobs=2)
+    status = {r.patch: r.ok for r in results}
+    assert status == {"foo-1.0-fix-1.patch": True, "bar-2.1-fix-1.patch": False}
+    assert orphans == ["baz-3.0-fix-1.patch"]
+
+
+def test_book_patches_resolve_entities():
+    patches = patch_precheck.book_patches()
+    assert patches
+    for name, info in patches.items():
+        assert name.endswith(".patch") and "&" not in name
+        assert len(info["md5"]) == 32
@@ -0,0 +1,35 @@
+from src.telemetry import perf_history
+
+
+def _records(gcc, glibc=200.0):
+    return [
+        {"package": "gcc-13.2.0", "phase": "make", "wall_s": gcc, "exit_status": 0, "host": "h"},
+        {"package": "glibc-2.39", "phase": "make", "wall_s": glibc, "exit_status": 0, "host": "h"},
+    ]
+
+
+def test_rolling_baseline_flags_significant_regression(tmp_path):
+    conn = perf_history.connect(tmp_path / "history.sqlite")
+    key = {"jobs": 4, "flags": "-O2", "revision": "12.3+abc", "fingerprint": "host1"}
+    for gcc, glibc in [(600, 200), (610, 205), (590, 198), (605, 202)]:
+        perf_history.record_run(conn, _records(gcc, glibc), **key)
+    other = perf_history.record_run(conn, _records(300.0), jobs=8, flags="-O2", revision="12.3+abc",
+                                    fingerprint="host1")
+    latest = perf_history.record_run(conn, _records(700.0, 203.0), **key)
+
+    changes = {c.package: c for c in perf_history.compare(conn, latest)}
+    assert changes["gcc-13.2.0"].significant
+    assert not changes["glibc-2.39"].significant
+    assert changes["gcc-13.2.0"].baseline_s == 601.25
+
+    # Run-against-run only applies the relative threshold
+    direct = {c.package: c for c in perf_history.compare(conn, latest, against=other)}
+    assert direct["gcc-13.2.0"].ratio == round(700 / 300, 3)
+
+    expected = perf_history.expected_durations(conn, jobs=4, fingerprint="host1")
+    assert expected["gcc-13.2.0"] == 605.0
+
+
+def test_book_revision_and_fingerprint_are_stable():
+    assert perf_history.book_revision().startswith("12.3+")
+    assert perf_history.host_fingerprint() == perf_history.host_fingerprint()
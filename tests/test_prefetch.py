@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from src.sources import prefetch
+
+
+def test_prefetch_publishes_readiness_in_build_order(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    urls = []
+    for name in ("binutils-2.42.tar.xz", "gcc-13.2.0.tar.xz", "glibc-2.39.tar.xz"):
+        (mirror / name).write_bytes(name.encode())
+        urls.append((mirror / name).as_uri())
+    urls.append((mirror / "missing.tar.xz").as_uri())
+
+    started = []
+
+    def fetcher(url, dest):
+        started.append(url.rsplit("/", 1)[1])
+        prefetch.download(url, dest)
+
+    sources = tmp_path / "sources"
+    sources.mkdir()
+    ready = tmp_path / "ready"
+    failed = prefetch.prefetch(urls, sources, ready, jobs=1, fetcher=fetcher)
+
+    assert failed == ["missing.tar.xz"]
+    assert started[:3] == ["binutils-2.42.tar.xz", "gcc-13.2.0.tar.xz", "glibc-2.39.tar.xz"]
+    prefetch.wait_ready(["binutils-2.42.tar.xz", "glibc-2.39.tar.xz"], ready, timeout=1)
+    with pytest.raises(prefetch.PrefetchError):
+        prefetch.wait_ready(["missing.tar.xz"], ready, timeout=1)
+
+
+def test_wait_fails_when_prefetch_finished_without_file(tmp_path):
+    prefetch.prefetch([], tmp_path, tmp_path / "ready")
+    with pytest.raises(prefetch.PrefetchError):
+        prefetch.wait_ready(["never-scheduled.tar.xz"], tmp_path / "ready", timeout=1)
+
+
+def test_prefetch_records_cache_hits_and_downloads(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "sed-4.9.tar.xz").write_bytes(b"x" * 1000)
+    sources = tmp_path / "sources"
+    sources.mkdir()
+    (sources / "tar-1.35.tar.xz").write_bytes(b"already here")
+    urls = [(mirror / "sed-4.9.tar.xz").as_uri(), (mirror / "tar-1.35.tar.xz").as_uri()]
+
+    assert prefetch.prefetch(urls, sources, tmp_path / "ready") == []
+    lines = (tmp_path / "ready" / prefetch.STATS_FILE).read_text().splitlines()
+    stats = {s["name"]: s for s in map(json.loads, lines)}
+    assert stats["sed-4.9.tar.xz"]["cache"] == "miss"
+    assert stats["sed-4.9.tar.xz"]["bytes"] == 1000
+    assert stats["tar-1.35.tar.xz"]["cache"] == "hit"
+
+
+def test_malformed_url_fails_only_its_source(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "m4-1.4.19.tar.xz").write_bytes(b"m4")
+    urls = ["mirror.example/bad-1.0.tar.xz", (mirror / "m4-1.4.19.tar.xz").as_uri()]
+
+    ready = tmp_path / "ready"
+    assert prefetch.prefetch(urls, tmp_path, ready, jobs=1) == ["bad-1.0.tar.xz"]
+    assert (ready / prefetch.DONE_MARKER).exists()
+    prefetch.wait_ready(["m4-1.4.19.tar.xz"], ready, timeout=1)
+    with pytest.raises(prefetch.PrefetchError, match="bad-1.0.tar.xz: unknown url type"):
+        prefetch.wait_ready(["bad-1.0.tar.xz"], ready, timeout=1)
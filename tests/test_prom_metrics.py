@@ -0,0 +1,41 @@
+import json
+
+from src.telemetry import prom_metrics
+
+
+def test_collect_renders_textfile(tmp_path):
+    status = tmp_path / "build-status.json"
+    status.write_text(json.dumps({"done": 3, "total": 13, "percent": 40.0, "remaining_s": 1800,
+                                  "sbu_seconds": 120, "jobs": 8}))
+    telemetry = tmp_path / "telemetry.jsonl"
+    telemetry.write_text(
+        '{"package": "binutils-2.42", "phase": "make", "wall_s": 120, "end": 100, "exit_status": 0}\n'
+        '{"package": "gcc-13.2.0", "phase": "make", "wall_s": 30, "end": 130, "exit_status": 2}\n'
+        '{"package": "gcc-13.2.0", "phase": "make", "wall_s": 350, "end": 500, "exit_status": 0}\n'
+    )
+    stats = tmp_path / "fetch-stats.jsonl"
+    stats.write_text('{"cache": "hit", "bytes": 10}\n{"cache": "miss", "bytes": 4000, "seconds": 2}\n')
+    pressure = tmp_path / "pressure"
+    pressure.mkdir()
+    (pressure / "io").write_text("some avg10=12.50 avg60=1.00 avg300=0.00 total=2000000\n"
+                                 "full avg10=5.00 avg60=0.00 avg300=0.00 total=1000000\n")
+
+    text = prom_metrics.collect(status, telemetry, stats, labels={"builder": "b1"},
+                                pressure_root=pressure, now=1792432833.25).render()
+    lines = text.splitlines()
+    assert 'lfs_build_last_update_timestamp_seconds{builder="b1"} 1792432833.25' in lines
+    assert 'lfs_build_packages_remaining{builder="b1"} 10' in lines
+    assert 'lfs_build_parallel_jobs{builder="b1"} 8' in lines
+    assert 'lfs_build_phase_duration_seconds_total{builder="b1",phase="make"} 500' in lines
+    assert 'lfs_build_source_cache_hit_ratio{builder="b1"} 0.5' in lines
+    assert 'lfs_build_download_throughput_bytes_per_second{builder="b1"} 2000' in lines
+    assert 'lfs_build_pressure_avg10_ratio{builder="b1",kind="some",resource="io"} 0.125' in lines
+    assert lines.count("# TYPE lfs_build_package_duration_seconds gauge") == 1
+    # A retried step is one series with its latest duration
+    gcc = [line for line in lines if line.startswith("lfs_build_package_duration_seconds") and "gcc" in line]
+    assert gcc == ['lfs_build_package_duration_seconds{builder="b1",package="gcc-13.2.0",phase="make"} 350']
+
+    out = tmp_path / "textfile" / "lfs.prom"
+    prom_metrics.write_textfile(out, text)
+    assert out.read_text() == text
+    assert [p.name for p in out.parent.iterdir()] == ["lfs.prom"]
@@ -0,0 +1,18 @@
+import sys
+
+from src.telemetry import resource_collector
+
+
+def test_run_and_record_appends_json_line(tmp_path):
+    output = tmp_path / "telemetry.jsonl"
+    cmd = [sys.executable, "-c", "x = bytearray(20 * 1024 * 1024); sum(range(200000))"]
+    assert resource_collector.run_and_record(cmd, "binutils-2.42", output, phase="make") == 0
+    assert resource_collector.run_and_record([sys.executable, "-c", "raise SystemExit(3)"], "gcc", output) == 3
+
+    first, second = resource_collector.read_records(output)
+    assert first["package"] == "binutils-2.42"
+    assert first["phase"] == "make"
+    assert first["max_rss_kb"] > 20 * 1024
+    assert first["wall_s"] > 0
+    assert {"read_bytes", "write_bytes", "voluntary_ctxt", "involuntary_ctxt"} <= set(first)
+    assert second["exit_status"] == 3
@@ -0,0 +1,53 @@
+import importlib.util
+import json
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[1] / "docs" / "jhalfs" / "common" / "sbu_du_report.py"
+spec = importlib.util.spec_from_file_location("sbu_du_report", SCRIPT)
+sbu_du_report = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(sbu_du_report)
+
+
+def _log(path, seconds, kb1, kb2):
+    path.write_text(f"KB: {kb1}\tfoo\nbuilding...\n\nTotalseconds: {seconds}\n\nKB: {kb2}\tfoo\n")
+
+
+def test_report_flags_deviations(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "000-masterscript.log").write_text("")
+    _log(logs / "501-binutils-pass1", 100, 1000, 1000 + 600 * 1024)
+    _log(logs / "502-gcc-pass1", 600, 2000, 2000 + 4000 * 1024)
+    _log(logs / "801-zlib", 9, 3000, 3000 + 6 * 1024)
+    (logs / "802-untimed").write_text("KB: 1\n")
+    book = tmp_path / "book"
+    book.mkdir()
+    (book / "packages.ent").write_text(
+        '<!ENTITY binutils-tmpp1-sbu "1 SBU">\n<!ENTITY binutils-tmpp1-du "600 MB">\n'
+        '<!ENTITY gcc-tmpp1-sbu "3.2 SBU">\n<!ENTITY gcc-tmpp1-du "3.9 GB">\n'
+        '<!ENTITY zlib-fin-sbu "less than 0.1 SBU">\n<!ENTITY zlib-fin-du "6.4 MB">\n'
+    )
+
+    assert sbu_du_report.main([str(logs), "12.1", "2025-01-01", "--book", str(book),
+                               "--output-dir", str(tmp_path), "--no-du"]) == 0
+    report = json.loads((tmp_path / "12.1-SBU_DU-2025-01-01.json").read_text())
+    by_name = {p["package"]: p for p in report["packages"]}
+    assert list(by_name) == ["binutils-pass1", "gcc-pass1", "zlib"]
+    assert report["sbu_unit_seconds"] == 100
+    assert by_name["binutils-pass1"]["deviations"] == []
+    assert by_name["gcc-pass1"]["deviations"] == ["sbu"]
+    assert by_name["zlib"]["deviations"] == ["du"]
+    assert by_name["binutils-pass1"]["installed_kb"] == 1000
+
+    text = (tmp_path / "12.1-SBU_DU-2025-01-01.report").read_text()
+    assert "The SBU unit value is equal to 100 seconds at -j1." in text
+    assert "\t\t\t\t[gcc-pass1]" in text
+    assert "Approximate SBU time is:\t\t\t\t6.0" in text
+
+
+def test_entity_key():
+    assert sbu_du_report.entity_key("501-binutils-pass1") == "binutils-tmpp1"
+    assert sbu_du_report.entity_key("505-gcc-libstdc++") == "libstdcpp-tmpp1"
+    assert sbu_du_report.entity_key("606-m4") == "m4-tmp"
+    assert sbu_du_report.entity_key("815-linux") == "linux-knl"
+    assert sbu_du_report.entity_key("801-zlib") == "zlib-fin"
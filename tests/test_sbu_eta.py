@@ -0,0 +1,42 @@
+from src.telemetry import sbu_eta
+
+
+def test_parse_book_sbu_values():
+    assert sbu_eta.parse_sbu("less than 0.1 SBU") == 0.1
+    assert sbu_eta.parse_sbu("46 SBU (with tests)") == 46
+    assert sbu_eta.parse_sbu("0.4 - 32 SBU (typically about 2.5 SBU)") == 2.5
+    sbus = sbu_eta.book_sbu()
+    assert sbus["gcc-tmpp1"] > sbus["binutils-tmpp1"]
+
+
+def test_estimate_uses_measured_sbu_and_correction(tmp_path):
+    plan_file = tmp_path / "plan"
+    plan_file.write_text("binutils-2.42 binutils-tmpp1\ngcc-13.2.0 3\nglibc-2.39 2\n")
+    plan = sbu_eta.load_plan(plan_file, sbus={})
+    records = [{"package": "binutils-2.42", "wall_s": 100.0, "end": 1000.0, "exit_status": 0}]
+
+    status = sbu_eta.estimate(plan, records, jobs=4, now=1000.0)
+    assert status["sbu_seconds"] == 100.0
+    assert status["remaining_s"] == 500.0
+    assert status["percent"] == round(100 / 6, 1)
+    assert status["current"] == "gcc-13.2.0"
+
+    # GCC took twice the book estimate: the rest of the plan is scaled up
+    records.append({"package": "gcc-13.2.0", "wall_s": 500.0, "end": 1500.0, "exit_status": 0})
+    status = sbu_eta.estimate(plan, records, jobs=4, now=1500.0)
+    assert status["correction"] == 1.5
+    assert status["remaining_s"] == 300.0
+
+
+def test_previous_calibration_is_scaled_by_parallelism():
+    plan = [sbu_eta.PlanEntry("binutils", 1.0), sbu_eta.PlanEntry("gcc", 3.0)]
+    status = sbu_eta.estimate(plan, [], jobs=8, calibration={"sbu_seconds": 120, "jobs": 4}, now=0)
+    assert status["calibration"] == "previous run"
+    assert status["sbu_seconds"] < 120
+
+
+def test_history_durations_replace_sbu_prediction():
+    plan = [sbu_eta.PlanEntry("binutils", 1.0, reference=True), sbu_eta.PlanEntry("gcc", 3.0)]
+    records = [{"package": "binutils", "wall_s": 100.0, "end": 50.0, "exit_status": 0}]
+    status = sbu_eta.estimate(plan, records, jobs=4, now=50.0, history={"gcc": 420.0})
+    assert status["remaining_s"] == 420.0
@@ -0,0 +1,113 @@
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from src.sources import segmented_download
+
+
+class RangeHandler(SimpleHTTPRequestHandler):
+    """Minimal static handler that honours single ``Range`` requests."""
+
+    ranges = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._send(head=True)
+
+    def do_GET(self):
+        self._send(head=False)
+
+    def _send(self, head):
+        data = Path(self.translate_path(self.path)).read_bytes()
+        header = self.headers.get("Range")
+        if self.ranges and header:
+            start, end = header.split("=")[1].split("-")
+            body = data[int(start):int(end) + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if self.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def server(tmp_path):
+    served = tmp_path / "srv"
+    served.mkdir()
+    payload = bytes(range(256)) * 4096
+    (served / "pkg.tar.xz").write_bytes(payload)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeHandler, directory=str(served)))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/pkg.tar.xz", payload
+    httpd.shutdown()
+    RangeHandler.ranges = True
+
+
+def test_segmented_download_assembles_file(server, tmp_path):
+    url, payload = server
+    dest = tmp_path / "pkg.tar.xz"
+    segmented_download.download(url, dest, segments=4, threshold=1)
+    assert dest.read_bytes() == payload
+    assert not (tmp_path / "pkg.tar.xz.part.state").exists()
+
+
+def test_resume_skips_completed_segments(server, tmp_path):
+    url, payload = server
+    dest = tmp_path / "pkg.tar.xz"
+    part = tmp_path / "pkg.tar.xz.part"
+    segments = segmented_download.plan_segments(len(payload), 2)
+    part.write_bytes(payload[: segments[1]["start"]] + b"\0" * (len(payload) - segments[1]["start"]))
+    segments[0]["done"] = segments[0]["end"] + 1
+    state = segmented_download._SegmentState(part.with_name(part.name + ".state"), url, len(payload), segments)
+    state.checkpoint(force=True)
+
+    segmented_download.download(url, dest, segments=2, threshold=1)
+    assert dest.read_bytes() == payload
+
+
+def test_falls_back_without_range_support(server, tmp_path):
+    url, payload = server
+    RangeHandler.ranges = False
+    dest = tmp_path / "pkg.tar.xz"
+    segmented_download.download(url, dest, segments=4, threshold=1)
+    assert dest.read_bytes() == payload
+
+
+def test_single_download_drops_stale_segment_state(server, tmp_path):
+    url, payload = server
+    dest = tmp_path / "pkg.tar.xz"
+    segments = segmented_download.plan_segments(len(payload), 2)
+    segments[0]["done"] = segments[0]["end"] + 1
+    state_path = tmp_path / "pkg.tar.xz.part.state"
+    segmented_download._SegmentState(state_path, url, len(payload), segments).checkpoint(force=True)
+
+    segmented_download.download(url, dest, segments=2, threshold=len(payload) + 1)
+    assert dest.read_bytes() == payload
+    assert not state_path.exists()
+
+
+def test_probe_failure_falls_back_to_single_download(server, tmp_path, monkeypatch):
+    url, payload = server
+    urlopen = segmented_download.urlopen
+
+    def head(req, *args, **kwargs):
+        if req.get_method() == "HEAD":
+            raise segmented_download.HTTPException("connection dropped")
+        return urlopen(req, *args, **kwargs)
+
+    monkeypatch.setattr(segmented_download, "urlopen", head)
+    dest = tmp_path / "pkg.tar.xz"
+    segmented_download.download(url, dest, segments=4, threshold=1)
+    assert dest.read_bytes() == payload
@@ -0,0 +1,34 @@
+import pytest
+
+from src.sources import source_bundle
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    src = tmp_path / "sources"
+    (src / "patches").mkdir(parents=True)
+    (src / "gcc-13.2.0.tar.xz").write_bytes(b"g" * 5000)
+    (src / "patches" / "bash-fix-1.patch").write_text("--- a\n+++ b\n")
+    path = tmp_path / "sources.lfsb"
+    files = sorted(p for p in src.rglob("*") if p.is_file())
+    source_bundle.create_bundle(path, files, base=src)
+    return path
+
+
+def test_extract_single_member(bundle, tmp_path):
+    out = tmp_path / "out"
+    written = source_bundle.extract(bundle, ["patches/bash-fix-1.patch"], out)
+    assert written == [out / "patches" / "bash-fix-1.patch"]
+    assert written[0].read_text() == "--- a\n+++ b\n"
+    assert not (out / "gcc-13.2.0.tar.xz").exists()
+
+
+def test_verify_detects_corruption(bundle):
+    assert source_bundle.verify_bundle(bundle) == []
+    member = source_bundle.read_index(bundle)["gcc-13.2.0.tar.xz"]
+    with open(bundle, "r+b") as fh:
+        fh.seek(member.offset + 10)
+        fh.write(b"X")
+    assert source_bundle.verify_bundle(bundle) == ["gcc-13.2.0.tar.xz"]
+    with pytest.raises(source_bundle.BundleError):
+        source_bundle.extract(bundle, ["gcc-13.2.0.tar.xz"], bundle.parent / "out")
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from src.sources.source_store import SourceStore, StoreError, parse_size
+
+
+def test_fetch_downloads_once_and_links(tmp_path):
+    store = SourceStore(tmp_path / "store")
+    calls = []
+
+    def fetcher(dest):
+        calls.append(dest)
+        dest.write_bytes(b"tarball")
+
+    ws1 = tmp_path / "ws1"
+    ws2 = tmp_path / "ws2"
+    ws1.mkdir()
+    ws2.mkdir()
+    digest = store.fetch("pkg.tar.xz", fetcher, ws1 / "pkg.tar.xz")
+    assert store.fetch("pkg.tar.xz", fetcher, ws2 / "pkg.tar.xz") == digest
+    assert len(calls) == 1
+    assert digest == hashlib.sha256(b"tarball").hexdigest()
+    assert os.path.samefile(ws1 / "pkg.tar.xz", ws2 / "pkg.tar.xz")
+
+
+def test_checksum_mismatch_is_rejected(tmp_path):
+    store = SourceStore(tmp_path / "store")
+    with pytest.raises(StoreError):
+        store.fetch("pkg.tar.xz", lambda dest: dest.write_bytes(b"bad"), tmp_path / "out", digest="00" * 32)
+    assert store.stats()["objects"] == 0
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    store = SourceStore(tmp_path / "store")
+    old = tmp_path / "old.tar"
+    new = tmp_path / "new.tar"
+    old.write_bytes(b"a" * 100)
+    new.write_bytes(b"b" * 100)
+    old_digest = store.add(old)
+    new_digest = store.add(new)
+    stale = time.time() - 3600
+    os.utime(store.object_path(old_digest), (stale, stale))
+    os.utime(store.object_path(new_digest), (stale + 60, stale + 60))
+
+    removed = store.evict(max_size=150)
+    assert [p.name for p in removed] == [old_digest]
+    assert store.lookup(new_digest) is not None
+
+
+def test_parse_size():
+    assert parse_size("20G") == 20 << 30
+    assert parse_size("512MiB") == 512 << 20
+    assert parse_size("1024") == 1024
+
+
+def test_evict_keeps_objects_behind_symlinks(tmp_path):
+    store = SourceStore(tmp_path / "store")
+    src = tmp_path / "pkg.tar"
+    src.write_bytes(b"a" * 100)
+    digest = store.add(src)
+    stale = time.time() - 3600
+    os.utime(store.object_path(digest), (stale, stale))
+    link = tmp_path / "ws" / "pkg.tar"
+    link.parent.mkdir()
+    assert store.materialize(digest, link, "symlink") == "symlink"
+    os.utime(store.object_path(digest), (stale, stale))
+
+    assert store.evict(max_size=0) == []
+    assert link.read_bytes() == b"a" * 100
+
+    # Once the workspace link is gone the object can be evicted again
+    link.unlink()
+    assert [p.name for p in store.evict(max_size=0)] == [digest]
+    assert not (store.pins / digest).exists()
+
+
+def test_lookup_of_object_owned_by_another_user(tmp_path, monkeypatch):
+    store = SourceStore(tmp_path / "store")
+    src = tmp_path / "pkg.tar"
+    src.write_bytes(b"tarball")
+    digest = store.add(src)
+
+    def utime(path, *args, **kwargs):
+        raise PermissionError(1, "Operation not permitted", str(path))
+
+    # Running as root, chmod alone would not make the object non-writable
+    monkeypatch.setattr(os, "utime", utime)
+    assert store.lookup(digest) == store.object_path(digest)
+    dest = tmp_path / "ws" / "pkg.tar"
+    dest.parent.mkdir()
+    assert store.fetch("pkg.tar", lambda tmp: pytest.fail("downloaded again"), dest, digest) == digest
+    assert dest.read_bytes() == b"tarball"